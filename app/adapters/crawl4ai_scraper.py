@@ -1,6 +1,8 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 from crawl4ai import (
     AsyncWebCrawler,
+    BrowserConfig,
     CrawlerRunConfig,
     DefaultMarkdownGenerator,
     PruningContentFilter,
@@ -8,33 +10,100 @@ from crawl4ai import (
 )
 from app.ports.scraper import ScraperPort
 from app.ports.models import ScrapeResult
+from app.ports.tracer import get_tracer
+from app.adapters.polite_scraper import parse_retry_after
 
 
 class Crawl4AIScraperAdapter(ScraperPort):
     """
     Adapter concreto che usa crawl4ai per eseguire scraping parallelo di più URL.
+
+    Se avviato con start() (o usato come async context manager) mantiene un unico
+    AsyncWebCrawler aperto e lo riusa per tutte le chiamate. Le pagine aperte
+    contemporaneamente sono al più max_sessions in tutto l'adapter, anche con più
+    chiamate concorrenti (worker della pipeline, turni dello scraper "educato").
+    Senza start() ogni chiamata apre e chiude un crawler dedicato.
     """
 
+    def __init__(
+        self,
+        max_sessions: int = 5,
+        browser_config: Optional[BrowserConfig] = None,
+    ):
+        self.max_sessions = max_sessions
+        self.browser_config = browser_config or BrowserConfig(headless=True)
+        self._run_config = CrawlerRunConfig(
+            markdown_generator=DefaultMarkdownGenerator(
+                content_filter=PruningContentFilter()
+            )
+        )
+        self._crawler: Optional[AsyncWebCrawler] = None
+        self._lock = asyncio.Lock()
+        # Condiviso tra le chiamate: un dispatcher di crawl4ai crea un semaforo per ogni arun_many
+        self._sessions = asyncio.Semaphore(max_sessions)
+
+    @property
+    def is_started(self) -> bool:
+        return self._crawler is not None
+
+    async def start(self) -> None:
+        """Avvia il browser condiviso (idempotente)."""
+        async with self._lock:
+            if self._crawler is not None:
+                return
+            crawler = AsyncWebCrawler(config=self.browser_config)
+            await crawler.start()
+            self._crawler = crawler
+
+    async def close(self) -> None:
+        """Chiude il browser condiviso, se aperto."""
+        async with self._lock:
+            if self._crawler is None:
+                return
+            crawler, self._crawler = self._crawler, None
+            await crawler.close()
+
+    async def __aenter__(self) -> "Crawl4AIScraperAdapter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
     async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
-        results: List[ScrapeResult] = []
-        async with AsyncWebCrawler() as crawler:
-            crawl_results: List[CrawlResult] = await crawler.arun_many(
-                urls=urls,
-                config=CrawlerRunConfig(
-                    markdown_generator=DefaultMarkdownGenerator(
-                        content_filter=PruningContentFilter()
-                    )
-                ),
+        if not urls:
+            return []
+        if self._crawler is None:
+            async with AsyncWebCrawler(config=self.browser_config) as crawler:
+                return await self._crawl(crawler, urls)
+        return await self._crawl(self._crawler, urls)
+
+    async def _crawl(
+        self, crawler: AsyncWebCrawler, urls: List[str]
+    ) -> List[ScrapeResult]:
+        with get_tracer().span("browser.crawl", urls=len(urls)) as span:
+            crawl_results: List[CrawlResult] = await asyncio.gather(
+                *(self._crawl_one(crawler, url) for url in urls)
             )
-            for result in crawl_results:
-                results.append(
-                    ScrapeResult(
-                        url=result.url,
-                        success=result.success,
-                        content=(
-                            result.markdown.fit_markdown if result.success else None
-                        ),
-                        error=result.error if not result.success else None,
-                    )
+            span["failures"] = sum(1 for result in crawl_results if not result.success)
+        results: List[ScrapeResult] = []
+        for result in crawl_results:
+            headers = {k.lower(): v for k, v in (result.response_headers or {}).items()}
+            results.append(
+                ScrapeResult(
+                    url=result.url,
+                    success=result.success,
+                    content=(result.markdown.fit_markdown if result.success else None),
+                    error=result.error_message if not result.success else None,
+                    status_code=result.status_code,
+                    retry_after=parse_retry_after(headers.get("retry-after")),
                 )
+            )
         return results
+
+    async def _crawl_one(self, crawler: AsyncWebCrawler, url: str) -> CrawlResult:
+        async with self._sessions:
+            try:
+                return await crawler.arun(url, config=self._run_config)
+            except Exception as e:
+                return CrawlResult(url=url, html="", success=False, error_message=f"{type(e).__name__}: {e}")
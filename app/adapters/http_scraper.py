@@ -0,0 +1,213 @@
+import asyncio
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import httpx
+from crawl4ai import DefaultMarkdownGenerator, PruningContentFilter
+from app.ports.scraper import ScraperPort
+from app.ports.models import ScrapeResult
+from app.ports.tracer import get_tracer
+from app.adapters.polite_scraper import parse_retry_after
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+
+# Segnali di pagine che mostrano contenuto solo dopo l'esecuzione di JavaScript
+_NOSCRIPT_JS_RE = re.compile(
+    r"<noscript[^>]*>.{0,500}?(enable|requires?|turn on)\s+javascript",
+    re.IGNORECASE | re.DOTALL,
+)
+_EMPTY_MOUNT_RE = re.compile(
+    r'<div[^>]+id=["\'](root|app|__next|__nuxt|svelte)["\'][^>]*>\s*</div>',
+    re.IGNORECASE,
+)
+_SCRIPT_RE = re.compile(r"<script\b", re.IGNORECASE)
+
+
+@dataclass
+class _CachedPage:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: str
+
+
+def needs_javascript(html: str, markdown: str, min_text_chars: int = 500) -> bool:
+    """
+    Euristica: la pagina va renderizzata nel browser se il testo estratto è scarso e
+    l'HTML indica un'app client-side (mount point vuoto, avviso <noscript>, molti script).
+    """
+    if len(markdown.strip()) >= min_text_chars:
+        return False
+    if not markdown.strip():
+        return True
+    return bool(
+        _EMPTY_MOUNT_RE.search(html)
+        or _NOSCRIPT_JS_RE.search(html)
+        or len(_SCRIPT_RE.findall(html)) >= 10
+    )
+
+
+class HttpScraperAdapter(ScraperPort):
+    """
+    Adapter di scraping senza browser: un client httpx asincrono con connessioni
+    keep-alive riusate per host, risposte gzip/brotli e GET condizionali
+    (ETag / Last-Modified) con cache in memoria del markdown già generato.
+
+    Le pagine che richiedono JavaScript (vedi needs_javascript) vengono passate
+    all'adapter browser fallback, se configurato; altrimenti si restituisce il
+    poco contenuto statico disponibile.
+    """
+
+    def __init__(
+        self,
+        fallback: Optional[ScraperPort] = None,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        timeout: float = 15.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        min_text_chars: int = 500,
+        cache_size: int = 1000,
+    ):
+        self.fallback = fallback
+        self.min_text_chars = min_text_chars
+        self.cache_size = cache_size
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._timeout = httpx.Timeout(timeout)
+        self._headers = {
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+        }
+        self._cache: "OrderedDict[str, _CachedPage]" = OrderedDict()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_started(self) -> bool:
+        return self._client is not None
+
+    async def start(self) -> None:
+        """
+        Apre il client HTTP condiviso (idempotente). Il browser del fallback viene
+        avviato solo alla prima pagina che lo richiede.
+        """
+        async with self._lock:
+            if self._client is None:
+                self._client = self._new_client()
+
+    async def close(self) -> None:
+        """Chiude il client HTTP condiviso e il fallback."""
+        async with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+        if hasattr(self.fallback, "close"):
+            await self.fallback.close()
+
+    async def __aenter__(self) -> "HttpScraperAdapter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=self._headers,
+            limits=self._limits,
+            timeout=self._timeout,
+            follow_redirects=True,
+        )
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        if not urls:
+            return []
+        if self._client is None:
+            async with self._new_client() as client:
+                fetched = await asyncio.gather(*(self._fetch(client, url) for url in urls))
+        else:
+            fetched = await asyncio.gather(*(self._fetch(self._client, url) for url in urls))
+
+        results: List[ScrapeResult] = [result for result, _ in fetched]
+        js_urls = [result.url for result, needs_js in fetched if needs_js]
+        if js_urls and self.fallback is not None:
+            if self.is_started and hasattr(self.fallback, "start"):
+                await self.fallback.start()
+            rendered: Dict[str, ScrapeResult] = {
+                r.url: r for r in await self.fallback.fetch_pages_content(js_urls)
+            }
+            results = [rendered.get(r.url, r) if r.url in js_urls else r for r in results]
+        return results
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Tuple[ScrapeResult, bool]:
+        """Scarica una pagina; ritorna il risultato e se serve il rendering nel browser."""
+        with get_tracer().span("http.fetch", url=url, host=httpx.URL(url).host) as span:
+            result, needs_js = await self._fetch_page(client, url)
+            span.update(status=result.status_code, success=result.success, needs_js=needs_js)
+            span["chars"] = len(result.content or "")
+        return result, needs_js
+
+    async def _fetch_page(self, client: httpx.AsyncClient, url: str) -> Tuple[ScrapeResult, bool]:
+        cached = self._cache.get(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        try:
+            response = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            return ScrapeResult(url=url, success=False, error=f"{type(e).__name__}: {e}"), False
+
+        if response.status_code == 304 and cached is not None:
+            self._cache.move_to_end(url)
+            return ScrapeResult(url=url, success=True, content=cached.content, status_code=304), False
+        if response.status_code >= 400:
+            return ScrapeResult(
+                url=url,
+                success=False,
+                error=f"HTTP {response.status_code}",
+                status_code=response.status_code,
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+            ), False
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            return ScrapeResult(
+                url=url,
+                success=False,
+                error=f"Contenuto non HTML: {content_type}",
+                status_code=response.status_code,
+            ), False
+
+        html = response.text
+        # La conversione HTML -> markdown è CPU-bound: fuori dall'event loop
+        markdown = await asyncio.to_thread(self._to_markdown, html, str(response.url))
+        result = ScrapeResult(url=url, success=True, content=markdown, status_code=response.status_code)
+        if needs_javascript(html, markdown, self.min_text_chars):
+            return result, True
+        self._remember(url, response, markdown)
+        return result, False
+
+    @staticmethod
+    def _to_markdown(html: str, base_url: str) -> str:
+        generator = DefaultMarkdownGenerator(content_filter=PruningContentFilter())
+        result = generator.generate_markdown(input_html=html, base_url=base_url)
+        return result.fit_markdown or result.raw_markdown
+
+    def _remember(self, url: str, response: httpx.Response, markdown: str) -> None:
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            self._cache.pop(url, None)
+            return
+        self._cache[url] = _CachedPage(etag=etag, last_modified=last_modified, content=markdown)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -1,4 +1,5 @@
 from app.ports.llm import LLMPort
+from app.ports.tracer import get_tracer
 from app.ports.models import (
     ArticleLinkExtractionInput,
     ArticleLinkExtractionOutput,
@@ -6,7 +7,7 @@ from app.ports.models import (
     SummarizePageInput,
     SummarizePageOutput,
 )
-from typing import List
+from typing import Dict, List, Optional
 from langchain_openai import ChatOpenAI
 from langchain_ollama import OllamaLLM
 from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
@@ -15,6 +16,13 @@ from enum import Enum
 
 # Prompt reali importati da src.prompts
 from app.adapters.prompts import extract_article_links_prompt, summarize_page_prompt
+from app.adapters.summary_cache import SummaryCache
+from src.chain_timing import TimedChain, new_timings_log, summarize_timings
+
+
+def _record_span(name: str, start_s: float, duration_s: float, **attrs) -> None:
+    # Tracer letto a ogni chiamata: può essere sostituito dopo la creazione dell'adapter
+    get_tracer().record_span(name, start_s, duration_s, **attrs)
 
 
 class ModelType(Enum):
@@ -27,44 +35,135 @@ class ModelType(Enum):
 class LangChainLLMAdapter(LLMPort):
     """
     Adapter concreto per LLM tramite LangChain.
+    Con raise_on_error gli errori vengono propagati invece di restituire un risultato
+    vuoto (necessario per ritentare le chiamate, vedi ResilientLLMAdapter).
     """
 
-    def __init__(self, model=ModelType.LLAMA):
+    def __init__(
+        self,
+        model=ModelType.LLAMA,
+        summary_cache: Optional[SummaryCache] = None,
+        raise_on_error: bool = False,
+    ):
+        self.model = model
+        self.summary_cache = summary_cache
+        self.raise_on_error = raise_on_error
         if model == ModelType.OPENAI:
             self.llm = ChatOpenAI(model_name=model.value, temperature=0)
         else:
             self.llm = OllamaLLM(model=model.value, temperature=0)
 
-    def extract_article_links(
-        self, data: ArticleLinkExtractionInput
-    ) -> ArticleLinkExtractionOutput:
+        # Prompt, parser e catene vengono costruiti una sola volta e riusati
+        self.timings = new_timings_log()
         link_list_parser = PydanticOutputParser(
             pydantic_object=ArticleLinkExtractionOutput
         )
-        prompt = PromptTemplate(
-            template=extract_article_links_prompt,
-            input_variables=["summary"],
-            partial_variables={
-                "format_instructions": link_list_parser.get_format_instructions()
-            },
+        self.extract_article_links_chain = TimedChain(
+            "extract_article_links",
+            PromptTemplate(
+                template=extract_article_links_prompt,
+                input_variables=["summary"],
+                partial_variables={
+                    "format_instructions": link_list_parser.get_format_instructions()
+                },
+            ),
+            self.llm,
+            link_list_parser,
+            self.timings,
+            _record_span,
+        )
+        self.summarize_page_chain = TimedChain(
+            "summarize_page",
+            PromptTemplate(
+                template=summarize_page_prompt,
+                input_variables=["page_representation"],
+            ),
+            self.llm,
+            StrOutputParser(),
+            self.timings,
+            _record_span,
         )
-        chain = prompt | self.llm | link_list_parser
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Tempi aggregati per operazione (render prompt, modello, parsing)."""
+        return summarize_timings(list(self.timings))
+
+    def extract_article_links(
+        self, data: ArticleLinkExtractionInput
+    ) -> ArticleLinkExtractionOutput:
         try:
-            result = chain.invoke({"summary": data.markdown})
+            result = self.extract_article_links_chain.invoke({"summary": data.markdown})
             return result
         except Exception as e:
+            if self.raise_on_error:
+                raise
             print(f"Errore durante l'estrazione dei link agli articoli: {e}")
-            return ArticleLinkExtractionOutput(links=[])
+            return ArticleLinkExtractionOutput(links=[], failed=True)
 
-    def summarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
-        prompt = PromptTemplate(
-            template=summarize_page_prompt,
-            input_variables=["page_representation"],
+    async def aextract_article_links(
+        self, data: ArticleLinkExtractionInput
+    ) -> ArticleLinkExtractionOutput:
+        try:
+            return await self.extract_article_links_chain.ainvoke(
+                {"summary": data.markdown}
+            )
+        except Exception as e:
+            if self.raise_on_error:
+                raise
+            print(f"Errore durante l'estrazione dei link agli articoli: {e}")
+            return ArticleLinkExtractionOutput(links=[], failed=True)
+
+    def _summary_cache_key(self, data: SummarizePageInput) -> Optional[str]:
+        if self.summary_cache is None:
+            return None
+        return SummaryCache.make_key(
+            self.model.value, summarize_page_prompt, data.page_representation
         )
-        chain = prompt | self.llm | StrOutputParser()
+
+    def _cached_summary(self, key: Optional[str]) -> Optional[SummarizePageOutput]:
+        if key is None:
+            return None
+        summary = self.summary_cache.get(key)
+        get_tracer().count("llm.summary_cache.hit" if summary is not None else "llm.summary_cache.miss")
+        if summary is None:
+            return None
+        return SummarizePageOutput(summary_markdown=summary)
+
+    def _store_summary(self, key: Optional[str], summary: str) -> None:
+        # I riassunti vuoti sono errori: non vanno messi in cache
+        if key is not None and summary:
+            self.summary_cache.set(key, summary)
+
+    def summarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        key = self._summary_cache_key(data)
+        cached = self._cached_summary(key)
+        if cached is not None:
+            return cached
+        try:
+            summary = self.summarize_page_chain.invoke(
+                {"page_representation": data.page_representation}
+            )
+            self._store_summary(key, summary)
+            return SummarizePageOutput(summary_markdown=summary)
+        except Exception as e:
+            if self.raise_on_error:
+                raise
+            print(f"Errore durante la generazione del riassunto: {e}")
+            return SummarizePageOutput(summary_markdown="")
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        key = self._summary_cache_key(data)
+        cached = self._cached_summary(key)
+        if cached is not None:
+            return cached
         try:
-            summary = chain.invoke({"page_representation": data.page_representation})
+            summary = await self.summarize_page_chain.ainvoke(
+                {"page_representation": data.page_representation}
+            )
+            self._store_summary(key, summary)
             return SummarizePageOutput(summary_markdown=summary)
         except Exception as e:
+            if self.raise_on_error:
+                raise
             print(f"Errore durante la generazione del riassunto: {e}")
             return SummarizePageOutput(summary_markdown="")
@@ -0,0 +1,179 @@
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Iterator, List
+from app.ports.tracer import TracerPort
+
+
+@dataclass
+class TraceEvent:
+    kind: str  # "span", "count" o "gauge"
+    name: str
+    start_s: float  # secondi dall'avvio del tracer
+    duration_s: float = 0.0
+    value: float = 0.0
+    track: int = 0  # task asyncio / thread che ha prodotto l'evento
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+class InMemoryTracer(TracerPort):
+    """
+    Tracer che conserva in memoria gli ultimi max_events eventi e li esporta come
+    JSON lines o nel formato Chrome trace (chrome://tracing, Perfetto).
+    Ogni task asyncio (o thread, fuori dai task) ha la sua traccia, così gli stage
+    concorrenti restano leggibili. Gli id delle tracce sono assegnati dal tracer e non
+    vengono mai riusati; i task terminati escono dalla tabella quando vengono raccolti.
+    """
+
+    def __init__(self, max_events: int = 200_000):
+        self.events: Deque[TraceEvent] = deque(maxlen=max_events)
+        self._origin = time.perf_counter()
+        self._task_tracks: "weakref.WeakKeyDictionary[asyncio.Task, int]" = weakref.WeakKeyDictionary()
+        self._thread_tracks = threading.local()
+        self._track_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is None:
+            track = getattr(self._thread_tracks, "track", None)
+            if track is None:
+                with self._lock:
+                    track = self._thread_tracks.track = next(self._track_ids)
+            return track
+        with self._lock:
+            track = self._task_tracks.get(task)
+            if track is None:
+                track = self._task_tracks[task] = next(self._track_ids)
+            return track
+
+    def _add(self, event: TraceEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            self.record_span(name, start, time.perf_counter() - start, **attrs)
+
+    def record_span(self, name: str, start_s: float, duration_s: float, **attrs: Any) -> None:
+        self._add(
+            TraceEvent(
+                kind="span",
+                name=name,
+                start_s=start_s - self._origin,
+                duration_s=duration_s,
+                track=self._track(),
+                attrs=attrs,
+            )
+        )
+
+    def count(self, name: str, value: float = 1, **attrs: Any) -> None:
+        self._add(
+            TraceEvent(
+                kind="count",
+                name=name,
+                start_s=time.perf_counter() - self._origin,
+                value=value,
+                track=self._track(),
+                attrs=attrs,
+            )
+        )
+
+    def gauge(self, name: str, value: float, **attrs: Any) -> None:
+        self._add(
+            TraceEvent(
+                kind="gauge",
+                name=name,
+                start_s=time.perf_counter() - self._origin,
+                value=value,
+                track=self._track(),
+                attrs=attrs,
+            )
+        )
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Aggregati per nome: numero, totale, media e massimo delle durate (span) o dei valori."""
+        with self._lock:
+            events = list(self.events)
+        summary: Dict[str, Dict[str, float]] = {}
+        for event in events:
+            if event.kind == "gauge":
+                continue
+            amount = event.duration_s if event.kind == "span" else event.value
+            agg = summary.setdefault(event.name, {"count": 0, "total": 0.0, "max": 0.0})
+            agg["count"] += 1
+            agg["total"] += amount
+            agg["max"] = max(agg["max"], amount)
+        for agg in summary.values():
+            agg["mean"] = agg["total"] / agg["count"]
+        return summary
+
+    def export_jsonl(self, path: str) -> None:
+        """Un evento JSON per riga, nell'ordine di registrazione."""
+        _ensure_parent_dir(path)
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w", encoding="utf-8") as f:
+            for event in events:
+                f.write(json.dumps(asdict(event), default=str) + "\n")
+
+    def export_chrome_trace(self, path: str) -> None:
+        """File JSON nel formato Trace Event di Chrome: span come eventi "X", contatori e gauge come "C"."""
+        _ensure_parent_dir(path)
+        with self._lock:
+            events = list(self.events)
+        trace_events: List[Dict[str, Any]] = []
+        totals: Dict[str, float] = {}
+        for event in events:
+            ts_us = event.start_s * 1e6
+            if event.kind == "span":
+                trace_events.append(
+                    {
+                        "name": event.name,
+                        "cat": event.name.split(".")[0],
+                        "ph": "X",
+                        "ts": ts_us,
+                        "dur": event.duration_s * 1e6,
+                        "pid": 1,
+                        "tid": event.track,
+                        "args": event.attrs,
+                    }
+                )
+                continue
+            # I contatori vengono esportati come totale cumulativo
+            value = event.value
+            if event.kind == "count":
+                totals[event.name] = totals.get(event.name, 0.0) + event.value
+                value = totals[event.name]
+            trace_events.append(
+                {
+                    "name": event.name,
+                    "ph": "C",
+                    "ts": ts_us,
+                    "pid": 1,
+                    "args": {"value": value},
+                }
+            )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, default=str)
+
+
+def _ensure_parent_dir(path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
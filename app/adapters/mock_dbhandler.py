@@ -1,15 +1,30 @@
-from typing import List, Optional
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Set
 from datetime import datetime
 from app.ports.dbhandler import DBHandlerPort
-from app.ports.models import NewsListingUrl, ArticleLinkDb
+from app.ports.models import (
+    NewsListingUrl,
+    ArticleLinkDb,
+    ArticleVisitUpdate,
+    ListingFingerprint,
+    PendingArticleLink,
+)
 
 class MockDBHandler(DBHandlerPort):
     """
     Implementazione mockata di DBHandlerPort per test e sviluppo senza database reale.
+    I link articoli sono indicizzati per URL e per stato visited (dict che preservano
+    l'ordine di inserimento), così lookup e inserimenti sono O(1).
     """
     def __init__(self):
         self._news_listing_urls = []
-        self._article_links = []
+        self._listing_fingerprints: Dict[str, ListingFingerprint] = {}
+        self._article_links: Dict[str, ArticleLinkDb] = {}
+        self._article_links_by_visited: Dict[bool, Dict[str, ArticleLinkDb]] = {
+            False: {},
+            True: {},
+        }
+        self._pending_article_links: Dict[str, PendingArticleLink] = {}
         self._news_listing_id = 1
         self._article_link_id = 1
 
@@ -22,8 +37,14 @@ class MockDBHandler(DBHandlerPort):
     def get_all_news_listing_urls(self) -> List[NewsListingUrl]:
         return list(self._news_listing_urls)
 
+    def get_listing_fingerprint(self, listing_url: str) -> Optional[ListingFingerprint]:
+        return self._listing_fingerprints.get(listing_url)
+
+    def save_listing_fingerprint(self, fingerprint: ListingFingerprint) -> None:
+        self._listing_fingerprints[fingerprint.listing_url] = fingerprint
+
     def add_article_link(self, url: str, added_at: Optional[datetime] = None) -> ArticleLinkDb:
-        if self.get_article_link_by_url(url):
+        if url in self._article_links:
             raise ValueError("Article link already exists")
         obj = ArticleLinkDb(
             id=self._article_link_id,
@@ -34,28 +55,64 @@ class MockDBHandler(DBHandlerPort):
             tags=None,
             visited_at=None
         )
-        self._article_links.append(obj)
+        self._article_links[url] = obj
+        self._article_links_by_visited[False][url] = obj
         self._article_link_id += 1
         return obj
 
     def get_article_link_by_url(self, url: str) -> Optional[ArticleLinkDb]:
-        for link in self._article_links:
-            if link.url == url:
-                return link
-        return None
+        return self._article_links.get(url)
 
     def get_all_article_links(self, visited: Optional[bool] = None) -> List[ArticleLinkDb]:
         if visited is None:
-            return list(self._article_links)
-        return [a for a in self._article_links if a.visited == visited]
+            return list(self._article_links.values())
+        return list(self._article_links_by_visited[visited].values())
+
+    def remove_article_link(self, url: str) -> None:
+        link = self._article_links.pop(url, None)
+        if link is not None:
+            del self._article_links_by_visited[link.visited][url]
 
     def mark_article_as_visited(self, url: str, summary: Optional[str] = None, tags: Optional[List[str]] = None) -> None:
         link = self.get_article_link_by_url(url)
         if not link:
             raise ValueError("Article link not found")
+        if not link.visited:
+            del self._article_links_by_visited[False][url]
+            self._article_links_by_visited[True][url] = link
         link.visited = True
         link.visited_at = datetime.utcnow()
         if summary:
             link.summary = summary
         if tags:
             link.tags = tags
+
+    def get_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        return {url for url in urls if url in self._article_links}
+
+    def add_article_links(self, urls: List[str], added_at: Optional[datetime] = None) -> List[ArticleLinkDb]:
+        if len(set(urls)) != len(urls) or self.get_existing_urls(urls):
+            raise ValueError("Article link already exists")
+        added_at = added_at or datetime.utcnow()
+        return [self.add_article_link(url, added_at=added_at) for url in urls]
+
+    def mark_articles_visited(self, updates: List[ArticleVisitUpdate]) -> None:
+        missing = [u.url for u in updates if u.url not in self._article_links]
+        if missing:
+            raise ValueError(f"Article link not found: {missing[0]}")
+        for update in updates:
+            self.mark_article_as_visited(update.url, summary=update.summary, tags=update.tags)
+
+    def get_pending_article_links(self) -> List[PendingArticleLink]:
+        return list(self._pending_article_links.values())
+
+    def save_pending_article_links(self, links: List[PendingArticleLink]) -> None:
+        for link in links:
+            previous = self._pending_article_links.get(link.url)
+            if previous is not None:
+                link = replace(link, added_at=previous.added_at)
+            self._pending_article_links[link.url] = link
+
+    def remove_pending_article_links(self, urls: Iterable[str]) -> None:
+        for url in urls:
+            self._pending_article_links.pop(url, None)
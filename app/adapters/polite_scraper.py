@@ -0,0 +1,253 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from app.ports.scraper import ScraperPort
+from app.ports.models import ScrapeResult
+from app.ports.tracer import get_tracer
+
+# Risposte che indicano di rallentare: si ritenta dopo Retry-After (o un backoff)
+_THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converte l'header Retry-After (secondi o data HTTP) in secondi di attesa."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+@dataclass
+class HostPolicy:
+    """Limiti per singolo host: richieste in volo e intervallo minimo tra due richieste."""
+
+    max_concurrency: int = 2
+    min_interval_s: float = 1.0
+
+
+@dataclass
+class _HostState:
+    max_concurrency: int
+    interval_s: float
+    next_request_at: float = 0.0
+    in_flight: int = 0
+
+
+class PoliteScraperAdapter(ScraperPort):
+    """
+    Scheduler "educato" davanti a un altro ScraperPort.
+
+    Ogni host ha un limite di richieste in volo e un intervallo minimo tra le richieste
+    (HostPolicy); un limite globale tiene basso il carico complessivo. Gli URL vengono
+    accodati alternando gli host (round-robin) e lo scheduler procede a turni: a ogni turno
+    gli URL che possono partire subito (host libero e fuori dall'intervallo minimo) vengono
+    passati insieme in un'unica chiamata allo scraper interno, così l'adapter sottostante
+    può condividere sessioni e connessioni. Mentre un host è in pausa gli altri continuano
+    a essere scaricati. Sulle risposte 429/503 l'host viene messo in pausa per il tempo
+    indicato da Retry-After (o con backoff esponenziale), il suo intervallo minimo viene
+    raddoppiato (almeno backoff_s) e la richiesta ritentata fino a max_retries volte.
+    request_timeout_s limita ogni chiamata allo scraper interno, non le attese tra i turni.
+    """
+
+    def __init__(
+        self,
+        inner: ScraperPort,
+        max_concurrency: int = 8,
+        default_policy: Optional[HostPolicy] = None,
+        host_policies: Optional[Dict[str, HostPolicy]] = None,
+        max_retries: int = 2,
+        backoff_s: float = 2.0,
+        max_wait_s: float = 120.0,
+        request_timeout_s: Optional[float] = None,
+    ):
+        self.inner = inner
+        self.max_concurrency = max_concurrency
+        self.default_policy = default_policy or HostPolicy()
+        self.host_policies = host_policies or {}
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_wait_s = max_wait_s
+        self.request_timeout_s = request_timeout_s
+        self._in_flight = 0
+        self._hosts: Dict[str, _HostState] = {}
+        # Segnala le chiamate concorrenti quando un turno termina e libera slot
+        self._released: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if hasattr(self.inner, "start"):
+            await self.inner.start()
+
+    async def close(self) -> None:
+        if hasattr(self.inner, "close"):
+            await self.inner.close()
+
+    async def __aenter__(self) -> "PoliteScraperAdapter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        if not urls:
+            return []
+        queue = interleave_by_host(list(dict.fromkeys(urls)))
+        attempts = {url: 0 for url in queue}
+        results: Dict[str, ScrapeResult] = {}
+        rounds: Set[asyncio.Task] = set()
+        try:
+            while queue or rounds:
+                batch, queue = self._take_round(queue)
+                if batch:
+                    rounds.add(asyncio.create_task(self._fetch_round(batch)))
+                    continue
+                wait_s = self._next_slot_in(queue)
+                released = asyncio.create_task(self._release_event().wait())
+                started = time.monotonic()
+                done, _ = await asyncio.wait(
+                    rounds | {released}, timeout=wait_s, return_when=asyncio.FIRST_COMPLETED
+                )
+                released.cancel()
+                if wait_s is not None and not done:
+                    get_tracer().count("scrape.politeness_wait_s", time.monotonic() - started)
+                for task in done & rounds:
+                    rounds.discard(task)
+                    for url, result in task.result():
+                        if result.status_code in _THROTTLE_STATUSES and attempts[url] < self.max_retries:
+                            self._throttle(url, result, attempts[url])
+                            attempts[url] += 1
+                            queue.append(url)
+                        else:
+                            results[url] = result
+        finally:
+            for task in rounds:
+                task.cancel()
+        return [results[url] for url in urls]
+
+    def batch_timeout_s(self, urls: List[str], request_timeout_s: float) -> float:
+        """
+        Limite superiore al tempo per scaricare urls: turni e intervalli minimi di ogni host,
+        pause già in corso, turni dovuti al limite globale e le pause per 429/503.
+        request_timeout_s è la durata massima di una richiesta (se non fissata qui).
+        """
+        request_timeout_s = self.request_timeout_s or request_timeout_s
+        by_host = Counter(_host(url) for url in dict.fromkeys(urls))
+        now = time.monotonic()
+        slowest = 0.0
+        for host, count in by_host.items():
+            state = self._host_state(host)
+            rounds = -(-count // state.max_concurrency)
+            paused = max(state.next_request_at - now, 0.0)
+            slowest = max(slowest, paused + count * state.interval_s + rounds * request_timeout_s)
+        global_rounds = -(-sum(by_host.values()) // self.max_concurrency)
+        throttled = self.max_retries * (self.max_wait_s + request_timeout_s)
+        return max(slowest, global_rounds * request_timeout_s) + throttled
+
+    def _host_state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            policy = self.host_policies.get(host, self.default_policy)
+            state = _HostState(max_concurrency=policy.max_concurrency, interval_s=policy.min_interval_s)
+            self._hosts[host] = state
+        return state
+
+    def _release_event(self) -> asyncio.Event:
+        if self._released is None:
+            self._released = asyncio.Event()
+        return self._released
+
+    def _take_round(self, queue: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Sceglie gli URL che possono partire ora e prenota i loro slot (host e globali).
+        Ritorna il turno e la coda residua, nello stesso ordine round-robin.
+        """
+        now = time.monotonic()
+        batch: List[str] = []
+        remaining: List[str] = []
+        for url in queue:
+            state = self._host_state(_host(url))
+            if (
+                self._in_flight >= self.max_concurrency
+                or state.in_flight >= state.max_concurrency
+                or state.next_request_at > now
+            ):
+                remaining.append(url)
+                continue
+            state.next_request_at = now + state.interval_s
+            state.in_flight += 1
+            self._in_flight += 1
+            batch.append(url)
+        return batch, remaining
+
+    def _next_slot_in(self, queue: List[str]) -> Optional[float]:
+        """Secondi al prossimo slot temporale libero; None se si attende solo la fine di un turno."""
+        if self._in_flight >= self.max_concurrency:
+            return None
+        now = time.monotonic()
+        waits = [
+            state.next_request_at - now
+            for state in (self._host_state(_host(url)) for url in queue)
+            if state.in_flight < state.max_concurrency
+        ]
+        return max(min(waits), 0.0) if waits else None
+
+    async def _fetch_round(self, batch: List[str]) -> List[Tuple[str, ScrapeResult]]:
+        get_tracer().count("scrape.polite_round_urls", len(batch))
+        try:
+            if self.request_timeout_s is not None:
+                results = await asyncio.wait_for(self.inner.fetch_pages_content(batch), self.request_timeout_s)
+            else:
+                results = await self.inner.fetch_pages_content(batch)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            results = [ScrapeResult(url=url, success=False, error=error) for url in batch]
+        finally:
+            for url in batch:
+                self._host_state(_host(url)).in_flight -= 1
+            self._in_flight -= len(batch)
+            self._release_event().set()
+            self._released = asyncio.Event()
+        return [
+            (url, results[i] if i < len(results) else ScrapeResult(url=url, success=False, error="Nessun risultato"))
+            for i, url in enumerate(batch)
+        ]
+
+    def _throttle(self, url: str, result: ScrapeResult, attempt: int) -> None:
+        """Mette in pausa l'host dopo un 429/503 e ne raddoppia l'intervallo minimo."""
+        state = self._host_state(_host(url))
+        wait = result.retry_after
+        if wait is None:
+            wait = self.backoff_s * (2 ** attempt)
+        wait = min(wait, self.max_wait_s)
+        state.next_request_at = max(state.next_request_at, time.monotonic() + wait)
+        state.interval_s = min(max(state.interval_s * 2, self.backoff_s), self.max_wait_s)
+        get_tracer().count("scrape.throttled", host=_host(url), status=result.status_code, wait_s=wait)
+        print(f"Host {_host(url)} limitato (HTTP {result.status_code}): nuovo tentativo tra {wait:.1f}s")
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+def interleave_by_host(urls: List[str]) -> List[str]:
+    """Riordina gli URL alternando gli host (round-robin), mantenendo l'ordine per host."""
+    by_host: "OrderedDict[str, List[str]]" = OrderedDict()
+    for url in urls:
+        by_host.setdefault(_host(url), []).append(url)
+    queues = [list(reversed(host_urls)) for host_urls in by_host.values()]
+    output: List[str] = []
+    while queues:
+        for queue in queues:
+            output.append(queue.pop())
+        queues = [queue for queue in queues if queue]
+    return output
@@ -0,0 +1,407 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, TypeVar
+from urllib.parse import urlparse
+from app.ports.llm import LLMPort
+from app.ports.scraper import ScraperPort
+from app.ports.models import (
+    ArticleLinkExtractionInput,
+    ArticleLinkExtractionOutput,
+    ScrapeResult,
+    SummarizePageInput,
+    SummarizePageOutput,
+)
+from app.ports.tracer import get_tracer
+
+T = TypeVar("T")
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Tentativi con backoff esponenziale e jitter: l'attesa prima del tentativo n+1 è
+    base_delay_s * 2**n (al più max_delay_s), ridotta casualmente fino alla quota jitter
+    per non far ripartire insieme tutti i worker. timeout_s limita ogni singola chiamata.
+    """
+
+    max_attempts: int = 3
+    base_delay_s: float = 1.0
+    max_delay_s: float = 30.0
+    jitter: float = 0.5
+    timeout_s: Optional[float] = None
+
+    def delay_for(self, attempt: int) -> float:
+        delay = min(self.base_delay_s * (2 ** attempt), self.max_delay_s)
+        return delay * (1 - self.jitter * random.random())
+
+
+@dataclass
+class ResilienceMetrics:
+    calls: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    failures: int = 0  # chiamate fallite anche dopo tutti i tentativi
+    breaker_wait_s: float = 0.0
+    breaker_trips: int = 0  # aggiornato dall'adapter a partire dal CircuitBreaker
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Interruttore per un backend: dopo failure_threshold fallimenti consecutivi si apre e
+    le chiamate restano in attesa (invece di fallire consumando la coda) per reset_timeout_s.
+    Poi passa una sola chiamata di prova: se riesce il circuito si richiude, altrimenti
+    si riapre per un altro intervallo.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+        probe_poll_s: float = 0.2,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.probe_poll_s = probe_poll_s
+        self.state = CircuitState.CLOSED
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def _try_acquire(self) -> Optional[float]:
+        """None se la chiamata può partire, altrimenti i secondi da attendere prima di riprovare."""
+        with self._lock:
+            if self.state == CircuitState.CLOSED:
+                return None
+            if self.state == CircuitState.OPEN:
+                remaining = self._opened_at + self.reset_timeout_s - time.monotonic()
+                if remaining <= 0:
+                    # Questa chiamata fa da prova
+                    self.state = CircuitState.HALF_OPEN
+                    return None
+                return remaining
+            return self.probe_poll_s
+
+    async def acquire(self) -> float:
+        """Attende che il circuito consenta la chiamata; ritorna i secondi attesi."""
+        waited = 0.0
+        while (wait := self._try_acquire()) is not None:
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def acquire_sync(self) -> float:
+        waited = 0.0
+        while (wait := self._try_acquire()) is not None:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+    def release_probe(self) -> None:
+        """Chiamata di prova annullata: la prossima chiamata può fare da prova subito."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN:
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic() - self.reset_timeout_s
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self.state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == CircuitState.HALF_OPEN or (
+                self.state == CircuitState.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self.state = CircuitState.OPEN
+                self._opened_at = time.monotonic()
+                self.trips += 1
+
+
+async def call_with_resilience(
+    call: Callable[[], Awaitable[T]],
+    is_failure: Callable[[T], bool],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    metrics: ResilienceMetrics,
+    backend: str = "",
+    first_attempt: int = 0,
+) -> T:
+    """
+    Esegue call con timeout, tentativi e circuit breaker. Un risultato per cui
+    is_failure è vero viene ritentato come un'eccezione; all'ultimo tentativo viene
+    restituito (o l'eccezione rilanciata) al chiamante. first_attempt > 0 indica che i
+    primi tentativi sono già stati fatti dal chiamante (es. in blocco con altre chiamate).
+    """
+    if not first_attempt:
+        metrics.calls += 1
+    for attempt in range(first_attempt, policy.max_attempts):
+        if attempt:
+            metrics.retries += 1
+            get_tracer().count("resilience.retry", backend=backend)
+            await asyncio.sleep(policy.delay_for(attempt - 1))
+        waited = await breaker.acquire()
+        if waited:
+            metrics.breaker_wait_s += waited
+            get_tracer().count("resilience.breaker_wait_s", waited, backend=backend)
+        last = attempt == policy.max_attempts - 1
+        try:
+            if policy.timeout_s is not None:
+                result = await asyncio.wait_for(call(), policy.timeout_s)
+            else:
+                result = await call()
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.timeouts += 1
+            breaker.record_failure()
+            if last:
+                metrics.failures += 1
+                raise
+            continue
+        if is_failure(result):
+            breaker.record_failure()
+            if last:
+                metrics.failures += 1
+                return result
+            continue
+        breaker.record_success()
+        return result
+    raise RuntimeError("RetryPolicy.max_attempts deve essere almeno 1")
+
+
+def is_transient_scrape_failure(result: ScrapeResult) -> bool:
+    """
+    Errori di rete/browser, timeout e 5xx sono transitori; i 4xx (pagina assente, accesso
+    negato) no. 429 e 503 sono lasciati allo scheduler (PoliteScraperAdapter), che li
+    ritenta rispettando Retry-After: ritentarli anche qui moltiplicherebbe le richieste.
+    """
+    if result.success or result.retry_after is not None or result.status_code in (429, 503):
+        return False
+    return result.status_code is None or result.status_code >= 500 or result.status_code == 408
+
+
+class ResilientScraperAdapter(ScraperPort):
+    """
+    Avvolge uno ScraperPort con tentativi, timeout e un circuit breaker per host.
+    Il primo tentativo passa insieme allo scraper interno gli URL degli host con circuito
+    chiuso; si ritentano poi, uno per URL, solo le pagine fallite per cause transitorie.
+    Va messo fuori dallo scheduler (PoliteScraperAdapter): le attese di backoff non occupano
+    gli slot degli host e un host che continua a fallire apre solo il proprio circuito.
+    policy.timeout_s vale per la singola richiesta: il timeout del blocco cresce con il numero
+    di turni per host (e, se lo scraper interno lo stima con batch_timeout_s, con le sue attese),
+    così intervalli minimi e Retry-After dello scheduler non fanno scadere tutto il blocco.
+    """
+
+    def __init__(
+        self,
+        inner: ScraperPort,
+        policy: Optional[RetryPolicy] = None,
+        breaker_factory: Optional[Callable[[], CircuitBreaker]] = None,
+    ):
+        self.inner = inner
+        self.policy = policy or RetryPolicy(timeout_s=120.0)
+        self.breaker_factory = breaker_factory or CircuitBreaker
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._metrics = ResilienceMetrics()
+
+    @property
+    def metrics(self) -> ResilienceMetrics:
+        self._metrics.breaker_trips = sum(b.trips for b in self._breakers.values())
+        return self._metrics
+
+    async def start(self) -> None:
+        if hasattr(self.inner, "start"):
+            await self.inner.start()
+
+    async def close(self) -> None:
+        if hasattr(self.inner, "close"):
+            await self.inner.close()
+
+    async def __aenter__(self) -> "ResilientScraperAdapter":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        host = (urlparse(url).hostname or "").lower()
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = self.breaker_factory()
+        return breaker
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        if not urls:
+            return []
+        unique = list(dict.fromkeys(urls))
+        # Gli host con circuito aperto (o in prova) passano dal percorso per singolo URL, che attende
+        batch = [url for url in unique if self._breaker(url).state == CircuitState.CLOSED]
+        results: Dict[str, ScrapeResult] = {}
+        if batch:
+            self._metrics.calls += len(batch)
+            for url, result in zip(batch, await self._fetch_batch(batch)):
+                if not is_transient_scrape_failure(result):
+                    self._breaker(url).record_success()
+                    results[url] = result
+                    continue
+                self._breaker(url).record_failure()
+                if self.policy.max_attempts <= 1:
+                    self._metrics.failures += 1
+                    results[url] = result
+        retry = [url for url in unique if url not in results]
+        retried = await asyncio.gather(
+            *(self._fetch_one(url, first_attempt=1 if url in batch else 0) for url in retry)
+        )
+        results.update(zip(retry, retried))
+        return [results[url] for url in urls]
+
+    def _batch_timeout(self, urls: List[str]) -> Optional[float]:
+        """Timeout del primo tentativo in blocco: policy.timeout_s per ogni turno di richieste."""
+        if self.policy.timeout_s is None:
+            return None
+        estimate = getattr(self.inner, "batch_timeout_s", None)
+        if estimate is not None:
+            return estimate(urls, self.policy.timeout_s)
+        # Caso peggiore senza informazioni sullo scraper interno: un URL per host alla volta
+        rounds = max(Counter((urlparse(url).hostname or "").lower() for url in urls).values())
+        return self.policy.timeout_s * rounds
+
+    async def _fetch_batch(self, urls: List[str]) -> List[ScrapeResult]:
+        """Primo tentativo in blocco; un'eccezione o un timeout fanno fallire tutto il blocco."""
+        timeout = self._batch_timeout(urls)
+        try:
+            if timeout is not None:
+                results = await asyncio.wait_for(self.inner.fetch_pages_content(urls), timeout)
+            else:
+                results = await self.inner.fetch_pages_content(urls)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                self._metrics.timeouts += 1
+            return [ScrapeResult(url=url, success=False, error=f"{type(e).__name__}: {e}") for url in urls]
+        return [
+            results[i] if i < len(results) else ScrapeResult(url=url, success=False, error="Nessun risultato")
+            for i, url in enumerate(urls)
+        ]
+
+    async def _fetch_one(self, url: str, first_attempt: int = 0) -> ScrapeResult:
+        async def call() -> ScrapeResult:
+            results = await self.inner.fetch_pages_content([url])
+            return results[0] if results else ScrapeResult(url=url, success=False, error="Nessun risultato")
+
+        try:
+            return await call_with_resilience(
+                call,
+                is_transient_scrape_failure,
+                self.policy,
+                self._breaker(url),
+                self._metrics,
+                backend="scraper",
+                first_attempt=first_attempt,
+            )
+        except Exception as e:
+            return ScrapeResult(url=url, success=False, error=f"{type(e).__name__}: {e}")
+
+
+class ResilientLLMAdapter(LLMPort):
+    """
+    Avvolge un LLMPort con tentativi, timeout e circuit breaker. L'adapter interno deve
+    sollevare le eccezioni (es. LangChainLLMAdapter(raise_on_error=True)); esauriti i
+    tentativi si restituisce il risultato vuoto, come faceva l'adapter prima.
+    Le varianti sincrone ritentano senza timeout per chiamata.
+    """
+
+    def __init__(
+        self,
+        inner: LLMPort,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.inner = inner
+        self.policy = policy or RetryPolicy(timeout_s=300.0)
+        self.breaker = breaker or CircuitBreaker()
+        self._metrics = ResilienceMetrics()
+
+    @property
+    def metrics(self) -> ResilienceMetrics:
+        self._metrics.breaker_trips = self.breaker.trips
+        return self._metrics
+
+    def __getattr__(self, name):
+        # timing_summary, summary_cache, ... dell'adapter interno
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _call_sync(self, call: Callable[[], T], fallback: T, operation: str) -> T:
+        self._metrics.calls += 1
+        for attempt in range(self.policy.max_attempts):
+            if attempt:
+                self._metrics.retries += 1
+                time.sleep(self.policy.delay_for(attempt - 1))
+            self._metrics.breaker_wait_s += self.breaker.acquire_sync()
+            try:
+                result = call()
+            except Exception as e:
+                self.breaker.record_failure()
+                print(f"Errore LLM ({operation}, tentativo {attempt + 1}): {type(e).__name__}: {e}")
+                continue
+            self.breaker.record_success()
+            return result
+        self._metrics.failures += 1
+        return fallback
+
+    async def _call_async(
+        self, call: Callable[[], Awaitable[T]], fallback: T, operation: str
+    ) -> T:
+        try:
+            return await call_with_resilience(
+                call, lambda _: False, self.policy, self.breaker, self._metrics, backend="llm"
+            )
+        except Exception as e:
+            print(f"Errore LLM ({operation}) dopo {self.policy.max_attempts} tentativi: {type(e).__name__}: {e}")
+            return fallback
+
+    def extract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        return self._call_sync(
+            lambda: self.inner.extract_article_links(data),
+            ArticleLinkExtractionOutput(links=[], failed=True),
+            "extract_article_links",
+        )
+
+    def summarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        return self._call_sync(
+            lambda: self.inner.summarize_page(data),
+            SummarizePageOutput(summary_markdown=""),
+            "summarize_page",
+        )
+
+    async def aextract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        return await self._call_async(
+            lambda: self.inner.aextract_article_links(data),
+            ArticleLinkExtractionOutput(links=[], failed=True),
+            "extract_article_links",
+        )
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        return await self._call_async(
+            lambda: self.inner.asummarize_page(data),
+            SummarizePageOutput(summary_markdown=""),
+            "summarize_page",
+        )
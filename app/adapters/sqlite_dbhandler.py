@@ -0,0 +1,293 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Set
+from app.ports.dbhandler import DBHandlerPort
+from app.ports.models import (
+    NewsListingUrl,
+    ArticleLinkDb,
+    ArticleVisitUpdate,
+    ListingFingerprint,
+    PendingArticleLink,
+)
+
+# SQLite limita il numero di parametri per statement: le query IN (...) vanno a blocchi
+_MAX_PARAMS_PER_QUERY = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news_listing_urls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS listing_fingerprints (
+    listing_url TEXT PRIMARY KEY,
+    page_hash TEXT NOT NULL,
+    block_hashes TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS article_links (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    visited INTEGER NOT NULL DEFAULT 0,
+    summary TEXT,
+    tags TEXT,
+    visited_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_article_links_url ON article_links(url);
+CREATE INDEX IF NOT EXISTS idx_article_links_visited ON article_links(visited);
+CREATE TABLE IF NOT EXISTS pending_article_links (
+    url TEXT PRIMARY KEY,
+    listing_url TEXT NOT NULL,
+    fetch_url TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    rank INTEGER NOT NULL DEFAULT 0,
+    published_at TEXT
+);
+"""
+
+_ARTICLE_COLUMNS = "id, url, added_at, visited, summary, tags, visited_at"
+_INSERT_ARTICLE_SQL = "INSERT INTO article_links (url, added_at, visited) VALUES (?, ?, 0)"
+_PENDING_COLUMNS = "url, listing_url, fetch_url, added_at, title, rank, published_at"
+# Un link escluso più volte resta con la data della prima esclusione
+_SAVE_PENDING_SQL = (
+    f"INSERT INTO pending_article_links ({_PENDING_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(url) DO UPDATE SET listing_url = excluded.listing_url, fetch_url = excluded.fetch_url, "
+    "title = excluded.title, rank = excluded.rank, published_at = excluded.published_at"
+)
+_MARK_VISITED_SQL = (
+    "UPDATE article_links SET visited = 1, visited_at = ?, "
+    "summary = COALESCE(?, summary), tags = COALESCE(?, tags) WHERE url = ?"
+)
+
+
+def _chunks(items: List[str], size: int = _MAX_PARAMS_PER_QUERY) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class SQLiteDBHandler(DBHandlerPort):
+    """
+    Implementazione di DBHandlerPort su SQLite: la storia dei link sopravvive tra un run e l'altro.
+    Indice univoco sull'URL degli articoli e indice su visited, journal in modalità WAL,
+    statement parametrici costanti (riusati dalla cache di sqlite3) e inserimenti bulk con executemany.
+    """
+
+    def __init__(self, path: str = "tech_daily_news.sqlite"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, cached_statements=256)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # --- News Listing URLs ---
+
+    def add_news_listing_url(self, url: str) -> NewsListingUrl:
+        added_at = datetime.utcnow()
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO news_listing_urls (url, added_at) VALUES (?, ?)",
+                (url, added_at.isoformat()),
+            )
+        return NewsListingUrl(id=cursor.lastrowid, url=url, added_at=added_at)
+
+    def get_all_news_listing_urls(self) -> List[NewsListingUrl]:
+        rows = self._conn.execute(
+            "SELECT id, url, added_at FROM news_listing_urls ORDER BY id"
+        ).fetchall()
+        return [
+            NewsListingUrl(id=row[0], url=row[1], added_at=datetime.fromisoformat(row[2]))
+            for row in rows
+        ]
+
+    def get_listing_fingerprint(self, listing_url: str) -> Optional[ListingFingerprint]:
+        row = self._conn.execute(
+            "SELECT listing_url, page_hash, block_hashes, updated_at FROM listing_fingerprints WHERE listing_url = ?",
+            (listing_url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return ListingFingerprint(
+            listing_url=row[0],
+            page_hash=row[1],
+            block_hashes=json.loads(row[2]),
+            updated_at=datetime.fromisoformat(row[3]),
+        )
+
+    def save_listing_fingerprint(self, fingerprint: ListingFingerprint) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO listing_fingerprints (listing_url, page_hash, block_hashes, updated_at) VALUES (?, ?, ?, ?)",
+                (
+                    fingerprint.listing_url,
+                    fingerprint.page_hash,
+                    json.dumps(fingerprint.block_hashes),
+                    fingerprint.updated_at.isoformat(),
+                ),
+            )
+
+    # --- Article Links ---
+
+    def add_article_link(self, url: str, added_at: Optional[datetime] = None) -> ArticleLinkDb:
+        added_at = added_at or datetime.utcnow()
+        try:
+            with self._conn:
+                cursor = self._conn.execute(_INSERT_ARTICLE_SQL, (url, added_at.isoformat()))
+        except sqlite3.IntegrityError:
+            raise ValueError("Article link already exists")
+        return ArticleLinkDb(id=cursor.lastrowid, url=url, added_at=added_at, visited=False)
+
+    def get_article_link_by_url(self, url: str) -> Optional[ArticleLinkDb]:
+        row = self._conn.execute(
+            f"SELECT {_ARTICLE_COLUMNS} FROM article_links WHERE url = ?", (url,)
+        ).fetchone()
+        return self._row_to_article(row) if row else None
+
+    def get_all_article_links(self, visited: Optional[bool] = None) -> List[ArticleLinkDb]:
+        if visited is None:
+            rows = self._conn.execute(
+                f"SELECT {_ARTICLE_COLUMNS} FROM article_links ORDER BY id"
+            ).fetchall()
+        else:
+            rows = self._conn.execute(
+                f"SELECT {_ARTICLE_COLUMNS} FROM article_links WHERE visited = ? ORDER BY id",
+                (int(visited),),
+            ).fetchall()
+        return [self._row_to_article(row) for row in rows]
+
+    def remove_article_link(self, url: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM article_links WHERE url = ?", (url,))
+
+    def mark_article_as_visited(self, url: str, summary: Optional[str] = None, tags: Optional[List[str]] = None) -> None:
+        self.mark_articles_visited([ArticleVisitUpdate(url=url, summary=summary, tags=tags)])
+
+    # --- Operazioni bulk ---
+
+    def get_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        urls = list(dict.fromkeys(urls))
+        existing: Set[str] = set()
+        for chunk in _chunks(urls):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT url FROM article_links WHERE url IN ({placeholders})", chunk
+            ).fetchall()
+            existing.update(row[0] for row in rows)
+        return existing
+
+    def add_article_links(self, urls: List[str], added_at: Optional[datetime] = None) -> List[ArticleLinkDb]:
+        if not urls:
+            return []
+        added_at = added_at or datetime.utcnow()
+        added_at_iso = added_at.isoformat()
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    _INSERT_ARTICLE_SQL, ((url, added_at_iso) for url in urls)
+                )
+        except sqlite3.IntegrityError:
+            # La transazione è già stata annullata: nessun link inserito
+            raise ValueError("Article link already exists")
+        ids = {}
+        for chunk in _chunks(urls):
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT url, id FROM article_links WHERE url IN ({placeholders})", chunk
+            ).fetchall()
+            ids.update(rows)
+        return [
+            ArticleLinkDb(id=ids[url], url=url, added_at=added_at, visited=False)
+            for url in urls
+        ]
+
+    def mark_articles_visited(self, updates: List[ArticleVisitUpdate]) -> None:
+        if not updates:
+            return
+        visited_at = datetime.utcnow().isoformat()
+        params = [
+            (
+                visited_at,
+                update.summary or None,
+                json.dumps(update.tags) if update.tags else None,
+                update.url,
+            )
+            for update in updates
+        ]
+        with self._conn:
+            cursor = self._conn.executemany(_MARK_VISITED_SQL, params)
+            if cursor.rowcount < len(updates):
+                missing = set(u.url for u in updates) - self.get_existing_urls(
+                    u.url for u in updates
+                )
+                if missing:
+                    # L'eccezione dentro il blocco `with` annulla tutti gli aggiornamenti
+                    raise ValueError(f"Article link not found: {sorted(missing)[0]}")
+
+    # --- Candidati non selezionati ---
+
+    def get_pending_article_links(self) -> List[PendingArticleLink]:
+        rows = self._conn.execute(
+            f"SELECT {_PENDING_COLUMNS} FROM pending_article_links ORDER BY added_at, url"
+        ).fetchall()
+        return [
+            PendingArticleLink(
+                url=row[0],
+                listing_url=row[1],
+                fetch_url=row[2],
+                added_at=datetime.fromisoformat(row[3]),
+                title=row[4],
+                rank=row[5],
+                published_at=datetime.fromisoformat(row[6]) if row[6] else None,
+            )
+            for row in rows
+        ]
+
+    def save_pending_article_links(self, links: List[PendingArticleLink]) -> None:
+        if not links:
+            return
+        with self._conn:
+            self._conn.executemany(
+                _SAVE_PENDING_SQL,
+                (
+                    (
+                        link.url,
+                        link.listing_url,
+                        link.fetch_url,
+                        link.added_at.isoformat(),
+                        link.title,
+                        link.rank,
+                        link.published_at.isoformat() if link.published_at else None,
+                    )
+                    for link in links
+                ),
+            )
+
+    def remove_pending_article_links(self, urls: Iterable[str]) -> None:
+        urls = list(dict.fromkeys(urls))
+        with self._conn:
+            for chunk in _chunks(urls):
+                placeholders = ",".join("?" * len(chunk))
+                self._conn.execute(
+                    f"DELETE FROM pending_article_links WHERE url IN ({placeholders})", chunk
+                )
+
+    @staticmethod
+    def _row_to_article(row) -> ArticleLinkDb:
+        return ArticleLinkDb(
+            id=row[0],
+            url=row[1],
+            added_at=datetime.fromisoformat(row[2]),
+            visited=bool(row[3]),
+            summary=row[4],
+            tags=json.loads(row[5]) if row[5] else None,
+            visited_at=datetime.fromisoformat(row[6]) if row[6] else None,
+        )
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def normalize_content(content: str) -> str:
+    """
+    Normalizza il contenuto di una pagina prima dell'hashing: spazi/a capo collassati.
+    Due scraping dello stesso articolo che differiscono solo per whitespace producono la stessa chiave.
+    """
+    return _WHITESPACE_RE.sub(" ", content).strip()
+
+
+class SummaryCache:
+    """
+    Cache persistente (SQLite) dei riassunti, indirizzata per contenuto.
+    La chiave è lo SHA-256 di (nome modello, template del prompt, contenuto normalizzato),
+    quindi cambiare modello o prompt invalida automaticamente le voci precedenti.
+    Le voci più vecchie di max_age_seconds vengono ignorate e rimosse; oltre max_entries
+    vengono eliminate quelle usate meno di recente.
+    """
+
+    def __init__(
+        self,
+        path: str = ".cache/summaries.sqlite",
+        max_entries: int = 10_000,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.stats = CacheStats()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, prompt_template: str, content: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model_name, prompt_template, normalize_content(content)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.evictions += 1
+                row = None
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE summaries SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+            return row[0]
+
+    def set(self, key: str, summary: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, summary, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and now - created_at > self.max_age_seconds
+
+    def _evict(self, now: float) -> None:
+        if self.max_age_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (now - self.max_age_seconds,)
+            )
+            self.stats.evictions += cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.stats.evictions += cursor.rowcount
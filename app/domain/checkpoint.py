@@ -0,0 +1,185 @@
+import datetime
+import json
+import os
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, Iterator, List, Optional
+from app.ports.models import ListingToArticles, NewArticleLink, ScrapeResult
+from app.domain.domain_utils import ArticleSummary
+
+_LISTINGS = "listings.jsonl"
+_EXTRACTED_LISTINGS = "extracted_listings.jsonl"
+_NEW_ARTICLES = "new_articles.jsonl"
+_ARTICLE_PAGES = "article_pages.jsonl"
+_SUMMARIES = "summaries.jsonl"
+_META = "meta.json"
+
+
+class RunCheckpoint:
+    """
+    Checkpoint su disco di un run della pipeline, in base_dir/<run_id>/.
+    L'output di ogni stage viene accodato a un file JSON lines appena prodotto (link estratti
+    dai listing, listing elaborati, nuovi articoli, pagine scaricate, riassunti), così dopo
+    un crash si può riprendere il run saltando il lavoro già fatto. Un'eventuale riga
+    troncata dal crash viene ignorata in lettura.
+    """
+
+    def __init__(self, base_dir: str = "runs", run_id: Optional[str] = None):
+        self.run_id = run_id or datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.path = os.path.join(base_dir, self.run_id)
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._checked_files = set()
+        if not os.path.exists(self._file(_META)):
+            self._write_meta({"run_id": self.run_id, "created_at": _now(), "completed": False})
+
+    @classmethod
+    def latest(cls, base_dir: str = "runs", include_completed: bool = False) -> Optional["RunCheckpoint"]:
+        """
+        Il run creato per ultimo in base_dir (di default solo tra quelli non completati).
+        Si confronta created_at di meta.json e non il nome della cartella: un run_id
+        scelto dall'utente non segue l'ordine cronologico.
+        """
+        if not os.path.isdir(base_dir):
+            return None
+        candidates = []
+        for run_id in os.listdir(base_dir):
+            meta_path = os.path.join(base_dir, run_id, _META)
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if include_completed or not meta.get("completed"):
+                candidates.append((meta.get("created_at", ""), run_id))
+        if not candidates:
+            return None
+        return cls(base_dir, max(candidates)[1])
+
+    # --- Metadati ---
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        with open(self._file(_META), encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def completed(self) -> bool:
+        return bool(self.meta.get("completed"))
+
+    def mark_completed(self) -> None:
+        meta = self.meta
+        meta.update(completed=True, completed_at=_now())
+        self._write_meta(meta)
+
+    # --- Scrittura (append + flush: una riga per elemento) ---
+
+    def save_extracted_listings(self, listings: List[ListingToArticles]) -> None:
+        """Link estratti da un listing, salvati prima del dedup sul DB."""
+        self._append(_EXTRACTED_LISTINGS, [asdict(item) for item in listings])
+
+    def save_listings(self, listings: List[ListingToArticles]) -> None:
+        self._append(_LISTINGS, [asdict(item) for item in listings])
+
+    def save_new_articles(self, articles: List[NewArticleLink]) -> None:
+        self._append(
+            _NEW_ARTICLES,
+            [
+                {
+                    "listing_url": a.listing_url,
+                    "url": a.url,
+                    "added_at": a.added_at.isoformat(),
+                    "fetch_url": a.fetch_url,
+                }
+                for a in articles
+            ],
+        )
+
+    def save_article_pages(self, pages: List[ScrapeResult]) -> None:
+        self._append(_ARTICLE_PAGES, [asdict(page) for page in pages])
+
+    def save_summaries(self, summaries: List[ArticleSummary]) -> None:
+        self._append(
+            _SUMMARIES,
+            [{"url": s.url, "summary": s.summary, "source_urls": s.source_urls} for s in summaries],
+        )
+
+    # --- Lettura ---
+
+    def load_extracted_listings(self) -> List[ListingToArticles]:
+        return [ListingToArticles(**row) for row in self._read(_EXTRACTED_LISTINGS)]
+
+    def load_listings(self) -> List[ListingToArticles]:
+        return [ListingToArticles(**row) for row in self._read(_LISTINGS)]
+
+    def load_new_articles(self) -> List[NewArticleLink]:
+        return [
+            NewArticleLink(
+                listing_url=row["listing_url"],
+                url=row["url"],
+                added_at=datetime.datetime.fromisoformat(row["added_at"]),
+                fetch_url=row.get("fetch_url"),
+            )
+            for row in self._read(_NEW_ARTICLES)
+        ]
+
+    def load_article_pages(self) -> Dict[str, ScrapeResult]:
+        """Ultimo risultato di scraping per URL."""
+        return {row["url"]: ScrapeResult(**row) for row in self._read(_ARTICLE_PAGES)}
+
+    def load_summaries(self) -> Dict[str, ArticleSummary]:
+        """Ultimo riassunto per URL (con gli URL dei quasi-duplicati collegati in seguito)."""
+        return {
+            row["url"]: ArticleSummary(
+                url=row["url"], summary=row["summary"], source_urls=row.get("source_urls")
+            )
+            for row in self._read(_SUMMARIES)
+        }
+
+    # --- Interni ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp = self._file(_META + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self._file(_META))
+
+    def _append(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        data = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        with self._lock:
+            if name not in self._checked_files:
+                # Dopo un crash l'ultima riga può essere incompleta: si riparte da una riga nuova
+                self._checked_files.add(name)
+                if not _ends_with_newline(self._file(name)):
+                    data = "\n" + data
+            with open(self._file(name), "a", encoding="utf-8") as f:
+                f.write(data)
+                f.flush()
+
+    def _read(self, name: str) -> Iterator[Dict[str, Any]]:
+        path = self._file(name)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Ultima riga scritta a metà durante un crash
+                    continue
+
+
+def _ends_with_newline(path: str) -> bool:
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
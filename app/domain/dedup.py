@@ -0,0 +1,176 @@
+import hashlib
+import re
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parametri di solo tracciamento (click id, campagne): chiavi generiche come ref, source,
+# src, share o amp possono selezionare contenuti diversi e restano nell'URL
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "ref_src", "ref_url", "cmpid",
+}
+_TRACKING_PREFIXES = ("utm_", "hmb_", "pk_", "itm_")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+# Cache AMP di Google: https://<host-con-trattini>.cdn.ampproject.org/c/s/<host>/<path>
+_AMP_CACHE_RE = re.compile(r"^/[cv]/(?:s/)?([^/]+)(/.*)?$")
+# /amp finale solo dopo uno slug di articolo (…/titolo-articolo/amp, …/12345/amp) e non come
+# secondo segmento (github.com/owner/amp è un repository); .amp.html come variante di .html
+_AMP_SUFFIX_RE = re.compile(r"(?<=/)([^/]*(?:-|\d)[^/]*)/amp/?$")
+_AMP_HTML_RE = re.compile(r"\.amp(\.html?)$")
+
+_MARKDOWN_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_WORD_RE = re.compile(r"\w+")
+
+SIMHASH_BITS = 64
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forma canonica di un URL, da usare solo per confrontare link (lo scraping usa l'URL
+    originale): schema e host in minuscolo, porta di default, fragment, parametri di
+    tracciamento e slash finale rimossi, parametri rimanenti ordinati. Le versioni AMP
+    vengono ricondotte all'originale solo per layout noti: cache cdn.ampproject.org,
+    suffisso .amp.html e /amp dopo uno slug di articolo con almeno due segmenti di path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+    port = parts.port
+    if host.endswith(".cdn.ampproject.org"):
+        match = _AMP_CACHE_RE.match(path)
+        if match:
+            host, path, port = match.group(1).lower(), match.group(2) or "/", None
+            scheme = "https" if parts.path[2:5] == "/s/" else "http"
+    netloc = host
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+
+    path = re.sub(r"/+", "/", path)
+    if path.strip("/").count("/") >= 2:
+        path = _AMP_SUFFIX_RE.sub(r"\1", path)
+    path = _AMP_HTML_RE.sub(r"\1", path)
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, path or "/", urlencode(sorted(query)), ""))
+
+
+def _shingles(markdown: str, size: int) -> List[str]:
+    words = _WORD_RE.findall(_MARKDOWN_LINK_RE.sub(r"\1", markdown).lower())
+    return [" ".join(words[i : i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(markdown: str, shingle_size: int = 3) -> Optional[int]:
+    """
+    SimHash a 64 bit degli shingle di parole del testo (link ridotti al loro testo).
+    Testi quasi uguali hanno hash a distanza di Hamming piccola. None se il testo è
+    troppo corto per un confronto affidabile.
+    """
+    shingles = set(_shingles(markdown, shingle_size))
+    if len(shingles) < 20:
+        return None
+    # Una stringa di bit per shingle; i bit a 1 si contano per colonna (zip + count in C)
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for s in shingles
+    ]
+    threshold = len(bits) / 2
+    value = 0
+    for column in zip(*bits):
+        value = (value << 1) | (column.count("1") > threshold)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateIndex:
+    """
+    Indice dei SimHash già visti con ricerca dei quasi-duplicati (distanza <= max_distance).
+    L'hash è diviso in max_distance + 1 bande: due hash entro la soglia coincidono
+    in almeno una banda, quindi basta confrontare i candidati che condividono una banda.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self._band_bits = -(-SIMHASH_BITS // self.bands)
+        self._tables: List[Dict[int, List[str]]] = [{} for _ in range(self.bands)]
+        self._hashes: Dict[str, int] = {}
+
+    def _band_keys(self, value: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(value >> (i * self._band_bits)) & mask for i in range(self.bands)]
+
+    def find(self, value: int) -> Optional[str]:
+        """Chiave del primo elemento indicizzato entro max_distance, se esiste."""
+        for table, band in zip(self._tables, self._band_keys(value)):
+            for key in table.get(band, ()):
+                if hamming_distance(self._hashes[key], value) <= self.max_distance:
+                    return key
+        return None
+
+    def add(self, key: str, value: int) -> None:
+        self._hashes[key] = value
+        for table, band in zip(self._tables, self._band_keys(value)):
+            table.setdefault(band, []).append(key)
+
+    def replace(self, key: str, new_key: str) -> None:
+        """Lo stesso hash resta indicizzato, ma sotto new_key."""
+        value = self._hashes.pop(key)
+        self._hashes[new_key] = value
+        for table, band in zip(self._tables, self._band_keys(value)):
+            keys = table[band]
+            keys[keys.index(key)] = new_key
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+
+class ContentDeduplicator:
+    """
+    Raggruppa le pagine scaricate con contenuto quasi identico: la prima pagina di ogni
+    gruppo viene riassunta, le altre vengono collegate ad essa (duplicates) senza
+    ulteriori chiamate all'LLM.
+    """
+
+    def __init__(self, max_distance: int = 3, shingle_size: int = 3):
+        self.shingle_size = shingle_size
+        self.index = NearDuplicateIndex(max_distance)
+        self.duplicates: Dict[str, List[str]] = {}
+
+    def register(self, url: str, content: str) -> Optional[str]:
+        """Indicizza la pagina; se è un quasi-duplicato ritorna l'URL della pagina originale."""
+        value = simhash(content, self.shingle_size)
+        if value is None:
+            return None
+        primary = self.index.find(value)
+        if primary is not None:
+            self.duplicates.setdefault(primary, []).append(url)
+            return primary
+        self.index.add(url, value)
+        return None
+
+    def promote(self, url: str) -> Optional[str]:
+        """
+        Sostituisce la pagina originale url (es. il cui riassunto è fallito) con il suo primo
+        quasi-duplicato, che diventa l'originale del gruppo; url passa tra i duplicati.
+        Ritorna il nuovo originale, o None se url non ha duplicati.
+        """
+        duplicates = self.duplicates.pop(url, [])
+        if not duplicates:
+            return None
+        primary = duplicates[0]
+        self.index.replace(url, primary)
+        self.duplicates[primary] = duplicates[1:] + [url]
+        return primary
+
+    def source_urls(self, url: str) -> List[str]:
+        """Tutti gli URL da cui proviene il contenuto della pagina url (lei compresa)."""
+        return [url] + self.duplicates.get(url, [])
@@ -1,47 +1,139 @@
 import asyncio
 import datetime
+from dataclasses import replace
+from urllib.parse import urlparse
+from app.ports.dbhandler import DBHandlerPort
 from app.ports.scraper import ScraperPort
 from app.ports.llm import LLMPort
-from typing import List, Dict
+from app.ports.tracer import get_tracer
+from typing import AsyncIterator, Callable, List, Dict, Optional
+from app.domain.token_budget import (
+    DEFAULT_TOKEN_BUDGET,
+    TokenBudget,
+    summarize_within_budget,
+)
+from app.domain.link_extraction import (
+    LinkPrefilterConfig,
+    extract_article_links_for_listing,
+)
+from app.domain.listing_fingerprint import extract_article_links_incremental
+from app.domain.dedup import ContentDeduplicator, canonicalize_url
+from app.domain.scoring import ArticleCandidate, ScoringConfig, collect_candidates, select_top_k
 from app.ports.models import (
     ScrapeResult,
     ArticleLinkExtractionInput,
     ListingToArticles,
     NewArticleLink,
+    PendingArticleLink,
     SummarizePageInput,
     SummarizePageOutput,
 )
 
 
+DEFAULT_SCRAPE_CHUNK_SIZE = 10
+DEFAULT_SCRAPE_MAX_CONCURRENCY = 3
+
+
+async def traced_fetch_pages(
+    scraper: ScraperPort, urls: List[str], stage: str = "scrape"
+) -> List[ScrapeResult]:
+    """
+    Chiama lo scraper registrando uno span per blocco e, per ogni host, i contatori
+    di pagine riuscite e fallite (`<stage>.success` / `<stage>.failure`).
+    """
+    tracer = get_tracer()
+    with tracer.span(f"{stage}.batch", urls=len(urls)) as span:
+        results = await scraper.fetch_pages_content(urls)
+        span["failures"] = sum(1 for res in results if not res.success)
+    for res in results:
+        host = urlparse(res.url).hostname or ""
+        if res.success:
+            tracer.count(f"{stage}.success", host=host)
+        else:
+            tracer.count(f"{stage}.failure", host=host, status=res.status_code, error=res.error)
+    return results
+
+
+def with_article_urls(
+    pages: List[ScrapeResult], article_links: List[NewArticleLink]
+) -> List[ScrapeResult]:
+    """Riporta i risultati scaricati da fetch_url sull'URL canonico dei rispettivi articoli."""
+    url_by_fetch_url = {a.fetch_url: a.url for a in article_links}
+    return [replace(res, url=url_by_fetch_url.get(res.url, res.url)) for res in pages]
+
+
+async def scrape_in_batches(
+    urls: List[str],
+    scraper: ScraperPort,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
+) -> AsyncIterator[ScrapeResult]:
+    """
+    Esegue lo scraping degli URL a blocchi di chunk_size, con al più max_concurrency
+    blocchi in volo contemporaneamente, e restituisce i ScrapeResult man mano che
+    i blocchi terminano (ordine di completamento, non di input).
+    """
+    if chunk_size < 1 or max_concurrency < 1:
+        raise ValueError("chunk_size e max_concurrency devono essere >= 1")
+    chunks = (urls[i : i + chunk_size] for i in range(0, len(urls), chunk_size))
+    pending = set()
+    try:
+        for chunk in chunks:
+            pending.add(asyncio.create_task(traced_fetch_pages(scraper, chunk)))
+            if len(pending) < max_concurrency:
+                continue
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                for res in task.result():
+                    yield res
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                for res in task.result():
+                    yield res
+    finally:
+        # Se il consumatore interrompe l'iterazione non lasciamo task orfani
+        for task in pending:
+            task.cancel()
+
+
 async def scrape_and_save_markdown(
-    urls: List[str], scraper: ScraperPort, output_path: str
+    urls: List[str],
+    scraper: ScraperPort,
+    output_path: str,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
 ):
     """
     Esegue scraping asincrono di una lista di URL e salva i risultati in un file markdown.
+    I risultati vengono scritti man mano che arrivano, senza tenerli tutti in memoria.
     """
-    tasks = [asyncio.create_task(scraper.fetch_pages_content([url])) for url in urls]
-    all_results = await asyncio.gather(*tasks)
-    # all_results è una lista di liste (ogni task restituisce una lista di ScrapeResult)
     with open(output_path, "w", encoding="utf-8") as f:
-        for results in all_results:
-            for res in results:
-                f.write(f"# {res.url}\n\n")
-                if res.success and res.content:
-                    f.write(res.content + "\n\n")
-                else:
-                    f.write(f"**Errore:** {res.error}\n\n")
+        async for res in scrape_in_batches(urls, scraper, chunk_size, max_concurrency):
+            f.write(f"# {res.url}\n\n")
+            if res.success and res.content:
+                f.write(res.content + "\n\n")
+            else:
+                f.write(f"**Errore:** {res.error}\n\n")
 
 
 async def scrape_and_return_markdown(
-    urls: List[str], scraper: ScraperPort
+    urls: List[str],
+    scraper: ScraperPort,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
 ) -> List[ScrapeResult]:
     """
     Esegue scraping asincrono di una lista di URL e restituisce i risultati come lista di ScrapeResult.
     """
-    tasks = [asyncio.create_task(scraper.fetch_pages_content([url])) for url in urls]
-    all_results = await asyncio.gather(*tasks)
-    # Appiattisce la lista di liste
-    return [res for results in all_results for res in results]
+    return [
+        res
+        async for res in scrape_in_batches(urls, scraper, chunk_size, max_concurrency)
+    ]
 
 
 async def extract_significant_links_from_markdown(
@@ -52,7 +144,7 @@ async def extract_significant_links_from_markdown(
     """
     links = []
     for markdown in markdown_list:
-        result = llm.extract_article_links(
+        result = await llm.aextract_article_links(
             ArticleLinkExtractionInput(markdown=markdown)
         )
         links.extend([l.link for l in result.links])
@@ -60,28 +152,48 @@ async def extract_significant_links_from_markdown(
 
 
 async def pipeline_listing_to_articles(
-    listing_urls: List[str], scraper: ScraperPort, llm: LLMPort
+    listing_urls: List[str],
+    scraper: ScraperPort,
+    llm: LLMPort,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
+    link_prefilter: Optional[LinkPrefilterConfig] = None,
+    db: Optional[DBHandlerPort] = None,
 ) -> List[ListingToArticles]:
     """
     Esegue scraping dei listing, estrae i markdown e i link articoli per ciascun listing.
+    I link passano prima dal filtro a regole (link_prefilter); all'LLM arrivano solo i candidati ambigui.
+    Con db l'estrazione è incrementale: solo i blocchi cambiati dall'ultimo run (vedi listing_fingerprint).
     Ritorna una lista di oggetti che associano ogni listing ai suoi articoli estratti.
     """
-    # Scraping asincrono dei listing
-    tasks = [
-        asyncio.create_task(scraper.fetch_pages_content([url])) for url in listing_urls
-    ]
-    all_results = await asyncio.gather(*tasks)
-    # all_results: List[List[ScrapeResult]]
-    results_flat = [res for results in all_results for res in results]
+    with get_tracer().span("pipeline.listing_to_articles", listings=len(listing_urls)):
+        return await _listing_to_articles(
+            listing_urls, scraper, llm, chunk_size, max_concurrency, link_prefilter, db
+        )
+
+
+async def _listing_to_articles(
+    listing_urls: List[str],
+    scraper: ScraperPort,
+    llm: LLMPort,
+    chunk_size: int,
+    max_concurrency: int,
+    link_prefilter: Optional[LinkPrefilterConfig],
+    db: Optional[DBHandlerPort],
+) -> List[ListingToArticles]:
     output: List[ListingToArticles] = []
-    for res in results_flat:
+    async for res in scrape_in_batches(
+        listing_urls, scraper, chunk_size, max_concurrency
+    ):
         if res.success and res.content:
-            article_links = [
-                l.link
-                for l in llm.extract_article_links(
-                    ArticleLinkExtractionInput(markdown=res.content)
-                ).links
-            ]
+            if db is not None:
+                article_links = await extract_article_links_incremental(
+                    res.url, res.content, llm, db, link_prefilter
+                )
+            else:
+                article_links = await extract_article_links_for_listing(
+                    res.url, res.content, llm, link_prefilter
+                )
             output.append(
                 ListingToArticles(
                     listing_url=res.url,
@@ -98,71 +210,261 @@ async def pipeline_listing_to_articles(
     return output
 
 
+def _fetch_url(url: str, originals: Dict[str, List[str]]) -> str:
+    """La variante originale da scaricare: quella già canonica, se c'è, altrimenti la prima incontrata."""
+    variants = originals.get(url) or [url]
+    return url if url in variants else variants[0]
+
+
+def _pending_candidate(link: PendingArticleLink, now: datetime.datetime) -> ArticleCandidate:
+    age_hours = None
+    if link.published_at is not None:
+        age_hours = max((now - link.published_at).total_seconds() / 3600, 0.0)
+    return ArticleCandidate(
+        url=link.url, listing_url=link.listing_url, title=link.title, rank=link.rank, age_hours=age_hours
+    )
+
+
 async def filter_and_save_new_articles(
-    db, listing_to_articles: List[ListingToArticles]
+    db: DBHandlerPort,
+    listing_to_articles: List[ListingToArticles],
+    max_articles: Optional[int] = None,
+    scoring: Optional[ScoringConfig] = None,
 ) -> List[NewArticleLink]:
     """
     Filtra i link articoli già presenti nel DB e salva solo i nuovi, associandoli al listing di provenienza.
+    Gli URL vengono confrontati e salvati in forma canonica (vedi dedup.canonicalize_url), così
+    varianti con parametri di tracciamento o AMP non diventano articoli distinti; ogni nuovo
+    articolo conserva in fetch_url l'URL originale del listing, che è quello da scaricare.
+    Il confronto con il DB usa sia la forma canonica sia quella originale, così trova anche
+    le righe salvate prima della canonicalizzazione.
+    Con max_articles vengono salvati solo i nuovi link con punteggio più alto (vedi scoring),
+    in ordine di punteggio. Gli altri finiscono tra i link in attesa del DB e tornano candidati
+    nei run successivi (per scoring.pending_max_age_h ore): con l'estrazione incrementale i
+    loro listing non li riproporrebbero più.
     Ritorna la lista dei nuovi articoli inseriti.
     """
-    new_articles: List[NewArticleLink] = []
+    # Primo listing in cui compare ciascun URL (dedup anche all'interno dello stesso run)
+    # e varianti originali di ciascun URL canonico
+    listing_by_url: Dict[str, str] = {}
+    originals: Dict[str, List[str]] = {}
     for item in listing_to_articles:
         for article_url in item.article_links:
-            # Verifica se già presente
-            if not db.get_article_link_by_url(article_url):
-                new_article = NewArticleLink(
-                    listing_url=item.listing_url,
-                    url=article_url,
-                    added_at=datetime.datetime.utcnow(),
-                )
-                db.add_article_link(article_url, added_at=new_article.added_at)
-                new_articles.append(new_article)
-    return new_articles
+            url = canonicalize_url(article_url)
+            listing_by_url.setdefault(url, item.listing_url)
+            if article_url not in originals.setdefault(url, []):
+                originals[url].append(article_url)
+    now = datetime.datetime.utcnow()
+    candidates: Dict[str, ArticleCandidate] = {}
+    pending: Dict[str, PendingArticleLink] = {}
+    expired: List[str] = []
+    if max_articles is not None:
+        scoring = scoring or ScoringConfig()
+        candidates = {c.url: c for c in collect_candidates(listing_to_articles, now)}
+        max_age = datetime.timedelta(hours=scoring.pending_max_age_h)
+        for link in db.get_pending_article_links():
+            if now - link.added_at > max_age:
+                expired.append(link.url)
+                continue
+            pending[link.url] = link
+            if link.url not in candidates:
+                candidates[link.url] = _pending_candidate(link, now)
+            if link.fetch_url not in originals.setdefault(link.url, []):
+                originals[link.url].append(link.fetch_url)
+        listing_by_url = {url: c.listing_url for url, c in candidates.items()}
+    if not listing_by_url and not expired:
+        return []
+
+    with get_tracer().span("db.filter_and_save_new_articles", links=len(listing_by_url)) as span:
+        lookup = set(listing_by_url)
+        lookup.update(original for url in listing_by_url for original in originals.get(url, []))
+        existing = db.get_existing_urls(lookup)
+        new_urls = [
+            url
+            for url in listing_by_url
+            if url not in existing and not existing.intersection(originals.get(url, []))
+        ]
+        span["new"] = len(new_urls)
+        unselected: List[str] = []
+        if max_articles is not None:
+            selected = select_top_k((candidates[url] for url in new_urls), max_articles, scoring)
+            selected_urls = {c.url for c in selected}
+            unselected = [url for url in new_urls if url not in selected_urls]
+            new_urls = [c.url for c in selected]
+            span["selected"] = len(new_urls)
+            span["pending"] = len(unselected)
+        if new_urls:
+            db.add_article_links(new_urls, added_at=now)
+        if max_articles is not None:
+            db.save_pending_article_links(
+                [
+                    PendingArticleLink(
+                        url=url,
+                        listing_url=candidates[url].listing_url,
+                        fetch_url=_fetch_url(url, originals),
+                        added_at=now,
+                        title=candidates[url].title,
+                        rank=candidates[url].rank,
+                        published_at=(
+                            now - datetime.timedelta(hours=candidates[url].age_hours)
+                            if candidates[url].age_hours is not None
+                            else None
+                        ),
+                    )
+                    for url in unselected
+                ]
+            )
+            # Scelti ora, già nel DB o scaduti: non sono più in attesa
+            done = set(unselected)
+            db.remove_pending_article_links([url for url in pending if url not in done] + expired)
+    return [
+        NewArticleLink(
+            listing_url=listing_by_url[url],
+            url=url,
+            added_at=now,
+            fetch_url=_fetch_url(url, originals),
+        )
+        for url in new_urls
+    ]
 
 
 async def scrape_articles_content(
-    article_links: List[NewArticleLink], scraper: ScraperPort
+    article_links: List[NewArticleLink],
+    scraper: ScraperPort,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
 ) -> List[ScrapeResult]:
     """
     Esegue scraping asincrono dei link articoli filtrati e ritorna i risultati.
     """
-    urls = [a.url for a in article_links]
-    tasks = [asyncio.create_task(scraper.fetch_pages_content([url])) for url in urls]
-    all_results = await asyncio.gather(*tasks)
-    return [res for results in all_results for res in results]
+    urls = [a.fetch_url for a in article_links]
+    pages = await scrape_and_return_markdown(urls, scraper, chunk_size, max_concurrency)
+    return with_article_urls(pages, article_links)
 
 
 class ArticleSummary:
-    def __init__(self, url: str, summary: str):
+    def __init__(self, url: str, summary: str, source_urls: Optional[List[str]] = None):
         self.url = url
         self.summary = summary
+        # Tutti gli URL con lo stesso contenuto (quasi-duplicati), url compreso
+        self.source_urls = source_urls or [url]
+
+
+class DuplicateSummaryLinker:
+    """
+    Collega i quasi-duplicati ai riassunti delle pagine originali, per entrambe le pipeline.
+    Le pagine dei duplicati il cui originale è ancora da riassumere restano da parte: se il
+    riassunto dell'originale fallisce, il primo duplicato viene riassunto al suo posto
+    (promote_duplicate) invece di essere eliminato insieme all'originale.
+    on_update riceve i riassunti i cui source_urls cambiano (es. per il checkpoint).
+    """
+
+    def __init__(
+        self,
+        deduplicator: Optional[ContentDeduplicator],
+        on_update: Optional[Callable[[ArticleSummary], None]] = None,
+    ):
+        self.deduplicator = deduplicator
+        self.on_update = on_update
+        self.summaries: Dict[str, ArticleSummary] = {}
+        self._pages: Dict[str, ScrapeResult] = {}
+
+    def link_duplicate(self, res: ScrapeResult) -> bool:
+        """Registra la pagina nell'indice; True se è un quasi-duplicato da non riassumere."""
+        if self.deduplicator is None or not (res.success and res.content):
+            return False
+        primary = self.deduplicator.register(res.url, res.content)
+        if primary is None:
+            return False
+        get_tracer().count("dedup.near_duplicate", url=res.url, primary=primary)
+        primary_summary = self.summaries.get(primary)
+        if primary_summary is None:
+            # Riassunto dell'originale ancora in corso: prenderà gli URL alla fine
+            self._pages[res.url] = res
+            return True
+        if not primary_summary.summary:
+            # Riassunto dell'originale fallito: questa pagina prende il suo posto
+            self.deduplicator.promote(primary)
+            return False
+        primary_summary.source_urls = self.deduplicator.source_urls(primary)
+        self._updated(primary_summary)
+        return True
+
+    def add_summary(self, url: str, summary: str) -> ArticleSummary:
+        """Riassunto di una pagina originale, con gli URL dei duplicati collegati finora."""
+        source_urls = self.deduplicator.source_urls(url) if self.deduplicator is not None else None
+        article_summary = ArticleSummary(url=url, summary=summary, source_urls=source_urls)
+        self.summaries[url] = article_summary
+        if summary:
+            for duplicate in article_summary.source_urls[1:]:
+                self._pages.pop(duplicate, None)
+        return article_summary
+
+    def promote_duplicate(self, failed: ArticleSummary) -> Optional[ScrapeResult]:
+        """Pagina del primo quasi-duplicato di un riassunto fallito, da riassumere al suo posto."""
+        if self.deduplicator is None:
+            return None
+        primary = self.deduplicator.promote(failed.url)
+        if primary is None:
+            return None
+        get_tracer().count("dedup.promoted", url=primary, failed=failed.url)
+        failed.source_urls = [failed.url]
+        self._updated(failed)
+        return self._pages.pop(primary, None)
+
+    def _updated(self, summary: ArticleSummary) -> None:
+        if self.on_update is not None:
+            self.on_update(summary)
 
 
 async def pipeline_scrape_and_summarize_articles(
     article_links: List[NewArticleLink],
     scraper: ScraperPort,
     llm: LLMPort,
-    max_parallel: int = 3
+    max_parallel: int = 3,
+    chunk_size: int = DEFAULT_SCRAPE_CHUNK_SIZE,
+    max_concurrency: int = DEFAULT_SCRAPE_MAX_CONCURRENCY,
+    token_budget: Optional[TokenBudget] = DEFAULT_TOKEN_BUDGET,
+    near_duplicate_distance: Optional[int] = 3,
 ) -> List[ArticleSummary]:
     """
     Scrapa il contenuto di ogni articolo e genera riassunto tramite LLM, con semaforo per il parallelismo.
+    Il contenuto viene ripulito e ridotto entro token_budget prima della sintesi (None per disattivare).
+    La sintesi di ogni articolo parte appena il relativo blocco di scraping è completato.
+    Le pagine quasi identiche a una già scaricata (SimHash entro near_duplicate_distance bit,
+    None per disattivare) non vengono riassunte: il loro URL finisce in source_urls del riassunto
+    della prima pagina.
+    L'ordine dei riassunti è quello di completamento: usare ArticleSummary.source_urls per associarli.
     """
-    urls = [a.url for a in article_links]
-    # Scraping asincrono dei contenuti
-    tasks = [asyncio.create_task(scraper.fetch_pages_content([url])) for url in urls]
-    all_results = await asyncio.gather(*tasks)
-    scrape_results: List[ScrapeResult] = [res for results in all_results for res in results]
-    output: List[ArticleSummary] = []
+    urls = [a.fetch_url for a in article_links]
     semaphore = asyncio.Semaphore(max_parallel)
+    linker = DuplicateSummaryLinker(
+        ContentDeduplicator(near_duplicate_distance) if near_duplicate_distance is not None else None
+    )
 
-    async def summarize_with_semaphore(res: ScrapeResult) -> ArticleSummary:
-        async with semaphore:
-            if res.success and res.content:
-                summary_obj: SummarizePageOutput = llm.summarize_page(SummarizePageInput(page_representation=res.content))
-                return ArticleSummary(url=res.url, summary=summary_obj.summary_markdown)
-            else:
-                return ArticleSummary(url=res.url, summary="")
+    async def summarize_with_semaphore(res: ScrapeResult) -> List[ArticleSummary]:
+        summaries: List[ArticleSummary] = []
+        page: Optional[ScrapeResult] = res
+        while page is not None:
+            summary = ""
+            if page.success and page.content:
+                async with semaphore:
+                    summary_obj: SummarizePageOutput = await summarize_within_budget(
+                        page.content, llm, token_budget
+                    )
+                summary = summary_obj.summary_markdown
+            article_summary = linker.add_summary(page.url, summary)
+            summaries.append(article_summary)
+            # Riassunto fallito: si riprova con il primo quasi-duplicato, se c'è
+            page = None if summary else linker.promote_duplicate(article_summary)
+        return summaries
 
-    summary_tasks = [asyncio.create_task(summarize_with_semaphore(res)) for res in scrape_results]
-    output = await asyncio.gather(*summary_tasks)
-    return output
+    with get_tracer().span("pipeline.scrape_and_summarize", articles=len(urls)):
+        summary_tasks = []
+        async for page in scrape_in_batches(urls, scraper, chunk_size, max_concurrency):
+            res = with_article_urls([page], article_links)[0]
+            if linker.link_duplicate(res):
+                continue
+            summary_tasks.append(asyncio.create_task(summarize_with_semaphore(res)))
+        output = await asyncio.gather(*summary_tasks)
+    return [summary for summaries in output for summary in summaries]
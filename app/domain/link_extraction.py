@@ -0,0 +1,258 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin, urldefrag, urlparse
+from app.ports.llm import LLMPort
+from app.ports.tracer import get_tracer
+from app.ports.models import ArticleLinkExtractionInput
+from app.domain.token_budget import estimate_tokens
+
+# [testo](url "titolo opzionale"), escluse le immagini ![alt](src)
+_MARKDOWN_LINK_RE = re.compile(
+    r'(?<!!)\[(?P<text>[^\]]*)\]\(\s*<?(?P<url>[^)\s>]+)>?(?:\s+"[^"]*")?\s*\)'
+)
+
+# Pattern di pagine di navigazione/meta validi per qualunque sito
+DEFAULT_DENY_PATTERNS = [
+    r"/item\?id=",
+    r"/user\?id=",
+    r"/hide\?",
+    r"/comments?(/|\?|$)",
+    r"/from\?site=",
+    r"/vote\?",
+    r"/reply\?",
+    r"/(login|logout|signup|register|submit)(/|\?|$)",
+    r"//(www\.)?(twitter|x)\.com/(intent|share)",
+    r"//(www\.)?facebook\.com/shar",
+    r"//(www\.)?linkedin\.com/share",
+]
+
+
+@dataclass
+class LinkFilterRules:
+    """
+    Regole per un host di listing.
+    allow_patterns: path dello stesso host (esattamente, non dei sottodomini) che sono
+    articoli (es. repository su GitHub).
+    external_links_are_articles: i link verso altri domini sono articoli (es. Hacker News).
+    """
+
+    deny_patterns: List[str] = field(default_factory=list)  # applicati all'URL completo
+    allow_patterns: List[str] = field(default_factory=list)  # applicati a path + query
+    external_links_are_articles: bool = False
+
+
+def _default_host_rules() -> Dict[str, LinkFilterRules]:
+    return {
+        "news.ycombinator.com": LinkFilterRules(
+            deny_patterns=[
+                r"news\.ycombinator\.com/(news|newest|front|ask|show|jobs|newcomments|past|lists)?(\?|$)",
+                # Link fissi del footer (API, FAQ, candidature YC)
+                r"github\.com/HackerNews/API",
+                r"ycombinator\.com/(legal|apply|security|faq|companies|jobs|contact)(/|\?|#|$)",
+            ],
+            external_links_are_articles=True,
+        ),
+        "github.com": LinkFilterRules(
+            deny_patterns=[
+                r"/(stargazers|forks|network|watchers)(/|$)",
+                r"github\.com/(sponsors|trending|topics|collections|features|pricing|about|login"
+                r"|settings|notifications|marketplace|explore|new|organizations|orgs|dashboard|codespaces"
+                r"|issues|pulls|search|site|enterprise|team|security|solutions|resources|readme"
+                r"|customer-stories|apps|account|join|signup|contact|events)(/|\?|$)",
+            ],
+            allow_patterns=[r"^/[^/?]+/[^/?]+$"],
+        ),
+    }
+
+
+@dataclass
+class LinkPrefilterConfig:
+    """
+    Configurazione del filtro deterministico dei link dei listing.
+    Per gli host in deterministic_hosts l'LLM non viene mai chiamato: i link ambigui vengono scartati.
+    """
+
+    deny_patterns: List[str] = field(default_factory=lambda: list(DEFAULT_DENY_PATTERNS))
+    host_rules: Dict[str, LinkFilterRules] = field(default_factory=_default_host_rules)
+    deterministic_hosts: Set[str] = field(
+        default_factory=lambda: {"news.ycombinator.com", "github.com"}
+    )
+
+    def rules_for(self, host: str) -> LinkFilterRules:
+        return self.host_rules.get(host) or LinkFilterRules()
+
+    def is_deterministic(self, host: str) -> bool:
+        return host in self.deterministic_hosts
+
+
+@dataclass
+class LinkCandidate:
+    url: str
+    text: str = ""
+
+
+@dataclass
+class LinkExtractionResult:
+    links: List[str] = field(default_factory=list)
+    failed: bool = False  # l'LLM non ha risposto: i candidati ambigui non sono stati valutati
+
+
+@dataclass
+class PrefilterResult:
+    accepted: List[LinkCandidate] = field(default_factory=list)
+    ambiguous: List[LinkCandidate] = field(default_factory=list)
+    rejected: int = 0
+
+
+# Suffissi pubblici di secondo livello più comuni (senza dipendere dalla Public Suffix List)
+_SECOND_LEVEL_SUFFIXES = {"co", "com", "net", "org", "gov", "edu", "ac", "ne", "or", "go"}
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def registrable_domain(host: str) -> str:
+    """
+    Dominio registrabile di un host: news.ycombinator.com -> ycombinator.com,
+    blog.example.co.uk -> example.co.uk. Approssimazione senza Public Suffix List.
+    """
+    labels = host.lower().rstrip(".").split(".")
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _strip_trailing_slash(url: str) -> str:
+    """https://github.com/a/b/ -> https://github.com/a/b (la radice "/" resta invariata)."""
+    parsed = urlparse(url)
+    if len(parsed.path) > 1 and parsed.path.endswith("/"):
+        return parsed._replace(path=parsed.path.rstrip("/") or "/").geturl()
+    return url
+
+
+def parse_markdown_links(markdown: str, base_url: str = "") -> List[LinkCandidate]:
+    """
+    Estrae i link [testo](url) dal markdown, risolvendo quelli relativi rispetto a base_url
+    e rimuovendo il fragment. Mantiene l'ordine di apparizione, senza duplicati.
+    """
+    seen: Set[str] = set()
+    candidates: List[LinkCandidate] = []
+    for match in _MARKDOWN_LINK_RE.finditer(markdown):
+        url = urldefrag(urljoin(base_url, match.group("url")))[0]
+        if url in seen:
+            continue
+        seen.add(url)
+        candidates.append(LinkCandidate(url=url, text=match.group("text").strip()))
+    return candidates
+
+
+def prefilter_article_links(
+    listing_url: str, markdown: str, config: Optional[LinkPrefilterConfig] = None
+) -> PrefilterResult:
+    """
+    Classifica i link di un listing senza LLM: scarta quelli che corrispondono ai pattern
+    di navigazione, accetta quelli che le regole dell'host identificano come articoli e
+    lascia "ambigui" i restanti (tipicamente link allo stesso host).
+    """
+    config = config or LinkPrefilterConfig()
+    listing_host = _host(listing_url)
+    listing_domain = registrable_domain(listing_host)
+    rules = config.rules_for(listing_host)
+    deny = [re.compile(p) for p in config.deny_patterns + rules.deny_patterns]
+    allow = [re.compile(p) for p in rules.allow_patterns]
+    listing_page = urldefrag(listing_url)[0].rstrip("/")
+
+    result = PrefilterResult()
+    seen: Set[str] = set()
+    for candidate in parse_markdown_links(markdown, listing_url):
+        # /a/b e /a/b/ sono la stessa pagina: un solo candidato, senza slash finale
+        candidate.url = _strip_trailing_slash(candidate.url)
+        if candidate.url in seen:
+            continue
+        seen.add(candidate.url)
+        parsed = urlparse(candidate.url)
+        if parsed.scheme not in ("http", "https") or candidate.url.rstrip("/") == listing_page:
+            result.rejected += 1
+            continue
+        if any(p.search(candidate.url) for p in deny):
+            result.rejected += 1
+            continue
+        # Esterni rispetto al dominio registrabile: ycombinator.com non è esterno a news.ycombinator.com
+        if registrable_domain(_host(candidate.url)) != listing_domain:
+            if rules.external_links_are_articles:
+                result.accepted.append(candidate)
+            else:
+                result.ambiguous.append(candidate)
+            continue
+        # allow_patterns descrivono i path dell'host del listing: su altri sottodomini
+        # (docs.github.com/en/foo) lo stesso path non è un articolo
+        path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        if _host(candidate.url) == listing_host and any(p.search(path) for p in allow):
+            result.accepted.append(candidate)
+        else:
+            result.ambiguous.append(candidate)
+    return result
+
+
+def format_link_candidates(candidates: List[LinkCandidate]) -> str:
+    """Rappresentazione compatta dei candidati da passare all'LLM (una riga per link)."""
+    return "\n".join(f"Link: {c.url}, Text: {c.text}" for c in candidates)
+
+
+async def extract_article_links_for_listing(
+    listing_url: str,
+    markdown: str,
+    llm: LLMPort,
+    config: Optional[LinkPrefilterConfig] = None,
+) -> List[str]:
+    """
+    Estrae i link agli articoli di un listing: prima il filtro a regole, poi l'LLM solo
+    sui candidati ambigui (e mai per gli host configurati come deterministici).
+    L'output dell'LLM è limitato ai candidati inviati, così non può inventare URL.
+    """
+    return (await extract_listing_links(listing_url, markdown, llm, config)).links
+
+
+async def extract_listing_links(
+    listing_url: str,
+    markdown: str,
+    llm: LLMPort,
+    config: Optional[LinkPrefilterConfig] = None,
+) -> LinkExtractionResult:
+    """Come extract_article_links_for_listing, segnalando se la chiamata all'LLM è fallita."""
+    config = config or LinkPrefilterConfig()
+    tracer = get_tracer()
+    host = _host(listing_url)
+    prefiltered = prefilter_article_links(listing_url, markdown, config)
+    tracer.count("links.accepted", len(prefiltered.accepted), host=host)
+    tracer.count("links.ambiguous", len(prefiltered.ambiguous), host=host)
+    tracer.count("links.rejected", prefiltered.rejected, host=host)
+    links = [c.url for c in prefiltered.accepted]
+    if not prefiltered.ambiguous or config.is_deterministic(host):
+        return LinkExtractionResult(links)
+
+    candidates_markdown = format_link_candidates(prefiltered.ambiguous)
+    input_tokens = estimate_tokens(candidates_markdown)
+    with tracer.span(
+        "llm.extract_article_links",
+        host=host,
+        candidates=len(prefiltered.ambiguous),
+        input_tokens=input_tokens,
+    ) as span:
+        extraction = await llm.aextract_article_links(
+            ArticleLinkExtractionInput(markdown=candidates_markdown)
+        )
+        span["links"] = len(extraction.links)
+    tracer.count("llm.input_tokens", input_tokens, operation="extract_article_links")
+    ambiguous_urls = {c.url for c in prefiltered.ambiguous}
+    seen = set(links)
+    for link in extraction.links:
+        if link.link in ambiguous_urls and link.link not in seen:
+            seen.add(link.link)
+            links.append(link.link)
+    return LinkExtractionResult(links, failed=extraction.failed)
@@ -0,0 +1,124 @@
+import datetime
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from app.ports.dbhandler import DBHandlerPort
+from app.ports.llm import LLMPort
+from app.ports.models import ListingFingerprint
+from app.ports.tracer import get_tracer
+from app.domain.link_extraction import (
+    LinkPrefilterConfig,
+    extract_listing_links,
+    parse_markdown_links,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class LinkBlock:
+    """Riga del listing che contiene almeno un link, con l'hash dei soli URL dei suoi link."""
+
+    text: str
+    hash: str
+
+
+@dataclass
+class ListingDelta:
+    """
+    Confronto tra il contenuto appena scaricato di un listing e l'impronta precedente.
+    markdown è ciò che va passato all'estrazione dei link: il listing intero al primo
+    passaggio, solo i blocchi nuovi in seguito, stringa vuota se non è cambiato nulla.
+    """
+
+    fingerprint: ListingFingerprint
+    markdown: str
+    total_blocks: int = 0
+    new_blocks: List[LinkBlock] = field(default_factory=list)
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.markdown
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_link_blocks(markdown: str) -> List[LinkBlock]:
+    """
+    Divide il markdown di un listing in blocchi, uno per riga con link.
+    L'hash considera solo gli URL dei link della riga: il resto della riga (posizione in
+    classifica, punti) e il testo dei link cambiano a ogni run senza che l'elemento sia
+    nuovo, es. su Hacker News "[45 comments](item?id=...)" e "[2 hours ago](item?id=...)".
+    Le righe senza link non possono produrre articoli e vengono ignorate.
+    """
+    blocks: List[LinkBlock] = []
+    for line in markdown.splitlines():
+        links = parse_markdown_links(line)
+        if not links:
+            continue
+        key = "\n".join(link.url for link in links)
+        blocks.append(LinkBlock(text=line.strip(), hash=_sha256(key)))
+    return blocks
+
+
+def compute_listing_delta(
+    listing_url: str, markdown: str, previous: Optional[ListingFingerprint]
+) -> ListingDelta:
+    """
+    Calcola l'impronta del listing (hash della pagina normalizzata e hash dei blocchi)
+    e la differenza rispetto a quella precedente.
+    """
+    blocks = split_link_blocks(markdown)
+    fingerprint = ListingFingerprint(
+        listing_url=listing_url,
+        page_hash=_sha256(_WHITESPACE_RE.sub(" ", markdown).strip()),
+        block_hashes=list(dict.fromkeys(block.hash for block in blocks)),
+        updated_at=datetime.datetime.utcnow(),
+    )
+    if previous is None:
+        return ListingDelta(fingerprint, markdown, len(blocks), blocks)
+    if previous.page_hash == fingerprint.page_hash:
+        return ListingDelta(fingerprint, "", len(blocks))
+
+    known = set(previous.block_hashes)
+    new_blocks: List[LinkBlock] = []
+    for block in blocks:
+        if block.hash not in known:
+            known.add(block.hash)
+            new_blocks.append(block)
+    delta_markdown = "\n".join(block.text for block in new_blocks)
+    return ListingDelta(fingerprint, delta_markdown, len(blocks), new_blocks)
+
+
+async def extract_article_links_incremental(
+    listing_url: str,
+    markdown: str,
+    llm: LLMPort,
+    db: DBHandlerPort,
+    config: Optional[LinkPrefilterConfig] = None,
+) -> List[str]:
+    """
+    Come extract_article_links_for_listing, ma confronta il listing con l'impronta salvata
+    nel DB: un listing invariato non passa dall'estrazione, uno cambiato in parte invia
+    solo i blocchi nuovi. L'impronta viene aggiornata solo dopo un'estrazione completata:
+    se l'LLM fallisce resta quella precedente e i blocchi nuovi vengono ritentati al run successivo.
+    """
+    delta = compute_listing_delta(listing_url, markdown, db.get_listing_fingerprint(listing_url))
+    get_tracer().count(
+        "listing.unchanged" if delta.unchanged else "listing.new_blocks",
+        1 if delta.unchanged else len(delta.new_blocks),
+        listing=listing_url,
+        blocks=delta.total_blocks,
+    )
+    links: List[str] = []
+    if not delta.unchanged:
+        extraction = await extract_listing_links(listing_url, delta.markdown, llm, config)
+        links = extraction.links
+        if extraction.failed:
+            get_tracer().count("listing.extraction_failed", listing=listing_url)
+            return links
+    db.save_listing_fingerprint(delta.fingerprint)
+    return links
@@ -1,6 +1,6 @@
 from typing import List
 from app.ports.dbhandler import DBHandlerPort
-from app.ports.models import NewArticleLink, ArticleSummary
+from app.ports.models import NewArticleLink, ArticleSummary, ArticleVisitUpdate
 from datetime import datetime
 
 def update_db_with_summaries(
@@ -9,19 +9,35 @@ def update_db_with_summaries(
     summaries: List[ArticleSummary],
 ) -> List[ArticleSummary]:
     """
-    Aggiorna il db con il riassunto di ogni articolo. Se il riassunto è vuoto, rimuove l'articolo dal db.
-    Ritorna la lista di articoli validi (con riassunto).
+    Aggiorna il db con il riassunto di ogni articolo (una sola operazione bulk). Se il riassunto è vuoto, rimuove l'articolo dal db.
+    Un riassunto condiviso da più articoli quasi identici (source_urls) li marca tutti come visitati.
+    Ritorna la lista di articoli validi (con riassunto), ciascuno una sola volta.
     """
     valid_articles = []
-    for art, summary in zip(new_articles, summaries):
+    visited_updates: List[ArticleVisitUpdate] = []
+    # I riassunti arrivano in ordine di completamento: associali agli articoli per URL.
+    # Un URL può avere un riassunto fallito e poi uno riuscito (quasi-duplicato riassunto al
+    # posto dell'originale): vince quello riuscito
+    summaries_by_url = {}
+    for summary in summaries:
+        for url in summary.source_urls or [summary.url]:
+            if summary.summary or url not in summaries_by_url:
+                summaries_by_url[url] = summary
+    seen = set()
+    for art in new_articles:
+        summary = summaries_by_url.get(art.url)
+        if summary is None:
+            continue
         if summary.summary:
-            db.mark_article_as_visited(art.url, summary=summary.summary)
-            valid_articles.append(summary)
+            visited_updates.append(ArticleVisitUpdate(url=art.url, summary=summary.summary))
+            if id(summary) not in seen:
+                seen.add(id(summary))
+                valid_articles.append(summary)
         else:
-            # Rimuovi l'articolo dal db se il riassunto fallisce
-            # (implementa remove_article_link se non esiste)
-            if hasattr(db, 'remove_article_link'):
-                db.remove_article_link(art.url)
+            # Riassunto fallito: l'articolo esce dal db, così un run successivo può riproporlo
+            db.remove_article_link(art.url)
+    if visited_updates:
+        db.mark_articles_visited(visited_updates)
     return valid_articles
 
 
@@ -39,6 +55,8 @@ def generate_newsletter_markdown(
     newsletter_parts = [newsletter_title, newsletter_date, "\n---\n"]
     for idx, art in enumerate(article_summaries):
         newsletter_parts.append(f"{art.summary}")
+        if len(art.source_urls) > 1:
+            newsletter_parts.append("\n\nFonti: " + ", ".join(art.source_urls) + "\n")
         if idx < len(article_summaries) - 1:
             newsletter_parts.append("\n---\n")
     newsletter_md = "".join(newsletter_parts)
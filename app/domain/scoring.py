@@ -0,0 +1,193 @@
+import datetime
+import heapq
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+from app.ports.models import ListingToArticles
+from app.domain.dedup import canonicalize_url
+from app.domain.link_extraction import parse_markdown_links
+
+# "3 hours ago", "1 day ago" nella riga del link o in quella successiva (es. Hacker News)
+_AGE_RE = re.compile(r"\b(\d+)\s+(minute|hour|day|week)s?\s+ago\b", re.IGNORECASE)
+# Data nel path, es. /2024/05/12/ o /2024-05-12-
+_URL_DATE_RE = re.compile(r"/(20\d{2})[/-](\d{1,2})[/-](\d{1,2})(?:[/-]|$)")
+_AGE_UNIT_HOURS = {"minute": 1 / 60, "hour": 1.0, "day": 24.0, "week": 168.0}
+_WORD_RE = re.compile(r"\w+")
+# Host senza passare da urlparse, che domina il costo su centinaia di migliaia di candidati
+_HOST_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^@/?#]*@)?([^:/?#]+)")
+
+
+@dataclass
+class ScoringConfig:
+    """
+    Pesi del punteggio con cui si scelgono i nuovi articoli da elaborare quando il run
+    ha un limite (max_articles). Il punteggio usa solo dati già disponibili dopo
+    l'estrazione dei link: posizione nel listing, peso della fonte, età dichiarata,
+    parole chiave dei topic nel titolo e numero di listing che riportano lo stesso articolo.
+    """
+
+    topics: List[str] = field(default_factory=list)
+    # Peso per host (dell'articolo o, in mancanza, del listing); 1.0 se assente
+    source_weights: Dict[str, float] = field(default_factory=dict)
+    rank_weight: float = 1.0
+    recency_weight: float = 1.0
+    topic_weight: float = 1.0
+    duplicate_weight: float = 0.5
+    recency_half_life_h: float = 24.0
+    # I nuovi articoli non scelti restano candidati nei run successivi per al più queste ore
+    pending_max_age_h: float = 72.0
+
+
+@dataclass
+class ArticleCandidate:
+    """Link articolo (URL canonico) con i dati del listing in cui compare per primo."""
+
+    url: str
+    listing_url: str
+    title: str = ""
+    rank: int = 0
+    age_hours: Optional[float] = None
+    occurrences: int = 1  # listing (o titoli uguali) che riportano lo stesso articolo
+    score: float = 0.0
+
+
+def _host(url: str) -> str:
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _title_key(title: str) -> str:
+    return " ".join(_WORD_RE.findall(title.lower()))
+
+
+def _age_hours(url: str, context: str, now: datetime.datetime) -> Optional[float]:
+    match = _AGE_RE.search(context)
+    if match:
+        return int(match.group(1)) * _AGE_UNIT_HOURS[match.group(2).lower()]
+    match = _URL_DATE_RE.search(urlparse(url).path)
+    if match:
+        try:
+            published = datetime.datetime(*(int(g) for g in match.groups()))
+        except ValueError:
+            return None
+        return max((now - published).total_seconds() / 3600, 0.0)
+    return None
+
+
+def collect_candidates(
+    listings: Iterable[ListingToArticles], now: Optional[datetime.datetime] = None
+) -> List[ArticleCandidate]:
+    """
+    Un candidato per URL canonico, nell'ordine di apparizione. Titolo, posizione (tra i
+    link articolo del listing) ed età vengono dal markdown del listing; occurrences conta
+    quante volte lo stesso articolo compare, per URL o per titolo identico.
+    """
+    now = now or datetime.datetime.utcnow()
+    by_url: Dict[str, ArticleCandidate] = {}
+    for item in listings:
+        article_urls = {canonicalize_url(url) for url in item.article_links}
+        lines = item.markdown.splitlines()
+        rank = 0
+        for i, line in enumerate(lines):
+            for link in parse_markdown_links(line, item.listing_url):
+                url = canonicalize_url(link.url)
+                if url not in article_urls:
+                    continue
+                article_urls.discard(url)
+                if url in by_url:
+                    by_url[url].occurrences += 1
+                    continue
+                context = line if i + 1 >= len(lines) else f"{line}\n{lines[i + 1]}"
+                by_url[url] = ArticleCandidate(
+                    url=url,
+                    listing_url=item.listing_url,
+                    title=link.text,
+                    rank=rank,
+                    age_hours=_age_hours(url, context, now),
+                )
+                rank += 1
+        # Link restituiti dall'estrazione ma non trovati nel markdown: in fondo al listing
+        for url in sorted(article_urls):
+            if url in by_url:
+                by_url[url].occurrences += 1
+            else:
+                by_url[url] = ArticleCandidate(url=url, listing_url=item.listing_url, rank=rank)
+                rank += 1
+
+    by_title: Dict[str, List[ArticleCandidate]] = {}
+    for candidate in by_url.values():
+        key = _title_key(candidate.title)
+        if key:
+            by_title.setdefault(key, []).append(candidate)
+    for group in by_title.values():
+        if len(group) > 1:
+            for candidate in group:
+                candidate.occurrences = max(candidate.occurrences, len(group))
+    return list(by_url.values())
+
+
+def _make_scorer(config: ScoringConfig) -> Callable[[ArticleCandidate], float]:
+    """
+    Funzione di punteggio per config: i topic sono compilati in un'unica regex e i pesi
+    delle fonti memorizzati per host, così il costo per candidato resta di pochi microsecondi.
+    """
+    topics = sorted({topic.lower() for topic in config.topics if topic.strip()}, key=len, reverse=True)
+    topic_re = re.compile(r"\b(" + "|".join(map(re.escape, topics)) + r")\b") if topics else None
+    weights = config.source_weights
+
+    @lru_cache(maxsize=4096)
+    def listing_weight(listing_url: str) -> float:
+        return weights.get(_host(listing_url), 1.0)
+
+    def source_weight(candidate: ArticleCandidate) -> float:
+        if not weights:
+            return 1.0
+        match = _HOST_RE.match(candidate.url)
+        host = match.group(1).lower() if match else ""
+        host = host[4:] if host.startswith("www.") else host
+        weight = weights.get(host)
+        return weight if weight is not None else listing_weight(candidate.listing_url)
+
+    def score(candidate: ArticleCandidate) -> float:
+        rank_score = 1 / math.sqrt(1 + candidate.rank)
+        # Età sconosciuta: valore neutro, come un articolo di un'emivita fa
+        age = candidate.age_hours if candidate.age_hours is not None else config.recency_half_life_h
+        recency_score = 0.5 ** (age / config.recency_half_life_h)
+        topic_score = 0.0
+        if topic_re is not None and candidate.title:
+            matches = len(set(topic_re.findall(candidate.title.lower())))
+            topic_score = min(matches / 2, 1.0)
+        duplicate_score = math.log2(candidate.occurrences)
+        # Il peso della fonte moltiplica la somma lineare delle componenti
+        return source_weight(candidate) * (
+            config.rank_weight * rank_score
+            + config.recency_weight * recency_score
+            + config.topic_weight * topic_score
+            + config.duplicate_weight * duplicate_score
+        )
+
+    return score
+
+
+def score_candidate(candidate: ArticleCandidate, config: ScoringConfig) -> float:
+    """Punteggio di un singolo candidato (per molti candidati usare select_top_k)."""
+    return _make_scorer(config)(candidate)
+
+
+def select_top_k(
+    candidates: Iterable[ArticleCandidate], k: int, config: Optional[ScoringConfig] = None
+) -> List[ArticleCandidate]:
+    """
+    I k candidati con punteggio più alto, in ordine decrescente (heap: O(n log k)).
+    A parità di punteggio vince l'ordine di apparizione.
+    """
+    score = _make_scorer(config or ScoringConfig())
+    scored = []
+    for index, candidate in enumerate(candidates):
+        candidate.score = score(candidate)
+        scored.append((candidate.score, -index, candidate))
+    # (punteggio, -indice) è unico: il confronto tra tuple non arriva mai al candidato
+    return [c for _, _, c in heapq.nlargest(k, scored)]
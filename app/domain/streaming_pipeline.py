@@ -0,0 +1,390 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.ports.dbhandler import DBHandlerPort
+from app.ports.llm import LLMPort
+from app.ports.scraper import ScraperPort
+from app.ports.tracer import get_tracer
+from app.ports.models import (
+    ListingToArticles,
+    NewArticleLink,
+    ScrapeResult,
+)
+from app.domain.domain_utils import (
+    ArticleSummary,
+    DuplicateSummaryLinker,
+    filter_and_save_new_articles,
+    traced_fetch_pages,
+    with_article_urls,
+)
+from app.domain.token_budget import (
+    DEFAULT_TOKEN_BUDGET,
+    TokenBudget,
+    summarize_within_budget,
+)
+from app.domain.link_extraction import (
+    LinkPrefilterConfig,
+    extract_article_links_for_listing,
+)
+from app.domain.listing_fingerprint import extract_article_links_incremental
+from app.domain.checkpoint import RunCheckpoint
+from app.domain.dedup import ContentDeduplicator
+from app.domain.scoring import ScoringConfig
+
+# Sentinella di fine stream: ogni stage ne riceve una per worker
+_DONE = object()
+
+
+@dataclass
+class StreamingPipelineConfig:
+    """
+    Parametri della pipeline in streaming: numero di worker per stage,
+    dimensione dei blocchi di URL passati allo scraper e capacità delle code.
+    """
+
+    listing_scrape_workers: int = 2
+    link_extraction_workers: int = 2
+    article_scrape_workers: int = 3
+    summarize_workers: int = 3
+    scrape_chunk_size: int = 5
+    queue_size: int = 100
+    max_articles: Optional[int] = None  # con un limite, i nuovi articoli vengono scelti per punteggio
+    scoring: ScoringConfig = field(default_factory=ScoringConfig)
+    link_prefilter: LinkPrefilterConfig = field(default_factory=LinkPrefilterConfig)
+    token_budget: Optional[TokenBudget] = DEFAULT_TOKEN_BUDGET
+    incremental_listings: bool = True  # estrae solo i blocchi dei listing cambiati dall'ultimo run
+    near_duplicate_distance: Optional[int] = 3  # bit di SimHash entro cui due pagine sono duplicati (None: off)
+
+
+@dataclass
+class StreamingPipelineResult:
+    listings: List[ListingToArticles] = field(default_factory=list)
+    new_articles: List[NewArticleLink] = field(default_factory=list)
+    summaries: List[ArticleSummary] = field(default_factory=list)
+
+
+async def _take_batch(inbox: asyncio.Queue, first: Any, size: int) -> Tuple[List[Any], bool]:
+    """
+    Completa un blocco a partire da `first` con gli elementi già disponibili in coda,
+    senza attendere. Ritorna il blocco e se è stata incontrata la sentinella.
+    """
+    batch = [first]
+    while len(batch) < size:
+        try:
+            item = inbox.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+async def _run_stage(
+    name: str,
+    num_workers: int,
+    inbox: asyncio.Queue,
+    outbox: Optional[asyncio.Queue],
+    next_workers: int,
+    process: Callable[[List[Any]], Awaitable[List[Any]]],
+    batch_size: int = 1,
+    flush: Optional[Callable[[], Awaitable[List[Any]]]] = None,
+) -> None:
+    """
+    Esegue num_workers worker che leggono da inbox (a blocchi di al più batch_size),
+    applicano process e scrivono i risultati in outbox. Quando tutti i worker hanno
+    ricevuto la sentinella, scrive in outbox l'output di flush (per gli stage che
+    accumulano l'input) e propaga la sentinella ai next_workers dello stage successivo.
+    Registra uno span `stage.<name>` per blocco e la profondità della coda in ingresso.
+    """
+    tracer = get_tracer()
+
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            batch, done = await _take_batch(inbox, item, batch_size)
+            tracer.gauge(f"queue.{name}", inbox.qsize())
+            with tracer.span(f"stage.{name}", items=len(batch)) as span:
+                outputs = await process(batch)
+                span["outputs"] = len(outputs)
+            for out in outputs:
+                if outbox is not None:
+                    await outbox.put(out)
+            if done:
+                return
+
+    with tracer.span(f"stage.{name}.total", workers=num_workers):
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(num_workers):
+                tg.create_task(worker())
+        if flush is not None:
+            with tracer.span(f"stage.{name}", items=0) as span:
+                outputs = await flush()
+                span["outputs"] = len(outputs)
+            for out in outputs:
+                if outbox is not None:
+                    await outbox.put(out)
+    if outbox is not None:
+        for _ in range(next_workers):
+            await outbox.put(_DONE)
+
+
+def _restore_from_checkpoint(
+    checkpoint: RunCheckpoint,
+    result: StreamingPipelineResult,
+    deduplicator: Optional[ContentDeduplicator],
+) -> Tuple[List[ListingToArticles], List[NewArticleLink], List[ScrapeResult]]:
+    """
+    Carica nel risultato i listing, gli articoli e i riassunti già presenti nel checkpoint.
+    Ritorna i listing con link già estratti ma non ancora passati dal dedup sul DB, gli
+    articoli ancora da scaricare e le pagine già scaricate ancora da riassumere;
+    pagine fallite e riassunti vuoti vengono ritentati. Gli articoli già collegati come
+    quasi-duplicati a un riassunto non vengono ripresi, e le pagine già riassunte tornano
+    nell'indice dei duplicati.
+    """
+    result.listings.extend(checkpoint.load_listings())
+    done_listings = {item.listing_url for item in result.listings}
+    to_dedup = {
+        item.listing_url: item
+        for item in checkpoint.load_extracted_listings()
+        if item.listing_url not in done_listings
+    }
+    result.new_articles.extend(checkpoint.load_new_articles())
+    pages = checkpoint.load_article_pages()
+    summaries = checkpoint.load_summaries()
+    summary_by_source = {
+        url: summary for summary in summaries.values() if summary.summary for url in summary.source_urls
+    }
+
+    to_scrape: List[NewArticleLink] = []
+    to_summarize: List[ScrapeResult] = []
+    for article in result.new_articles:
+        summary = summary_by_source.get(article.url)
+        if summary is not None:
+            if summary.url == article.url:
+                result.summaries.append(summary)
+                page = pages.get(article.url)
+                if deduplicator is not None and page is not None and page.content:
+                    deduplicator.register(page.url, page.content)
+                    deduplicator.duplicates[page.url] = summary.source_urls[1:]
+            continue
+        page = pages.get(article.url)
+        if page is not None and page.success:
+            to_summarize.append(page)
+        else:
+            to_scrape.append(article)
+    return list(to_dedup.values()), to_scrape, to_summarize
+
+
+async def run_streaming_pipeline(
+    listing_urls: List[str],
+    db: DBHandlerPort,
+    scraper: ScraperPort,
+    llm: LLMPort,
+    config: Optional[StreamingPipelineConfig] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+) -> StreamingPipelineResult:
+    """
+    Pipeline listing -> link articoli -> dedup -> scraping articoli -> riassunti,
+    con gli stage collegati da code limitate ed eseguiti in concorrenza: mentre il
+    browser scarica nuovi articoli l'LLM riassume quelli già pronti, quindi il tempo
+    totale tende a quello dello stage più lento invece che alla somma degli stage.
+
+    Con checkpoint l'output di ogni stage viene salvato su disco man mano; se il
+    checkpoint contiene già dati (ripresa dopo un crash) i listing elaborati non
+    vengono riscaricati, quelli con link già estratti ripartono dal dedup sul DB (con
+    l'estrazione incrementale l'impronta del listing è già aggiornata e non li
+    ritroverebbe), e i nuovi articoli già registrati ripartono dalla pagina
+    scaricata o dal riassunto, senza ripassare dal dedup sul DB.
+
+    Con config.max_articles lo stage di dedup attende tutti i listing e salva solo i nuovi
+    articoli con punteggio più alto (config.scoring), prima di scaricarne qualunque pagina;
+    gli esclusi restano candidati nei run successivi.
+
+    Prima del riassunto ogni pagina passa dall'indice dei quasi-duplicati: una pagina con
+    contenuto quasi identico a una già vista non viene riassunta, e il suo URL si aggiunge
+    a source_urls del riassunto della prima.
+    """
+    config = config or StreamingPipelineConfig()
+    result = StreamingPipelineResult()
+    deduplicator = (
+        ContentDeduplicator(config.near_duplicate_distance)
+        if config.near_duplicate_distance is not None
+        else None
+    )
+    pending_listings: List[ListingToArticles] = []
+    pending_articles: List[NewArticleLink] = []
+    pending_pages: List[ScrapeResult] = []
+    if checkpoint is not None:
+        pending_listings, pending_articles, pending_pages = _restore_from_checkpoint(
+            checkpoint, result, deduplicator
+        )
+        done_listings = {item.listing_url for item in result.listings + pending_listings}
+        listing_urls = [url for url in listing_urls if url not in done_listings]
+
+    listing_queue: asyncio.Queue = asyncio.Queue()
+    listing_pages: asyncio.Queue = asyncio.Queue(config.queue_size)
+    # Gli elementi ripresi dal checkpoint sono già in memoria: le code li accolgono tutti subito
+    listings: asyncio.Queue = asyncio.Queue(config.queue_size + len(pending_listings))
+    articles: asyncio.Queue = asyncio.Queue(config.queue_size + len(pending_articles))
+    article_pages: asyncio.Queue = asyncio.Queue(config.queue_size + len(pending_pages))
+
+    for item in pending_listings:
+        listings.put_nowait(item)
+    for article in pending_articles:
+        articles.put_nowait(article)
+    for page in pending_pages:
+        article_pages.put_nowait(page)
+    for url in listing_urls:
+        listing_queue.put_nowait(url)
+    for _ in range(config.listing_scrape_workers):
+        listing_queue.put_nowait(_DONE)
+
+    async def scrape(urls: List[str]) -> List[ScrapeResult]:
+        return await traced_fetch_pages(scraper, urls, "scrape_listing")
+
+    async def extract_links(pages: List[ScrapeResult]) -> List[ListingToArticles]:
+        output = []
+        for res in pages:
+            article_links: List[str] = []
+            if res.success and res.content and config.incremental_listings:
+                article_links = await extract_article_links_incremental(
+                    res.url, res.content, llm, db, config.link_prefilter
+                )
+            elif res.success and res.content:
+                article_links = await extract_article_links_for_listing(
+                    res.url, res.content, llm, config.link_prefilter
+                )
+            output.append(
+                ListingToArticles(
+                    listing_url=res.url,
+                    markdown=res.content or "",
+                    article_links=article_links,
+                )
+            )
+        if checkpoint is not None:
+            # Subito dopo l'estrazione: un crash prima del dedup non perde i link
+            checkpoint.save_extracted_listings(output)
+        return output
+
+    async def save_new_articles(
+        items: List[ListingToArticles], max_articles: Optional[int] = None
+    ) -> List[NewArticleLink]:
+        # Un solo worker: il DB vede scritture serializzate, una bulk per blocco
+        new_articles = await filter_and_save_new_articles(db, items, max_articles, config.scoring)
+        result.listings.extend(items)
+        result.new_articles.extend(new_articles)
+        if checkpoint is not None:
+            # Il listing risulta completato solo dopo che i suoi nuovi articoli sono salvati
+            checkpoint.save_new_articles(new_articles)
+            checkpoint.save_listings(items)
+        return new_articles
+
+    # Con max_articles la scelta dei migliori richiede tutti i candidati: i listing si
+    # accumulano e la selezione avviene a fine stream, prima di qualunque scraping di articoli
+    buffered_listings: List[ListingToArticles] = []
+
+    async def dedup(items: List[ListingToArticles]) -> List[NewArticleLink]:
+        if config.max_articles is None:
+            return await save_new_articles(items)
+        buffered_listings.extend(items)
+        return []
+
+    async def select_new_articles() -> List[NewArticleLink]:
+        # Anche senza listing nuovi: i link rimasti in attesa dai run precedenti sono candidati
+        remaining = max(config.max_articles - len(result.new_articles), 0)
+        return await save_new_articles(buffered_listings, remaining)
+
+    async def scrape_articles(items: List[NewArticleLink]) -> List[ScrapeResult]:
+        pages = await traced_fetch_pages(scraper, [a.fetch_url for a in items], "scrape_article")
+        pages = with_article_urls(pages, items)
+        if checkpoint is not None:
+            checkpoint.save_article_pages(pages)
+        return pages
+
+    linker = DuplicateSummaryLinker(
+        deduplicator,
+        (lambda summary: checkpoint.save_summaries([summary])) if checkpoint is not None else None,
+    )
+    linker.summaries.update((s.url, s) for s in result.summaries)
+
+    async def summarize_page(res: ScrapeResult) -> ArticleSummary:
+        summary = ""
+        if res.success and res.content:
+            summary_obj = await summarize_within_budget(res.content, llm, config.token_budget)
+            summary = summary_obj.summary_markdown
+        article_summary = linker.add_summary(res.url, summary)
+        result.summaries.append(article_summary)
+        if checkpoint is not None:
+            checkpoint.save_summaries([article_summary])
+        return article_summary
+
+    async def summarize(pages: List[ScrapeResult]) -> List[ArticleSummary]:
+        for res in pages:
+            if linker.link_duplicate(res):
+                continue
+            page: Optional[ScrapeResult] = res
+            while page is not None:
+                article_summary = await summarize_page(page)
+                page = None if article_summary.summary else linker.promote_duplicate(article_summary)
+        return []
+
+    with get_tracer().span("pipeline.streaming", listings=len(listing_urls)):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(
+                _run_stage(
+                    "scrape_listing",
+                    config.listing_scrape_workers,
+                    listing_queue,
+                    listing_pages,
+                    config.link_extraction_workers,
+                    scrape,
+                    batch_size=config.scrape_chunk_size,
+                )
+            )
+            tg.create_task(
+                _run_stage(
+                    "extract_links",
+                    config.link_extraction_workers,
+                    listing_pages,
+                    listings,
+                    1,
+                    extract_links,
+                )
+            )
+            tg.create_task(
+                _run_stage(
+                    "dedup",
+                    1,
+                    listings,
+                    articles,
+                    config.article_scrape_workers,
+                    dedup,
+                    batch_size=config.queue_size,
+                    flush=select_new_articles if config.max_articles is not None else None,
+                )
+            )
+            tg.create_task(
+                _run_stage(
+                    "scrape_article",
+                    config.article_scrape_workers,
+                    articles,
+                    article_pages,
+                    config.summarize_workers,
+                    scrape_articles,
+                    batch_size=config.scrape_chunk_size,
+                )
+            )
+            tg.create_task(
+                _run_stage(
+                    "summarize",
+                    config.summarize_workers,
+                    article_pages,
+                    None,
+                    0,
+                    summarize,
+                )
+            )
+    return result
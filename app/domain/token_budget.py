@@ -0,0 +1,264 @@
+import math
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, Optional
+from app.ports.llm import LLMPort
+from app.ports.tracer import get_tracer
+from app.ports.models import SummarizePageInput, SummarizePageOutput
+
+_TRUNCATION_MARKER = "\n\n[...]\n\n"
+_HEADING_RE = re.compile(r"^#{1,6}\s", re.MULTILINE)
+_LINK_RE = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+# Frasi intere tipiche di banner e footer: parole singole come "cookie" o "newsletter"
+# possono comparire nel titolo o nei paragrafi dell'articolo
+_BOILERPLATE_RE = re.compile(
+    r"\b(we use cookies|this (web)?site uses cookies|accept (all )?cookies|cookie (policy|settings|preferences)|"
+    r"manage (your )?cookies|privacy policy|terms of (use|service)|all rights reserved|"
+    r"(subscribe|sign up) (to|for) (our|the) newsletter|share (on|this (article|post|story))|"
+    r"follow us( on)?|accept all|skip to (main )?content)\b",
+    re.IGNORECASE,
+)
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+class TruncationStrategy(Enum):
+    HEAD_TAIL = "head_tail"
+    SECTION_PRIORITY = "section_priority"
+    MAP_REDUCE = "map_reduce"
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    """
+    Budget di token per il contenuto di una pagina passato al modello.
+    max_input_tokens deve lasciare spazio al template del prompt e alla risposta
+    (es. contesto 8k: ~6k per il contenuto).
+    """
+
+    max_input_tokens: int = 6000
+    strategy: TruncationStrategy = TruncationStrategy.HEAD_TAIL
+    head_ratio: float = 0.8  # quota del budget riservata all'inizio della pagina (HEAD_TAIL)
+    chars_per_token: float = 4.0
+    max_chunks: int = 8  # limite di chiamate "map" per articolo (MAP_REDUCE)
+
+
+DEFAULT_TOKEN_BUDGET = TokenBudget()
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Stima economica del numero di token (caratteri / chars_per_token)."""
+    return math.ceil(len(text) / chars_per_token)
+
+
+def strip_boilerplate(markdown: str) -> str:
+    """
+    Rimuove il rumore tipico del markdown estratto: righe fatte solo di più link
+    o di immagini (menu, footer), righe brevi con frasi di banner cookie/newsletter/social,
+    righe ripetute e righe vuote multiple. Heading e blocchi di codice restano intatti.
+    """
+    lines: List[str] = []
+    seen = set()
+    blank = False
+    in_code = False
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if _FENCE_RE.match(line):
+            in_code = not in_code
+        elif in_code:
+            # Nel codice righe ripetute e vuote hanno significato
+            lines.append(line.rstrip())
+            continue
+        if not stripped:
+            if not blank and lines:
+                lines.append("")
+            blank = True
+            continue
+        if stripped.startswith("#") or _FENCE_RE.match(line):
+            lines.append(line.rstrip())
+            blank = False
+            continue
+        links = _LINK_RE.findall(stripped)
+        text_only = _LINK_RE.sub("", stripped).strip(" |*-•·>")
+        # Menu/barre di link e immagini isolate; un singolo link resta (riferimento utile)
+        if not text_only and (len(links) > 1 or stripped.startswith("![")):
+            continue
+        if len(text_only) < 120 and _BOILERPLATE_RE.search(stripped):
+            continue
+        if len(stripped) > 20 and stripped in seen:
+            continue
+        seen.add(stripped)
+        lines.append(line.rstrip())
+        blank = False
+    return "\n".join(lines).strip()
+
+
+def _cut_to_chars(text: str, max_chars: int, from_end: bool = False) -> str:
+    """Taglia a max_chars preferendo un confine di riga."""
+    if len(text) <= max_chars:
+        return text
+    if from_end:
+        cut = text[-max_chars:]
+        newline = cut.find("\n")
+        return cut[newline + 1 :] if 0 <= newline < len(cut) // 2 else cut
+    cut = text[:max_chars]
+    newline = cut.rfind("\n")
+    return cut[:newline] if newline > len(cut) // 2 else cut
+
+
+def truncate_head_tail(text: str, budget: TokenBudget) -> str:
+    """Mantiene l'inizio (titolo, lead) e la fine (conclusioni) della pagina entro il budget."""
+    max_chars = int(budget.max_input_tokens * budget.chars_per_token)
+    if len(text) <= max_chars:
+        return text
+    available = max_chars - len(_TRUNCATION_MARKER)
+    head_chars = int(available * budget.head_ratio)
+    head = _cut_to_chars(text, head_chars)
+    tail = _cut_to_chars(text, available - len(head), from_end=True)
+    return head + _TRUNCATION_MARKER + tail if tail else head
+
+
+def split_sections(markdown: str) -> List[str]:
+    """Divide il markdown in sezioni, ciascuna introdotta da un heading."""
+    starts = [m.start() for m in _HEADING_RE.finditer(markdown)]
+    if not starts or starts[0] != 0:
+        starts = [0] + starts
+    starts.append(len(markdown))
+    return [
+        markdown[start:end].strip()
+        for start, end in zip(starts, starts[1:])
+        if markdown[start:end].strip()
+    ]
+
+
+def _section_score(index: int, section: str) -> float:
+    # Le prime sezioni (titolo, lead) contano di più; poi la densità di testo vero
+    words = len(_LINK_RE.sub("", section).split())
+    link_penalty = len(_LINK_RE.findall(section)) * 5
+    position_bonus = 1000 if index == 0 else 200 / (index + 1)
+    return position_bonus + words - link_penalty
+
+
+def select_sections(text: str, budget: TokenBudget) -> str:
+    """
+    Seleziona le sezioni più informative che entrano nel budget, mantenendo l'ordine originale.
+    Le sezioni che da sole superano il budget residuo vengono troncate.
+    """
+    max_tokens = budget.max_input_tokens
+    if estimate_tokens(text, budget.chars_per_token) <= max_tokens:
+        return text
+    sections = split_sections(text)
+    ranked = sorted(
+        range(len(sections)), key=lambda i: _section_score(i, sections[i]), reverse=True
+    )
+    chosen = {}
+    remaining = max_tokens
+    for i in ranked:
+        cost = estimate_tokens(sections[i], budget.chars_per_token) + 2
+        if cost <= remaining:
+            chosen[i] = sections[i]
+            remaining -= cost
+        elif not chosen or remaining > max_tokens // 10:
+            chars = int((remaining - 2) * budget.chars_per_token)
+            if chars > 0:
+                chosen[i] = _cut_to_chars(sections[i], chars)
+                remaining = 0
+        if remaining <= 0:
+            break
+    return "\n\n".join(chosen[i] for i in sorted(chosen))
+
+
+def split_into_chunks(text: str, budget: TokenBudget) -> List[str]:
+    """Divide il testo in blocchi entro il budget, su confini di paragrafo quando possibile."""
+    max_chars = int(budget.max_input_tokens * budget.chars_per_token)
+    chunks: List[str] = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            piece = _cut_to_chars(paragraph, max_chars)
+            chunks.append(piece)
+            paragraph = paragraph[len(piece) :].lstrip()
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def fit_to_budget(content: str, budget: TokenBudget) -> str:
+    """
+    Se il contenuto supera il budget lo pulisce e, se ancora non basta, lo riduce con la
+    strategia configurata; un contenuto già entro il budget passa invariato.
+    MAP_REDUCE richiede l'LLM: qui ricade su HEAD_TAIL (usare summarize_within_budget).
+    """
+    if estimate_tokens(content, budget.chars_per_token) <= budget.max_input_tokens:
+        return content
+    return _fit_stripped(strip_boilerplate(content), budget)
+
+
+def _fit_stripped(cleaned: str, budget: TokenBudget) -> str:
+    """Come fit_to_budget, per un contenuto già ripulito con strip_boilerplate."""
+    if estimate_tokens(cleaned, budget.chars_per_token) <= budget.max_input_tokens:
+        return cleaned
+    if budget.strategy == TruncationStrategy.SECTION_PRIORITY:
+        return select_sections(cleaned, budget)
+    return truncate_head_tail(cleaned, budget)
+
+
+async def _traced_summarize(
+    llm: LLMPort, text: str, step: str, chars_per_token: float = 4.0
+) -> SummarizePageOutput:
+    """Chiamata di sintesi con span e stima dei token in ingresso e in uscita."""
+    tracer = get_tracer()
+    input_tokens = estimate_tokens(text, chars_per_token)
+    with tracer.span("llm.summarize", step=step, input_tokens=input_tokens) as span:
+        output = await llm.asummarize_page(SummarizePageInput(page_representation=text))
+        span["output_tokens"] = estimate_tokens(output.summary_markdown, chars_per_token)
+    tracer.count("llm.input_tokens", input_tokens, operation="summarize")
+    tracer.count("llm.output_tokens", span["output_tokens"], operation="summarize")
+    return output
+
+
+async def summarize_within_budget(
+    content: str, llm: LLMPort, budget: Optional[TokenBudget] = DEFAULT_TOKEN_BUDGET
+) -> SummarizePageOutput:
+    """
+    Riassume una pagina garantendo che ogni richiesta al modello rientri nel budget.
+    Con MAP_REDUCE i contenuti troppo lunghi vengono riassunti a blocchi (uno alla volta,
+    per non moltiplicare il parallelismo deciso dal chiamante) e poi riassunti insieme.
+    """
+    if budget is None:
+        return await _traced_summarize(llm, content, "full")
+    if estimate_tokens(content, budget.chars_per_token) <= budget.max_input_tokens:
+        # Entro il budget: nessuna pulizia, il modello vede la pagina intera
+        return await _traced_summarize(llm, content, "fit", budget.chars_per_token)
+    cleaned = strip_boilerplate(content)
+    cleaned_tokens = estimate_tokens(cleaned, budget.chars_per_token)
+    get_tracer().count(
+        "summarize.boilerplate_tokens",
+        estimate_tokens(content, budget.chars_per_token) - cleaned_tokens,
+    )
+    fits = cleaned_tokens <= budget.max_input_tokens
+    if fits or budget.strategy != TruncationStrategy.MAP_REDUCE:
+        step = "fit" if fits else budget.strategy.value
+        return await _traced_summarize(
+            llm, _fit_stripped(cleaned, budget), step, budget.chars_per_token
+        )
+
+    chunks = split_into_chunks(cleaned, budget)[: budget.max_chunks]
+    partials: List[str] = []
+    for chunk in chunks:
+        partial = await _traced_summarize(llm, chunk, "map", budget.chars_per_token)
+        if partial.summary_markdown:
+            partials.append(partial.summary_markdown)
+    if not partials:
+        return SummarizePageOutput(summary_markdown="")
+    combined = truncate_head_tail("\n\n".join(partials), budget)
+    return await _traced_summarize(llm, combined, "reduce", budget.chars_per_token)
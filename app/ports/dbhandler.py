@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from datetime import datetime
-from app.ports.models import NewsListingUrl, ArticleLinkDb
+from app.ports.models import (
+    NewsListingUrl,
+    ArticleLinkDb,
+    ArticleVisitUpdate,
+    ListingFingerprint,
+    PendingArticleLink,
+)
 
 class DBHandlerPort(ABC):
     """
     Porta astratta per la gestione del database.
-    Espone operazioni CRUD per le tabelle news_listing_urls e article_links.
+    Espone operazioni CRUD per le tabelle news_listing_urls, listing_fingerprints, article_links
+    e pending_article_links.
     """
 
     # --- News Listing URLs ---
@@ -21,6 +28,16 @@ class DBHandlerPort(ABC):
         """Recupera tutti gli URL di listing."""
         pass
 
+    @abstractmethod
+    def get_listing_fingerprint(self, listing_url: str) -> Optional[ListingFingerprint]:
+        """Recupera l'impronta dell'ultimo contenuto elaborato di un listing."""
+        pass
+
+    @abstractmethod
+    def save_listing_fingerprint(self, fingerprint: ListingFingerprint) -> None:
+        """Salva (sostituendola) l'impronta del contenuto di un listing."""
+        pass
+
     # --- Article Links ---
 
     @abstractmethod
@@ -38,7 +55,46 @@ class DBHandlerPort(ABC):
         """Recupera tutti i link articoli, opzionalmente filtrando per visitato."""
         pass
 
+    @abstractmethod
+    def remove_article_link(self, url: str) -> None:
+        """Rimuove un link articolo (nessun effetto se non esiste), così un run successivo può riproporlo."""
+        pass
+
     @abstractmethod
     def mark_article_as_visited(self, url: str, summary: Optional[str] = None, tags: Optional[List[str]] = None) -> None:
         """Segna un articolo come visitato, opzionalmente aggiornando riassunto e tag."""
         pass
+
+    # --- Operazioni bulk (un round-trip per chiamata) ---
+
+    @abstractmethod
+    def get_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        """Restituisce il sottoinsieme degli URL forniti già presenti tra i link articoli."""
+        pass
+
+    @abstractmethod
+    def add_article_links(self, urls: List[str], added_at: Optional[datetime] = None) -> List[ArticleLinkDb]:
+        """Aggiunge più link articolo in un'unica operazione. Nessun inserimento se uno degli URL esiste già."""
+        pass
+
+    @abstractmethod
+    def mark_articles_visited(self, updates: List[ArticleVisitUpdate]) -> None:
+        """Segna più articoli come visitati in un'unica operazione, aggiornando riassunti e tag."""
+        pass
+
+    # --- Candidati non selezionati ---
+
+    @abstractmethod
+    def get_pending_article_links(self) -> List[PendingArticleLink]:
+        """Recupera i link articolo esclusi dalla selezione nei run precedenti."""
+        pass
+
+    @abstractmethod
+    def save_pending_article_links(self, links: List[PendingArticleLink]) -> None:
+        """Salva link esclusi dalla selezione; per un URL già presente aggiorna i dati ma conserva added_at."""
+        pass
+
+    @abstractmethod
+    def remove_pending_article_links(self, urls: Iterable[str]) -> None:
+        """Rimuove link dalla lista dei non selezionati (nessun effetto per URL assenti)."""
+        pass
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 from app.ports.models import ArticleLinkExtractionInput, ArticleLinkExtractionOutput, SummarizePageInput, SummarizePageOutput
@@ -19,3 +20,17 @@ class LLMPort(ABC):
         Riassume una pagina in markdown e genera tag tematici.
         """
         pass
+
+    async def aextract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        """
+        Variante asincrona di extract_article_links.
+        L'implementazione di default esegue la versione sincrona in un thread per non bloccare l'event loop;
+        gli adapter con un client asincrono nativo dovrebbero sovrascriverla.
+        """
+        return await asyncio.to_thread(self.extract_article_links, data)
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        """
+        Variante asincrona di summarize_page (default: versione sincrona in un thread).
+        """
+        return await asyncio.to_thread(self.summarize_page, data)
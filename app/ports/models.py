@@ -1,7 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel
+from pydantic.json_schema import SkipJsonSchema
 
 @dataclass
 class NewsListingUrl:
@@ -9,6 +10,13 @@ class NewsListingUrl:
     url: str
     added_at: datetime
 
+@dataclass
+class ListingFingerprint:
+    listing_url: str
+    page_hash: str
+    block_hashes: List[str]
+    updated_at: datetime
+
 @dataclass
 class ArticleLinkDb:
     id: int
@@ -19,12 +27,20 @@ class ArticleLinkDb:
     tags: Optional[List[str]] = None
     visited_at: Optional[datetime] = None
 
+@dataclass
+class ArticleVisitUpdate:
+    url: str
+    summary: Optional[str] = None
+    tags: Optional[List[str]] = None
+
 @dataclass
 class ScrapeResult:
     url: str
     success: bool
     content: Optional[str] = None
     error: Optional[str] = None
+    status_code: Optional[int] = None
+    retry_after: Optional[float] = None  # secondi suggeriti dal server (header Retry-After)
 
 @dataclass
 class ArticleLinkExtractionInput:
@@ -37,6 +53,9 @@ class ArticleLinkLLM(BaseModel):
 
 class ArticleLinkExtractionOutput(BaseModel):
     links: List[ArticleLinkLLM]
+    # True se l'estrazione è fallita e links è il risultato vuoto di ripiego
+    # (fuori dallo schema JSON, quindi assente dalle istruzioni di formato per il modello)
+    failed: SkipJsonSchema[bool] = False
 
 class SummarizePageInput(BaseModel):
     page_representation: str
@@ -53,10 +72,33 @@ class ListingToArticles:
 @dataclass
 class NewArticleLink:
     listing_url: str
-    url: str
+    url: str  # forma canonica, chiave nel DB e nei riassunti
     added_at: datetime
+    # URL così come compare nel listing, da scaricare (la forma canonica serve solo al confronto)
+    fetch_url: Optional[str] = None
+
+    def __post_init__(self):
+        if not self.fetch_url:
+            self.fetch_url = self.url
+
+# Nuovo link articolo non scelto da un run con limite, riproposto ai run successivi
+@dataclass
+class PendingArticleLink:
+    url: str  # forma canonica
+    listing_url: str
+    fetch_url: str
+    added_at: datetime  # primo run in cui è stato escluso
+    title: str = ""
+    rank: int = 0
+    published_at: Optional[datetime] = None  # stimata dall'età dichiarata nel listing
 
 @dataclass
 class ArticleSummary:
     url: str
     summary: str
+    # Tutti gli URL con lo stesso contenuto (quasi-duplicati), url compreso
+    source_urls: List[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        if not self.source_urls:
+            self.source_urls = [self.url]
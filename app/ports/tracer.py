@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class TracerPort(ABC):
+    """
+    Porta astratta per la strumentazione della pipeline: span (operazioni con durata)
+    e contatori/valori puntuali (cache hit, token, profondità delle code, errori per host).
+    """
+
+    @abstractmethod
+    def span(self, name: str, **attrs: Any) -> Any:
+        """
+        Context manager che misura la durata del blocco. Restituisce un dict di attributi
+        che il chiamante può arricchire durante l'operazione (es. status, token).
+        """
+        pass
+
+    @abstractmethod
+    def record_span(self, name: str, start_s: float, duration_s: float, **attrs: Any) -> None:
+        """Registra uno span già misurato (start_s in secondi di time.perf_counter())."""
+        pass
+
+    @abstractmethod
+    def count(self, name: str, value: float = 1, **attrs: Any) -> None:
+        """Incrementa un contatore."""
+        pass
+
+    @abstractmethod
+    def gauge(self, name: str, value: float, **attrs: Any) -> None:
+        """Registra il valore corrente di una grandezza (es. elementi in coda)."""
+        pass
+
+
+class NullTracer(TracerPort):
+    """Tracer di default: non registra nulla, costo trascurabile."""
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        yield attrs
+
+    def record_span(self, name: str, start_s: float, duration_s: float, **attrs: Any) -> None:
+        pass
+
+    def count(self, name: str, value: float = 1, **attrs: Any) -> None:
+        pass
+
+    def gauge(self, name: str, value: float, **attrs: Any) -> None:
+        pass
+
+
+_tracer: TracerPort = NullTracer()
+
+
+def get_tracer() -> TracerPort:
+    """Tracer attivo per il processo (NullTracer se nessuno è stato impostato)."""
+    return _tracer
+
+
+def set_tracer(tracer: TracerPort) -> TracerPort:
+    """Imposta il tracer attivo e restituisce il precedente."""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
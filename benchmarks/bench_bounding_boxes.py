@@ -0,0 +1,225 @@
+"""
+Confronta l'estrazione dei bounding box storica (xpath/CSS ricalcolati risalendo fino
+alla radice per ogni elemento, outerHTML per il tag di apertura, getComputedStyle su tutto,
+una lista di oggetti come risultato) con BOUNDING_BOXES_JS (una visita dall'alto verso
+il basso, payload colonnare) su DOM sintetici di listing prodotto serviti in locale.
+Per ogni dimensione riporta il tempo di page.evaluate (esecuzione + trasferimento CDP),
+la dimensione del payload in JSON e verifica che i bounding box coincidano (esce con
+errore se differiscono). Lo stesso confronto, con anche un DOM di casi limite, è in
+tests/test_bounding_boxes_js.py (marker playwright).
+
+Uso:
+    python -m benchmarks.bench_bounding_boxes --nodes 1000 10000 50000
+    python -m benchmarks.bench_bounding_boxes --executable-path /path/to/chrome
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from playwright.sync_api import sync_playwright
+
+from benchmarks.local_server import LocalStaticServer
+from src.playwright_scraper import BOUNDING_BOXES_JS, decode_bounding_boxes
+
+# JS di get_bounding_boxes prima della visita in un solo passaggio (solo per confronto)
+LEGACY_BOUNDING_BOXES_JS = """
+(selector) => {
+            // Sanifica il selettore: rimuovi spazi e virgole finali
+            if (!selector || typeof selector !== 'string') return [];
+            selector = selector.trim();
+            while (selector.endsWith(',')) selector = selector.slice(0, -1).trim();
+            if (!selector) return [];
+            function getXPathForElement(el) {
+                if (!el || !(el instanceof Element)) return '';
+                if (el === document.documentElement) return '/html';
+                var parentNode = el.parentNode;
+                if (!parentNode || parentNode.nodeType !== Node.ELEMENT_NODE) {
+                    if (el === document.body) return '/html/body';
+                    return el.tagName ? '/' + el.tagName.toLowerCase() : '';
+                }
+                var siblings = parentNode.children;
+                for (var i = 0; i < siblings.length; i++) {
+                    var sibling = siblings[i];
+                    if (sibling === el) {
+                        let parentPath = getXPathForElement(parentNode);
+                        let tagName = el.tagName.toLowerCase();
+                        return parentPath + '/' + tagName + '[' + (i + 1) + ']';
+                    }
+                }
+                return '';
+            }
+            function getCssSelector(el) {
+                if (!(el instanceof Element)) return '';
+                var path = [];
+                while (el && el.nodeType === Node.ELEMENT_NODE) {
+                    var selector = el.nodeName.toLowerCase();
+                    var sib = el, nth = 1;
+                    while (sib = sib.previousElementSibling) {
+                        if (sib.nodeName.toLowerCase() == selector) nth++;
+                    }
+                    if (nth != 1) selector += ':nth-of-type(' + nth + ')';
+                    path.unshift(selector);
+                    el = el.parentNode;
+                }
+                return path.join(' > ');
+            }
+            function getAttributesFull(el) {
+                var attrs = {};
+                if (el && el.attributes) {
+                    for (var i = 0; i < el.attributes.length; i++) {
+                        var attr = el.attributes[i];
+                        attrs[attr.name] = attr.value;
+                    }
+                }
+                attrs['id'] = el.id || '';
+                attrs['class'] = el.className || '';
+                return attrs;
+            }
+            function getNumChildren(el) {
+                if (!el || !el.children) return 0;
+                return el.children.length;
+            }
+            function getTagOpening(el) {
+                if (!el || !el.outerHTML) return '';
+                const html = el.outerHTML;
+                const end = html.indexOf('>');
+                if (end !== -1) return html.slice(0, end+1);
+                return '';
+            }
+            function getBoundingBoxes(selector) {
+                var elements = [];
+                try {
+                    elements = Array.from(document.querySelectorAll(selector));
+                } catch (e) {
+                    return [];
+                }
+                var results = [];
+                elements.forEach(function(root) {
+                    var walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
+                    var currentNode = root;
+                    do {
+                        var el = currentNode;
+                        if (!document.body.contains(el)) { 
+                            currentNode = walker.nextNode(); 
+                            continue; 
+                        }
+                        var rect = el.getBoundingClientRect();
+                        var style = window.getComputedStyle(el);
+                        let isVisible = rect.width > 0 && rect.height > 0 && 
+                                       style.display !== 'none' && 
+                                       style.visibility !== 'hidden' && 
+                                       parseFloat(style.opacity) > 0 && 
+                                       el.offsetParent !== null;
+                        if (isVisible) {
+                            results.push({
+                                tag: getTagOpening(el),
+                                css_selector: getCssSelector(el),
+                                xpath: getXPathForElement(el),
+                                attributes: getAttributesFull(el),
+                                id: el.id || '',
+                                class: el.className || '',
+                                x: Math.round(rect.left + window.scrollX),
+                                y: Math.round(rect.top + window.scrollY),
+                                width: Math.round(rect.width),
+                                height: Math.round(rect.height),
+                                num_children: getNumChildren(el)
+                            });
+                        }
+                        currentNode = walker.nextNode();
+                    } while(currentNode);
+                });
+                return results;
+            }
+            return getBoundingBoxes(selector);
+        }
+"""
+
+_CARD = (
+    '<div class="card card-{i}" data-id="{i}">'
+    '<a class="card-link" href="/product/{i}"><img src="data:," width="200" height="200" alt="Prodotto {i}"></a>'
+    '<div class="info"><h3 class="title">Prodotto &quot;{i}&quot;</h3><span class="price">{price} &euro;</span>'
+    '<ul class="badges"><li>nuovo</li><li>-{discount}%</li><li>spedizione gratuita</li></ul></div>'
+    '<div class="quick-view" style="display:none"><div><p>Dettagli</p><button>Aggiungi</button></div></div>'
+    "</div>"
+)
+_NODES_PER_CARD = 14
+
+
+def listing_page_html(num_nodes: int, seed: int = 0) -> str:
+    """Listing prodotto: header, griglia di card (con un sottoalbero nascosto ciascuna) e footer."""
+    rng = random.Random(seed)
+    cards = "".join(
+        _CARD.format(i=i, price=rng.randint(10, 999), discount=rng.randint(5, 50))
+        for i in range(max(num_nodes // _NODES_PER_CARD, 1))
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Listing</title><style>"
+        ".grid{display:grid;grid-template-columns:repeat(4,1fr);gap:16px}"
+        ".card{border:1px solid #ddd;padding:8px}.badges li{display:inline-block;margin-right:4px}"
+        "</style></head><body>"
+        '<header><nav><a href="/">Home</a><a href="/new">Novità</a><a href="/sale">Saldi</a></nav></header>'
+        '<div class="mobile-menu" style="display:none"><ul><li>Home</li><li>Novità</li></ul></div>'
+        f'<main><div class="grid">{cards}</div></main>'
+        "<footer><p>Footer</p></footer></body></html>"
+    )
+
+
+def legacy_to_boxes(results):
+    """Campi del risultato storico confrontabili con decode_bounding_boxes (senza depth)."""
+    keys = ("tag", "css_selector", "xpath", "x", "y", "width", "height", "num_children")
+    return [{key: box[key] for key in keys} for box in results]
+
+
+def _time_evaluate(page, js: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = page.evaluate(js, "body")
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--executable-path", help="eseguibile di Chromium da usare al posto di quello di Playwright")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory, sync_playwright() as playwright:
+        for num_nodes in args.nodes:
+            with open(os.path.join(directory, f"listing_{num_nodes}.html"), "w", encoding="utf-8") as f:
+                f.write(listing_page_html(num_nodes))
+        browser = playwright.chromium.launch(executable_path=args.executable_path)
+        page = browser.new_page(viewport={"width": 1280, "height": 800})
+        mismatches = []
+        with LocalStaticServer(directory) as server:
+            for num_nodes in args.nodes:
+                page.goto(f"{server.base_url}/listing_{num_nodes}.html")
+                legacy_s, legacy = _time_evaluate(page, LEGACY_BOUNDING_BOXES_JS, args.repeat)
+                columnar_s, payload = _time_evaluate(page, BOUNDING_BOXES_JS, args.repeat)
+                decode_start = time.perf_counter()
+                boxes = decode_bounding_boxes(payload)
+                decode_s = time.perf_counter() - decode_start
+                same = [{k: v for k, v in box.items() if k != "depth"} for box in boxes] == legacy_to_boxes(legacy)
+                if not same:
+                    mismatches.append(num_nodes)
+                print(
+                    f"{num_nodes:>6} nodi, {len(boxes)} box visibili:\n"
+                    f"  storico:    {legacy_s * 1000:8.1f} ms, payload {len(json.dumps(legacy)) / 1024:8.0f} KB\n"
+                    f"  colonnare:  {columnar_s * 1000:8.1f} ms (+ {decode_s * 1000:.1f} ms di decodifica), "
+                    f"payload {len(json.dumps(payload)) / 1024:8.0f} KB\n"
+                    f"  risultati identici: {'sì' if same else 'NO'}"
+                )
+        browser.close()
+    if mismatches:
+        raise SystemExit(f"Bounding box diversi dall'estrazione storica per --nodes {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Confronta le pagine/secondo di Crawl4AIScraperAdapter senza pool (un browser per
+chiamata, come fanno le funzioni di dominio con un URL per task) e con il crawler
+condiviso avviato tramite start()/close().
+
+Uso:
+    python -m benchmarks.bench_crawl4ai_pool --pages 50 --sessions 5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from app.adapters.crawl4ai_scraper import Crawl4AIScraperAdapter
+from benchmarks.local_server import LocalStaticServer
+
+
+def write_static_pages(directory: str, num_pages: int) -> None:
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20
+    for i in range(num_pages):
+        with open(os.path.join(directory, f"page_{i}.html"), "w", encoding="utf-8") as f:
+            f.write(
+                f"<html><head><title>Pagina {i}</title></head><body>"
+                f"<article><h1>Articolo {i}</h1><p>{paragraph}</p><p>{paragraph}</p>"
+                f"</article></body></html>"
+            )
+
+
+async def run_per_call(urls, sessions: int) -> float:
+    scraper = Crawl4AIScraperAdapter(max_sessions=sessions)
+    start = time.perf_counter()
+    # Comportamento storico: un task (e quindi un browser) per URL, con al più
+    # `sessions` browser attivi per non saturare la macchina.
+    semaphore = asyncio.Semaphore(sessions)
+
+    async def fetch(url):
+        async with semaphore:
+            return await scraper.fetch_pages_content([url])
+
+    await asyncio.gather(*(fetch(url) for url in urls))
+    return time.perf_counter() - start
+
+
+async def run_pooled(urls, sessions: int) -> float:
+    start = time.perf_counter()
+    # Stesso limite di run_per_call: al più `sessions` chiamate in corso
+    semaphore = asyncio.Semaphore(sessions)
+    async with Crawl4AIScraperAdapter(max_sessions=sessions) as scraper:
+
+        async def fetch(url):
+            async with semaphore:
+                return await scraper.fetch_pages_content([url])
+
+        await asyncio.gather(*(fetch(url) for url in urls))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_static_pages(directory, args.pages)
+        with LocalStaticServer(directory) as server:
+            urls = [f"{server.base_url}/page_{i}.html" for i in range(args.pages)]
+            for label, runner in (("per-call", run_per_call), ("pooled", run_pooled)):
+                elapsed = asyncio.run(runner(urls, args.sessions))
+                print(
+                    f"{label:>9}: {args.pages} pagine in {elapsed:.2f}s "
+                    f"({args.pages / elapsed:.1f} pagine/s)"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark end-to-end riproducibile del flusso listing -> newsletter.
+Le pagine sono fixture sintetiche, non pagine reali registrate: listing in stile Hacker News
+e articoli generati da un seed (benchmarks/fixtures.py) e serviti da un server HTTP locale.
+Misurano quindi la pipeline (scraping HTTP, estrazione, dedup, sintesi), non la variabilità
+di markup e dimensioni dei siti veri: le pagine sono piccole e pulite (vedi benchmarks/fixtures.py),
+per cui parsing HTML e rimozione del boilerplate risultano molto più economici che sui siti
+reali. I risultati servono a confrontare versioni della pipeline tra loro, non a stimare
+i tempi di produzione. Lo scraping usa HttpScraperAdapter, l'LLM è finto con
+latenza configurabile. Per ogni scala riporta tempo totale, picco di RSS e throughput di
+ciascuno stage della pipeline in streaming. Ogni run gira in un processo separato: il picco
+di RSS (ru_maxrss) non si azzera mai in un processo, quindi misurarlo nello stesso
+processo riporterebbe per ogni scala il massimo dei run precedenti.
+
+Con --output i risultati vengono salvati in JSON; con --baseline si confrontano con un run
+precedente e il comando termina con codice 1 se il tempo peggiora oltre --tolerance.
+Ogni scala viene eseguita --repeat volte e si riporta il run con il tempo mediano.
+
+Uso:
+    python -m benchmarks.bench_end_to_end --scales 10 100 1000 --llm-latency 0.02
+    python -m benchmarks.bench_end_to_end --output bench.json
+    python -m benchmarks.bench_end_to_end --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from app.adapters.http_scraper import HttpScraperAdapter
+from app.adapters.memory_tracer import InMemoryTracer
+from app.adapters.mock_dbhandler import MockDBHandler
+from app.domain.newsletter_utils import generate_newsletter_markdown, update_db_with_summaries
+from app.domain.streaming_pipeline import StreamingPipelineConfig, run_streaming_pipeline
+from app.ports.tracer import set_tracer
+from benchmarks.fakes import FakeLLM
+from benchmarks.fixtures import generate_fixtures
+from benchmarks.local_server import LocalStaticServer
+
+_STAGES = ["scrape_listing", "extract_links", "dedup", "scrape_article", "summarize"]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss è in KB su Linux, in byte su macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _stage_throughput(tracer: InMemoryTracer) -> Dict[str, Dict[str, float]]:
+    """Elementi elaborati e durata complessiva (dal primo all'ultimo worker) di ogni stage."""
+    stats = {stage: {"items": 0, "seconds": 0.0} for stage in _STAGES}
+    for event in tracer.events:
+        if event.kind != "span" or not event.name.startswith("stage."):
+            continue
+        stage = event.name[len("stage.") :]
+        if stage.endswith(".total"):
+            stats[stage[: -len(".total")]]["seconds"] = event.duration_s
+        elif stage in stats:
+            stats[stage]["items"] += event.attrs.get("items", 0)
+    for agg in stats.values():
+        agg["items_per_s"] = agg["items"] / agg["seconds"] if agg["seconds"] else 0.0
+    return stats
+
+
+async def _run_flow(
+    listing_urls: List[str], llm: FakeLLM, config: StreamingPipelineConfig, out_dir: str
+):
+    db = MockDBHandler()
+    max_connections = config.article_scrape_workers * config.scrape_chunk_size
+    async with HttpScraperAdapter(max_connections=max_connections) as scraper:
+        result = await run_streaming_pipeline(listing_urls, db, scraper, llm, config)
+    valid = update_db_with_summaries(db, result.new_articles, result.summaries)
+    generate_newsletter_markdown(valid, filename=os.path.join(out_dir, "newsletter.md"))
+    return result, valid
+
+
+def run_scale(num_articles: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as fixtures_dir:
+        listing_paths = generate_fixtures(
+            fixtures_dir, num_articles, args.articles_per_listing, args.paragraphs, args.seed
+        )
+        config = StreamingPipelineConfig(
+            article_scrape_workers=args.scrape_workers,
+            summarize_workers=args.summarize_workers,
+        )
+        tracer = InMemoryTracer()
+        previous = set_tracer(tracer)
+        try:
+            with LocalStaticServer(fixtures_dir) as server:
+                listing_urls = [server.base_url + path for path in listing_paths]
+                start = time.perf_counter()
+                result, valid = asyncio.run(
+                    _run_flow(listing_urls, FakeLLM(args.llm_latency), config, fixtures_dir)
+                )
+                elapsed = time.perf_counter() - start
+        finally:
+            set_tracer(previous)
+    return {
+        "articles": num_articles,
+        "listings": len(listing_paths),
+        "summarized": len(valid),
+        "new_articles": len(result.new_articles),
+        "wall_s": elapsed,
+        "peak_rss_mb": _peak_rss_mb(),
+        "articles_per_s": len(valid) / elapsed if elapsed else 0.0,
+        "stages": _stage_throughput(tracer),
+    }
+
+
+def _run_isolated(num_articles: int, args: argparse.Namespace) -> Dict[str, Any]:
+    # Run di riscaldamento (import pigri, thread pool, inizializzazione dei parser) non misurato,
+    # alla scala minima per non alzare il picco di RSS del processo
+    run_scale(min(args.scales), args)
+    return run_scale(num_articles, args)
+
+
+def run_scale_in_subprocess(num_articles: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Esegue run_scale in un processo nuovo, così picco di RSS e stato globale partono da zero."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_isolated, num_articles, args).result()
+
+
+def _print_result(res: Dict[str, Any]) -> None:
+    print(
+        f"\n{res['articles']} articoli ({res['listings']} listing): {res['summarized']} riassunti "
+        f"in {res['wall_s']:.2f}s ({res['articles_per_s']:.1f} articoli/s), "
+        f"picco RSS {res['peak_rss_mb']:.0f} MB"
+    )
+    for stage, agg in res["stages"].items():
+        print(
+            f"  {stage:<15} {agg['items']:>6} elementi in {agg['seconds']:>7.2f}s "
+            f"({agg['items_per_s']:.1f}/s)"
+        )
+
+
+def _compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float) -> bool:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["articles"]: r for r in json.load(f)["results"]}
+    ok = True
+    for res in results:
+        base = baseline.get(res["articles"])
+        if base is None:
+            continue
+        ratio = res["wall_s"] / base["wall_s"] if base["wall_s"] else 1.0
+        status = "OK" if ratio <= 1 + tolerance else "REGRESSIONE"
+        ok = ok and status == "OK"
+        print(
+            f"{res['articles']:>6} articoli: {res['wall_s']:.2f}s vs {base['wall_s']:.2f}s "
+            f"({(ratio - 1) * 100:+.0f}%) {status}"
+        )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    parser.add_argument("--articles-per-listing", type=int, default=30)
+    parser.add_argument("--paragraphs", type=int, default=8)
+    parser.add_argument("--scrape-workers", type=int, default=3)
+    parser.add_argument("--summarize-workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="salva i risultati in questo file JSON")
+    parser.add_argument("--baseline", help="confronta con i risultati JSON di un run precedente")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        runs = sorted(
+            (run_scale_in_subprocess(scale, args) for _ in range(args.repeat)),
+            key=lambda r: r["wall_s"],
+        )
+        res = runs[len(runs) // 2]
+        _print_result(res)
+        results.append(res)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    if args.baseline:
+        print()
+        if not _compare(results, args.baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Misura come scala il throughput dei riassunti in pipeline_scrape_and_summarize_articles
+al variare di max_parallel, usando un LLM finto con latenza fissa.
+Con chiamate LLM realmente asincrone il throughput deve crescere ~linearmente con max_parallel.
+
+Uso:
+    python -m benchmarks.bench_llm_parallelism --articles 40 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+from app.domain.domain_utils import pipeline_scrape_and_summarize_articles
+from app.ports.models import NewArticleLink
+from benchmarks.fakes import FakeLLM, FakeScraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    articles = [
+        NewArticleLink(
+            listing_url="http://listing.local",
+            url=f"http://articles.local/{i}",
+            added_at=datetime.datetime.utcnow(),
+        )
+        for i in range(args.articles)
+    ]
+    for max_parallel in args.parallel:
+        start = time.perf_counter()
+        summaries = asyncio.run(
+            pipeline_scrape_and_summarize_articles(
+                articles, FakeScraper(), FakeLLM(args.latency), max_parallel=max_parallel
+            )
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"max_parallel={max_parallel:>2}: {len(summaries)} riassunti in {elapsed:.2f}s "
+            f"({len(summaries) / elapsed:.1f} riassunti/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark di MockDBHandler: inserisce N link e ripete la deduplica
+(filter_and_save_new_articles) con metà link già noti e metà nuovi.
+
+Uso:
+    python -m benchmarks.bench_mock_dbhandler --links 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.adapters.mock_dbhandler import MockDBHandler
+from app.domain.domain_utils import filter_and_save_new_articles
+from app.ports.models import ListingToArticles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.links
+    db = MockDBHandler()
+
+    start = time.perf_counter()
+    for i in range(n):
+        db.add_article_link(f"https://example.com/articolo/{i}")
+    insert_s = time.perf_counter() - start
+    print(f"insert: {n} link in {insert_s:.3f}s ({n / insert_s:,.0f} link/s)")
+
+    listing = ListingToArticles(
+        listing_url="https://example.com",
+        markdown="",
+        article_links=[f"https://example.com/articolo/{i}" for i in range(n // 2, n + n // 2)],
+    )
+    start = time.perf_counter()
+    new_articles = asyncio.run(filter_and_save_new_articles(db, [listing]))
+    dedup_s = time.perf_counter() - start
+    print(
+        f"dedup: {len(listing.article_links)} link ({len(new_articles)} nuovi) in {dedup_s:.3f}s"
+    )
+
+    start = time.perf_counter()
+    for article in new_articles[:1000]:
+        db.mark_article_as_visited(article.url, summary="riassunto")
+    unvisited = db.get_all_article_links(visited=False)
+    query_s = time.perf_counter() - start
+    print(f"mark 1000 + get_all_article_links(visited=False) [{len(unvisited)}]: {query_s:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Micro-benchmark di RepeatedItemsDetector su bounding box sintetici di un listing prodotto
+(header, griglia di card a 4 colonne, carosello di correlati, footer), costruiti
+direttamente come BoundingBoxSet senza browser. Per ogni dimensione riporta il tempo
+mediano di detect e verifica che gli elementi trovati siano esattamente le card.
+
+Uso:
+    python -m benchmarks.bench_repeated_items --boxes 2000 20000 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from src.bounding_box_set import BoundingBoxSet
+from src.repeated_items import RepeatedItemsDetector
+
+_GRID_XPATH = "/html[1]/body[1]/main[2]/div[1]"
+_CARD_WIDTH, _CARD_HEIGHT, _GAP = 300, 420, 16
+
+
+def _box(xpath, tag, x, y, width, height, num_children):
+    return {
+        "tag": tag,
+        "css_selector": xpath,
+        "xpath": xpath,
+        "x": x,
+        "y": y,
+        "width": width,
+        "height": height,
+        "num_children": num_children,
+    }
+
+
+def _card(boxes, path, i, x, y, rng):
+    boxes.append(_box(path, f'<div class="card card-{i}" data-id="{i}">', x, y, _CARD_WIDTH, _CARD_HEIGHT, 2))
+    boxes.append(_box(f"{path}/a[1]", f'<a class="card-link" href="/product/{i}">', x + 8, y + 8, 284, 284, 1))
+    boxes.append(_box(f"{path}/a[1]/img[1]", f'<img src="/img/{i}.jpg" alt="Prodotto {i}">', x + 8, y + 8, 284, 284, 0))
+    boxes.append(_box(f"{path}/div[2]", '<div class="info">', x + 8, y + 300, 284, 112, 3))
+    boxes.append(_box(f"{path}/div[2]/h3[1]", '<h3 class="title">', x + 8, y + 300, 284 - rng.randint(0, 120), 40, 0))
+    boxes.append(_box(f"{path}/div[2]/span[2]", '<span class="price">', x + 8, y + 344, 60, 20, 0))
+    boxes.append(_box(f"{path}/div[2]/ul[3]", '<ul class="badges">', x + 8, y + 372, 284, 24, 3))
+    for j in range(3):
+        boxes.append(_box(f"{path}/div[2]/ul[3]/li[{j + 1}]", "<li>", x + 8 + j * 90, y + 372, 80, 24, 0))
+
+
+def listing_boxes(num_boxes: int, seed: int = 0) -> BoundingBoxSet:
+    rng = random.Random(seed)
+    num_cards = max(num_boxes // 10, 1)
+    rows = (num_cards + 3) // 4
+    grid_height = rows * (_CARD_HEIGHT + _GAP)
+    boxes = [
+        _box("/html[1]", "<html>", 0, 0, 1280, grid_height + 800, 1),
+        _box("/html[1]/body[1]", "<body>", 0, 0, 1280, grid_height + 800, 4),
+        _box("/html[1]/body[1]/header[1]", '<header class="site-header">', 0, 0, 1280, 80, 1),
+        _box("/html[1]/body[1]/header[1]/nav[1]", "<nav>", 20, 20, 600, 40, 5),
+    ]
+    for i in range(5):
+        boxes.append(_box(f"/html[1]/body[1]/header[1]/nav[1]/a[{i + 1}]", f'<a href="/c/{i}">', 20 + i * 120, 20, 110, 40, 0))
+    boxes.append(_box("/html[1]/body[1]/main[2]", "<main>", 0, 100, 1280, grid_height, 1))
+    boxes.append(_box(_GRID_XPATH, '<div class="grid">', 20, 100, 1264, grid_height, num_cards))
+    for i in range(num_cards):
+        row, column = divmod(i, 4)
+        x, y = 20 + column * (_CARD_WIDTH + _GAP), 100 + row * (_CARD_HEIGHT + _GAP)
+        _card(boxes, f"{_GRID_XPATH}/div[{i + 1}]", i, x, y, rng)
+    # Carosello di correlati: elementi ripetuti anche lui, ma su un'area molto più piccola
+    top = 100 + grid_height
+    boxes.append(_box("/html[1]/body[1]/section[3]", '<section class="related">', 0, top, 1280, 260, 6))
+    for i in range(6):
+        boxes.append(
+            _box(f"/html[1]/body[1]/section[3]/div[{i + 1}]", '<div class="related-item">', 20 + i * 210, top + 10, 200, 240, 0)
+        )
+    boxes.append(_box("/html[1]/body[1]/footer[4]", "<footer>", 0, top + 300, 1280, 200, 0))
+    return BoundingBoxSet.from_boxes(boxes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boxes", type=int, nargs="+", default=[2000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    detector = RepeatedItemsDetector()
+
+    for num_boxes in args.boxes:
+        boxes = listing_boxes(num_boxes)
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = detector.detect(boxes)
+            timings.append(time.perf_counter() - start)
+        cards = [xpath for xpath in boxes.xpaths if xpath.count("/") == _GRID_XPATH.count("/") + 1 and xpath.startswith(_GRID_XPATH)]
+        found = [item.xpath for item in result.items]
+        print(
+            f"{len(boxes):>7} box: detect {statistics.median(timings) * 1000:7.1f} ms, "
+            f"{len(found)} elementi in {result.container.xpath if result.container else '-'}, "
+            f"card trovate esattamente: {'sì' if found == cards else 'NO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import asyncio
+import re
+import time
+from typing import List
+
+from app.ports.llm import LLMPort
+from app.ports.scraper import ScraperPort
+from app.ports.models import (
+    ArticleLinkExtractionInput,
+    ArticleLinkExtractionOutput,
+    ArticleLinkLLM,
+    ScrapeResult,
+    SummarizePageInput,
+    SummarizePageOutput,
+)
+
+
+class FakeScraper(ScraperPort):
+    """
+    Scraper finto: restituisce un contenuto deterministico per ogni URL dopo una latenza fissa.
+    """
+
+    def __init__(self, latency: float = 0.0, content_size: int = 2000):
+        self.latency = latency
+        self.content_size = content_size
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [
+            ScrapeResult(url=url, success=True, content=(f"# {url}\n" * 50)[: self.content_size])
+            for url in urls
+        ]
+
+
+class FakeLLM(LLMPort):
+    """
+    LLM finto e deterministico con latenza configurabile.
+    Le varianti sincrone bloccano il thread (come un client HTTP sincrono),
+    quelle asincrone cedono il controllo all'event loop.
+    L'estrazione dei link restituisce gli URL dell'input che contengono article_marker.
+    """
+
+    def __init__(self, latency: float = 0.1, article_marker: str = "/articles/"):
+        self.latency = latency
+        self.article_marker = article_marker
+
+    def extract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        time.sleep(self.latency)
+        return self._links(data)
+
+    def summarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        time.sleep(self.latency)
+        return SummarizePageOutput(summary_markdown=self._summary(data))
+
+    async def aextract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        await asyncio.sleep(self.latency)
+        return self._links(data)
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        await asyncio.sleep(self.latency)
+        return SummarizePageOutput(summary_markdown=self._summary(data))
+
+    def _links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        # Accetta sia il formato "Link: url, Text: testo" sia i link markdown
+        urls = re.findall(r"Link: (\S+),|\]\((\S+?)\)", data.markdown)
+        links = [a or b for a, b in urls if self.article_marker in (a or b)]
+        return ArticleLinkExtractionOutput(
+            links=[ArticleLinkLLM(link=url) for url in dict.fromkeys(links)]
+        )
+
+    def _summary(self, data: SummarizePageInput) -> str:
+        first_line = data.page_representation.strip().splitlines()[0] if data.page_representation.strip() else ""
+        return f"{first_line}\n\nRiassunto di {len(data.page_representation)} caratteri."
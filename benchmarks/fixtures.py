@@ -0,0 +1,107 @@
+"""
+Pagine sintetiche per bench_end_to_end: listing in stile Hacker News e articoli di testo
+generati da un seed. Non sono pagine reali registrate e ne sottostimano il costo:
+un articolo pesa circa 6 KB di HTML contro le centinaia di KB (fino ad alcuni MB) di un
+sito vero, senza script, CSS inline, banner dei cookie, commenti, widget e layout annidati.
+Il parsing HTML e la pulizia del boilerplate costano quindi molto meno che in produzione
+e i tempi di questi stage non vanno letti come tempi reali.
+"""
+
+import html
+import math
+import os
+import random
+from typing import List
+
+_WORDS = (
+    "python rust compiler latency throughput cache kernel async model training dataset "
+    "benchmark release database index query vector embedding server client protocol "
+    "memory allocator garbage collector thread scheduler network packet browser engine "
+    "framework library open source security patch performance profiling tracing startup"
+).split()
+
+_NAV = """
+<nav>
+  <a href="/">Home</a> | <a href="/newest">new</a> | <a href="/ask">ask</a> |
+  <a href="/login">login</a> | <a href="/submit">submit</a>
+</nav>
+"""
+
+_FOOTER = """
+<footer>
+  <p>All rights reserved. <a href="/privacy">Privacy policy</a> - <a href="/terms">Terms of use</a></p>
+  <p>Subscribe to our newsletter. We use cookies.</p>
+</footer>
+"""
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _title(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 9))).title()
+
+
+def article_html(rng: random.Random, index: int, paragraphs: int) -> str:
+    """Pagina articolo statica: titolo, paragrafi di testo, menu e footer da ripulire."""
+    title = html.escape(f"{_title(rng)} ({index})")
+    body = "\n".join(
+        f"<p>{' '.join(_sentence(rng, rng.randint(12, 25)) for _ in range(rng.randint(3, 6)))}</p>"
+        for _ in range(paragraphs)
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title></head><body>{_NAV}"
+        f"<article><h1>{title}</h1>\n{body}\n</article>{_FOOTER}</body></html>"
+    )
+
+
+def listing_html(rng: random.Random, article_paths: List[str], listing_index: int) -> str:
+    """Pagina di listing in stile Hacker News: una riga per articolo più link di navigazione/meta."""
+    rows = []
+    for rank, path in enumerate(article_paths, start=1):
+        item_id = listing_index * 1000 + rank
+        rows.append(
+            f'<tr><td>{rank}.</td><td><a href="{path}">{html.escape(_title(rng))}</a></td></tr>'
+            f'<tr><td></td><td>{rng.randint(1, 500)} points by <a href="/user?id=u{item_id}">u{item_id}</a> '
+            f'| <a href="/item?id={item_id}">{rng.randint(0, 300)} comments</a></td></tr>'
+        )
+    return (
+        f"<!DOCTYPE html><html><head><title>Listing {listing_index}</title></head><body>{_NAV}"
+        f"<table>{''.join(rows)}</table>{_FOOTER}</body></html>"
+    )
+
+
+def generate_fixtures(
+    directory: str,
+    num_articles: int,
+    articles_per_listing: int = 30,
+    paragraphs: int = 8,
+    seed: int = 0,
+) -> List[str]:
+    """
+    Scrive in directory num_articles pagine articolo (articles/<n>.html) e i listing che
+    le collegano (listings/<n>.html). Sono pagine sintetiche, non registrate da siti reali:
+    parole casuali con la struttura di Hacker News e di un articolo con menu e footer.
+    Il contenuto dipende solo da seed, quindi due run con gli stessi parametri producono
+    gli stessi file. Ritorna i path dei listing.
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(directory, "articles"), exist_ok=True)
+    os.makedirs(os.path.join(directory, "listings"), exist_ok=True)
+    article_paths = []
+    for i in range(num_articles):
+        path = f"/articles/{i}.html"
+        with open(os.path.join(directory, path.lstrip("/")), "w", encoding="utf-8") as f:
+            f.write(article_html(rng, i, paragraphs))
+        article_paths.append(path)
+
+    listing_paths = []
+    for i in range(math.ceil(num_articles / articles_per_listing)):
+        chunk = article_paths[i * articles_per_listing : (i + 1) * articles_per_listing]
+        path = f"/listings/{i}.html"
+        with open(os.path.join(directory, path.lstrip("/")), "w", encoding="utf-8") as f:
+            f.write(listing_html(rng, chunk, i))
+        listing_paths.append(path)
+    return listing_paths
@@ -1,52 +1,69 @@
 from app.ports.dbhandler import DBHandlerPort
-from app.adapters.mock_dbhandler import MockDBHandler
+from app.adapters.sqlite_dbhandler import SQLiteDBHandler
 from app.ports.scraper import ScraperPort
 from app.adapters.crawl4ai_scraper import Crawl4AIScraperAdapter
+from app.adapters.http_scraper import HttpScraperAdapter
+from app.adapters.polite_scraper import PoliteScraperAdapter
+from app.adapters.resilience import ResilientLLMAdapter, ResilientScraperAdapter, RetryPolicy
 from app.ports.llm import LLMPort
 from app.adapters.langchain_llm_adapter import LangChainLLMAdapter
-from app.domain.domain_utils import (
-    pipeline_listing_to_articles,
-    filter_and_save_new_articles,
-    scrape_articles_content,
-    pipeline_scrape_and_summarize_articles,
+from app.adapters.summary_cache import SummaryCache
+from app.ports.tracer import set_tracer
+from app.adapters.memory_tracer import InMemoryTracer
+from app.domain.streaming_pipeline import (
+    run_streaming_pipeline,
+    StreamingPipelineConfig,
 )
+from app.domain.checkpoint import RunCheckpoint
+from app.domain.scoring import ScoringConfig
 from app.domain.newsletter_utils import (
     update_db_with_summaries,
     generate_newsletter_markdown,
 )
 from app.ports.email_sender import EmailSenderPort
 from app.adapters.mock_email_sender import MockEmailSender
+import argparse
 import asyncio
 
 # Dependency inversion: usiamo solo la porta nel codice applicativo
 
 
-def main():
-    db: DBHandlerPort = MockDBHandler()
-    scraper: ScraperPort = Crawl4AIScraperAdapter()
-    llm: LLMPort = LangChainLLMAdapter()
-    email_sender: EmailSenderPort = MockEmailSender()
-
-    db.add_news_listing_url("https://github.com/trending/python?since=daily")
-    db.add_news_listing_url("https://news.ycombinator.com")
-
+async def run(
+    db: DBHandlerPort,
+    scraper: ResilientScraperAdapter,
+    llm: LLMPort,
+    email_sender: EmailSenderPort,
+    checkpoint: RunCheckpoint,
+):
     listing_urls = [item.url for item in db.get_all_news_listing_urls()]
 
-    results = asyncio.run(pipeline_listing_to_articles(listing_urls, scraper, llm))
-    new_articles = asyncio.run(filter_and_save_new_articles(db, results))
-    for art in new_articles:
+    # Un solo browser condiviso per tutta l'esecuzione; gli stage (listing, link,
+    # dedup, scraping articoli, sintesi) girano in concorrenza collegati da code.
+    async with scraper:
+        result = await run_streaming_pipeline(
+            listing_urls,
+            db,
+            scraper,
+            llm,
+            StreamingPipelineConfig(
+                summarize_workers=3,
+                max_articles=3,
+                # I nuovi articoli oltre il limite vengono scelti per punteggio, non per ordine
+                scoring=ScoringConfig(
+                    topics=["python", "ai", "llm", "rust", "database", "security", "open source"],
+                ),
+            ),
+            checkpoint=checkpoint,
+        )
+    for art in result.new_articles:
         print(
             f"Nuovo articolo salvato: {art.url} (listing: {art.listing_url}, aggiunto: {art.added_at})"
         )
 
-    # Pipeline: scraping + sintesi articoli con semaforo (max 3 in parallelo)
-    if new_articles:
-        summaries = asyncio.run(
-            pipeline_scrape_and_summarize_articles(
-                new_articles[:3], scraper, llm, max_parallel=3
-            )
+    if result.new_articles:
+        valid_summaries = update_db_with_summaries(
+            db, result.new_articles, result.summaries
         )
-        valid_summaries = update_db_with_summaries(db, new_articles, summaries)
         newsletter_file = generate_newsletter_markdown(valid_summaries)
         print(f"Newsletter generata: {newsletter_file}")
         # Invio newsletter via email (mock)
@@ -57,5 +74,88 @@ def main():
         )
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tech Daily News: listing -> riassunti -> newsletter")
+    parser.add_argument("--run-id", help="identificativo del run (default: timestamp corrente)")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="riprende il run indicato da --run-id, o l'ultimo non completato, saltando il lavoro già fatto",
+    )
+    parser.add_argument("--checkpoint-dir", default="runs", help="directory dei checkpoint dei run")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.resume and not args.run_id:
+        checkpoint = RunCheckpoint.latest(args.checkpoint_dir)
+        if checkpoint is None:
+            print("Nessun run da riprendere: ne avvio uno nuovo")
+            checkpoint = RunCheckpoint(args.checkpoint_dir)
+    else:
+        checkpoint = RunCheckpoint(args.checkpoint_dir, args.run_id)
+    if args.resume:
+        print(f"Ripresa del run {checkpoint.run_id}")
+    elif checkpoint.load_listings():
+        print(f"Il run {checkpoint.run_id} esiste già: usa --resume per riprenderlo")
+        return
+
+    # Storico persistente: gli articoli già riassunti nei run precedenti vengono saltati
+    db: DBHandlerPort = SQLiteDBHandler("tech_daily_news.sqlite")
+    # HTTP diretto per le pagine statiche, browser solo per quelle che richiedono JavaScript;
+    # lo scheduler limita richieste e frequenza per host e ritenta 429/503 rispettando
+    # Retry-After. I tentativi con backoff e circuit breaker per host stanno fuori dallo
+    # scheduler: le attese non occupano i suoi slot e ogni errore è ritentato da un solo livello.
+    # Il timeout vale per ogni richiesta; quello del blocco lo stima lo scheduler
+    scraper = ResilientScraperAdapter(
+        PoliteScraperAdapter(
+            HttpScraperAdapter(fallback=Crawl4AIScraperAdapter(max_sessions=5)),
+            max_concurrency=8,
+            request_timeout_s=120.0,
+        ),
+        RetryPolicy(timeout_s=120.0),
+    )
+    summary_cache = SummaryCache()
+    llm = ResilientLLMAdapter(
+        LangChainLLMAdapter(summary_cache=summary_cache, raise_on_error=True)
+    )
+    email_sender: EmailSenderPort = MockEmailSender()
+
+    known_listings = {item.url for item in db.get_all_news_listing_urls()}
+    for listing_url in (
+        "https://github.com/trending/python?since=daily",
+        "https://news.ycombinator.com",
+    ):
+        if listing_url not in known_listings:
+            db.add_news_listing_url(listing_url)
+
+    # Span e contatori del run, esportati per l'analisi offline (chrome://tracing, Perfetto)
+    tracer = InMemoryTracer()
+    set_tracer(tracer)
+    asyncio.run(run(db, scraper, llm, email_sender, checkpoint))
+    checkpoint.mark_completed()
+    trace_path = f"traces/run_{checkpoint.run_id}"
+    tracer.export_jsonl(f"{trace_path}.jsonl")
+    tracer.export_chrome_trace(f"{trace_path}.trace.json")
+    print(f"Trace salvate in {trace_path}.jsonl e {trace_path}.trace.json")
+    for name, agg in sorted(tracer.summary().items()):
+        if name.startswith(("stage.", "pipeline.")):
+            print(f"{name}: {agg['count']} volte, totale {agg['total']:.2f}s, max {agg['max']:.2f}s")
+    print(
+        f"Cache riassunti: {summary_cache.stats.hits} hit, {summary_cache.stats.misses} miss"
+    )
+    for name, metrics in (("scraper", scraper.metrics), ("LLM", llm.metrics)):
+        print(
+            f"Resilienza {name}: {metrics.retries} tentativi ripetuti, {metrics.timeouts} timeout, "
+            f"{metrics.failures} fallimenti, circuito aperto {metrics.breaker_trips} volte"
+        )
+    for operation, t in llm.timing_summary().items():
+        print(
+            f"{operation}: {t['calls']} chiamate, modello {t['model_s']:.1f}s, "
+            f"prompt {t['prompt_render_s']:.3f}s, parsing {t['parse_s']:.3f}s"
+        )
+
+
 if __name__ == "__main__":
     main()
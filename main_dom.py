@@ -3,7 +3,7 @@ from src.session_tools import (
     open_browser_session,
     close_browser_session,
     navigate_to_url,
-    get_bounding_boxes,
+    get_bounding_box_set,
     highlight_bounding_box,
     scroll_page_down,
     scroll_page_up,
@@ -19,14 +19,10 @@ from src.models import (
     ScreenshotElementInput,
     PageInfoInput,
     PageInfoOutput,
-    SelectorType,
     ContainerFinderResult,
 )
-from src.bounding_box_handler import (
-    DOMContainerFinder,
-    get_children_of_bbox,
-    find_bbox_by_selector,
-)
+from src.repeated_items import RepeatedItemsDetector
+from src.spatial_index import SpatialIndex, GeometricContainerFinder
 from src.vlm import ModelType
 import time
 import pandas as pd
@@ -37,7 +33,7 @@ import os
 def main():
 
     os.makedirs("screenshots", exist_ok=True)
-    dom_container_finder = DOMContainerFinder()
+    repeated_items_detector = RepeatedItemsDetector()
 
     page_type = "LISTING"
     url = "https://www.bulgari.com/en-us/jewelry"
@@ -55,34 +51,20 @@ def main():
     page_info = get_page_info(PageInfoInput(page_type=page_type, url=url))
 
     # 3. Recupera tutti i bounding box visibili
-    bbox_output = get_bounding_boxes(GetBoundingBoxesInput(selector="body"))
-    bounding_boxes = bbox_output.bounding_boxes
-
-    # 5. Salva in un CSV i dati dei bounding box ordinati per area usando pandas
-    bounding_boxes_sorted = sorted(bounding_boxes, key=lambda b: b.area(), reverse=True)
+    bbox_set = get_bounding_box_set(GetBoundingBoxesInput(selector="body"))
 
-    page_main = find_bbox_by_selector(
-        bounding_boxes=bounding_boxes_sorted,
-        selector="/html/body[2]/div[3]/div[2]/div[1]/div[4]/main[1]/div[2]/div[3]",
-        selector_type=SelectorType.XPATH,
-    )
-
-    result = dom_container_finder.find_container(
-        bounding_boxes=bounding_boxes_sorted,
-        start_selector=page_main.xpath,
-        selector_type=SelectorType.XPATH,
-    )
+    # 4. Rileva le card ripetute del listing (firma dei fratelli, dimensioni, allineamento)
+    result = repeated_items_detector.detect(bbox_set)
+    if result.result_type != ContainerFinderResult.SUCCESS:
+        # Ripiego geometrico: card simili e allineate anche senza un padre comune nel DOM
+        result = GeometricContainerFinder(SpatialIndex(bbox_set)).find_container()
 
     if result.result_type == ContainerFinderResult.SUCCESS:
         print("Container trovato con successo!")
         print(f"Container: {result.container}")
-        print(f"Search Path: {[b.xpath for b in result.search_path]}")
-
-        root_container = result.container
-        print(f"Root Container: {root_container}")
-        root_children = get_children_of_bbox(bounding_boxes_sorted, root_container)
+        print(result.message)
 
-        for bbox in root_children:
+        for bbox in result.items:
             print(f"Processing selector: {bbox}")
             selector = bbox.css_selector.strip()
             hash_name = hashlib.md5(selector.encode()).hexdigest()
@@ -97,7 +79,6 @@ def main():
     else:
         print("Nessun container trovato.")
         print(f"Messaggio: {result.message}")
-        print(f"Search Path: {[b.xpath for b in result.search_path]}")
 
     close_browser_session()
     return
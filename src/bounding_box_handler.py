@@ -4,35 +4,91 @@ from src.models import (
     ContainerSearchResult,
     ContainerFinderResult,
 )
-from typing import Optional, List
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
+
+
+class BoundingBoxTree:
+    """
+    Indice dei bounding box di una pagina, da costruire una volta sola (O(n)).
+    Il padre di un box è quello con l'xpath senza l'ultimo passo, quindi figli diretti,
+    padre, ricerca per xpath/selettore CSS e profondità costano O(1) (o O(figli)).
+    A parità di selettore vale il primo box nell'ordine della lista, e i figli
+    mantengono l'ordine della lista, come le vecchie scansioni lineari.
+    """
+
+    def __init__(self, bounding_boxes: List[BoundingBox]):
+        self.bounding_boxes = bounding_boxes
+        self._by_xpath: Dict[str, BoundingBox] = {}
+        self._by_css: Dict[str, BoundingBox] = {}
+        self._children: Dict[str, List[BoundingBox]] = {}
+        self._depth: Dict[str, int] = {}
+        for bbox in bounding_boxes:
+            self._by_xpath.setdefault(bbox.xpath, bbox)
+            self._by_css.setdefault(bbox.css_selector, bbox)
+            self._children.setdefault(_parent_xpath(bbox.xpath), []).append(bbox)
+            if bbox.xpath not in self._depth:
+                self._depth[bbox.xpath] = bbox.xpath.count("/")
+
+    def __len__(self) -> int:
+        return len(self.bounding_boxes)
+
+    def __iter__(self):
+        return iter(self.bounding_boxes)
+
+    def find(self, selector: str, selector_type: SelectorType) -> Optional[BoundingBox]:
+        if selector_type == SelectorType.CSS:
+            return self._by_css.get(selector)
+        if selector_type == SelectorType.XPATH:
+            return self._by_xpath.get(selector)
+        return None
+
+    def children(self, parent: BoundingBox) -> List[BoundingBox]:
+        return list(self._children.get(parent.xpath, []))
+
+    def parent(self, bbox: BoundingBox) -> Optional[BoundingBox]:
+        return self._by_xpath.get(_parent_xpath(bbox.xpath))
+
+    def depth(self, bbox: BoundingBox) -> int:
+        """Numero di passi dell'xpath (/html = 1, /html/body[2] = 2, ...)."""
+        depth = self._depth.get(bbox.xpath)
+        return depth if depth is not None else bbox.xpath.count("/")
+
+
+def _parent_xpath(xpath: str) -> str:
+    return xpath.rsplit("/", 1)[0]
+
+
+def as_bounding_box_tree(
+    bounding_boxes: Union[List[BoundingBox], BoundingBoxTree],
+) -> BoundingBoxTree:
+    """Riusa l'indice se già costruito, altrimenti lo costruisce dalla lista."""
+    if isinstance(bounding_boxes, BoundingBoxTree):
+        return bounding_boxes
+    return BoundingBoxTree(bounding_boxes)
 
 
 def get_children_of_bbox(
-    bounding_boxes: List[BoundingBox], parent_bbox: BoundingBox
+    bounding_boxes: Union[List[BoundingBox], BoundingBoxTree], parent_bbox: BoundingBox
 ) -> List[BoundingBox]:
     """
     Restituisce la lista dei BoundingBox che sono figli diretti del bounding box specificato.
+    Con più ricerche sulla stessa pagina conviene passare un BoundingBoxTree.
     """
-    parent_xpath = parent_bbox.xpath
-    children_xpath_prefix = parent_xpath + "/"
-    parent_depth = parent_xpath.count("/")
-    return [
-        bbox
-        for bbox in bounding_boxes
-        if bbox.xpath.startswith(children_xpath_prefix)
-        and bbox.xpath.count("/") == parent_depth + 1
-    ]
+    return as_bounding_box_tree(bounding_boxes).children(parent_bbox)
 
 
 def find_bbox_by_selector(
-    bounding_boxes: List[BoundingBox],
+    bounding_boxes: Union[List[BoundingBox], BoundingBoxTree],
     selector: str,
     selector_type: SelectorType,
 ) -> Optional[BoundingBox]:
     """
     Restituisce il BoundingBox che corrisponde esattamente al selettore fornito (css_selector o xpath).
+    Con più ricerche sulla stessa pagina conviene passare un BoundingBoxTree.
     """
+    if isinstance(bounding_boxes, BoundingBoxTree):
+        return bounding_boxes.find(selector, selector_type)
+    # Una sola ricerca: la scansione lineare costa meno della costruzione dell'indice
     for bbox in bounding_boxes:
         if selector_type == SelectorType.CSS and bbox.css_selector == selector:
             return bbox
@@ -47,12 +103,12 @@ class DOMContainerFinder:
 
     def find_container(
         self,
-        bounding_boxes: List[BoundingBox],
+        bounding_boxes: Union[List[BoundingBox], BoundingBoxTree],
         start_selector: str,
         selector_type: SelectorType = SelectorType.CSS,
     ) -> ContainerSearchResult:
 
-        if not bounding_boxes:
+        if not len(bounding_boxes):
             return ContainerSearchResult(
                 result_type=ContainerFinderResult.INVALID_SELECTOR,
                 container=None,
@@ -61,8 +117,9 @@ class DOMContainerFinder:
                 depth=0,
             )
 
+        tree = as_bounding_box_tree(bounding_boxes)
         start_element = self._find_element_by_selector(
-            bounding_boxes, start_selector, selector_type
+            tree, start_selector, selector_type
         )
 
         if not start_element:
@@ -74,38 +131,24 @@ class DOMContainerFinder:
                 depth=0,
             )
 
-        return self._recursive_search(bounding_boxes, start_element, [])
+        return self._recursive_search(tree, start_element, [])
 
     def _find_element_by_selector(
         self,
-        bounding_boxes: List[BoundingBox],
+        tree: BoundingBoxTree,
         selector: str,
         selector_type: SelectorType,
     ) -> Optional[BoundingBox]:
-        for bbox in bounding_boxes:
-            if selector_type == SelectorType.CSS and bbox.css_selector == selector:
-                return bbox
-            if selector_type == SelectorType.XPATH and bbox.xpath == selector:
-                return bbox
-        return None
+        return tree.find(selector, selector_type)
 
     def _get_direct_children(
-        self, bounding_boxes: List[BoundingBox], parent: BoundingBox
+        self, tree: BoundingBoxTree, parent: BoundingBox
     ) -> List[BoundingBox]:
-        parent_xpath = parent.xpath
-        children_xpath_prefix = parent_xpath + "/"
-        parent_depth = parent_xpath.count("/")
-
-        return [
-            bbox
-            for bbox in bounding_boxes
-            if bbox.xpath.startswith(children_xpath_prefix)
-            and bbox.xpath.count("/") == parent_depth + 1
-        ]
+        return tree.children(parent)
 
     def _recursive_search(
         self,
-        bounding_boxes: List[BoundingBox],
+        tree: BoundingBoxTree,
         current_element: BoundingBox,
         search_path: List[BoundingBox],
     ) -> ContainerSearchResult:
@@ -120,7 +163,7 @@ class DOMContainerFinder:
                 depth=len(current_path),
             )
 
-        direct_children = self._get_direct_children(bounding_boxes, current_element)
+        direct_children = self._get_direct_children(tree, current_element)
         num_children = len(direct_children)
 
         if num_children > 1:
@@ -143,7 +186,7 @@ class DOMContainerFinder:
 
         else:  # num_children == 1
             return self._recursive_search(
-                bounding_boxes, direct_children[0], current_path
+                tree, direct_children[0], current_path
             )
 
     def get_container_analysis(self, result: ContainerSearchResult) -> dict:
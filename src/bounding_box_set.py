@@ -0,0 +1,200 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+import numpy as np
+from src.models import BoundingBox
+
+_NUMERIC_COLUMNS = ("x", "y", "width", "height", "num_children", "depth")
+# Box convertiti in BoundingBox per volta durante l'iterazione
+_ITER_CHUNK = 1024
+
+
+class BoundingBoxSet:
+    """
+    Collezione colonnare di bounding box: coordinate, dimensioni, numero di figli e profondità
+    in array NumPy (int32), tag di apertura in una tabella di stringhe condivisa (tag_ids),
+    xpath e selettori CSS in liste parallele. Area, ordinamento, contenimento e
+    intersezione con un rettangolo sono operazioni vettoriali; i BoundingBox pydantic
+    vengono creati solo quando richiesti.
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        width: np.ndarray,
+        height: np.ndarray,
+        num_children: np.ndarray,
+        depth: np.ndarray,
+        tag_ids: np.ndarray,
+        tags: List[str],
+        xpaths: List[str],
+        css_selectors: List[str],
+    ):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.num_children = num_children
+        self.depth = depth
+        self.tag_ids = tag_ids
+        self.tags = tags
+        self.xpaths = xpaths
+        self.css_selectors = css_selectors
+        self._area: Optional[np.ndarray] = None
+
+    # --- Costruzione ---
+
+    @classmethod
+    def from_columnar(cls, payload: dict) -> "BoundingBoxSet":
+        """
+        Dal payload di BOUNDING_BOXES_JS (vedi playwright_scraper), senza passare da una lista
+        di dict: i path completi si ricostruiscono dal path del padre, già calcolato.
+        """
+        count = payload["count"]
+        parents = payload["parent"]
+        xpaths: List[str] = []
+        css_selectors: List[str] = []
+        for i in range(count):
+            parent = parents[i]
+            if parent >= 0:
+                xpaths.append(xpaths[parent] + "/" + payload["xpath_step"][i])
+                css_selectors.append(css_selectors[parent] + " > " + payload["css_step"][i])
+            else:
+                xpaths.append(payload["xpath_step"][i])
+                css_selectors.append(payload["css_step"][i])
+        columns = {name: np.asarray(payload[name], dtype=np.int32) for name in _NUMERIC_COLUMNS}
+        return cls(
+            **columns,
+            tag_ids=np.asarray(payload["tag"], dtype=np.int32),
+            tags=list(payload["tags"]),
+            xpaths=xpaths,
+            css_selectors=css_selectors,
+        )
+
+    @classmethod
+    def from_boxes(cls, boxes: Sequence[Union[BoundingBox, dict]]) -> "BoundingBoxSet":
+        """Da BoundingBox o dict (formato di get_bounding_boxes); depth si ricava dall'xpath se manca."""
+        rows = [box.model_dump() if isinstance(box, BoundingBox) else box for box in boxes]
+        tag_index: Dict[str, int] = {}
+        tag_ids = [tag_index.setdefault(row.get("tag", ""), len(tag_index)) for row in rows]
+        columns = {
+            name: np.fromiter((row.get(name, 0) for row in rows), dtype=np.int32, count=len(rows))
+            for name in _NUMERIC_COLUMNS
+            if name != "depth"
+        }
+        depth = np.fromiter(
+            (row.get("depth", row["xpath"].count("/")) for row in rows), dtype=np.int32, count=len(rows)
+        )
+        return cls(
+            **columns,
+            depth=depth,
+            tag_ids=np.asarray(tag_ids, dtype=np.int32),
+            tags=list(tag_index),
+            xpaths=[row["xpath"] for row in rows],
+            css_selectors=[row["css_selector"] for row in rows],
+        )
+
+    # --- Accesso ---
+
+    def __len__(self) -> int:
+        return len(self.xpaths)
+
+    def __getitem__(self, index: int) -> BoundingBox:
+        return self.to_bounding_boxes([index])[0]
+
+    def __iter__(self) -> Iterator[BoundingBox]:
+        # A blocchi: su pagine con decine di migliaia di elementi non si crea tutta la lista
+        for start in range(0, len(self), _ITER_CHUNK):
+            yield from self._slice(start, start + _ITER_CHUNK).to_bounding_boxes()
+
+    def to_bounding_boxes(self, indices: Optional[Sequence[int]] = None) -> List[BoundingBox]:
+        """
+        BoundingBox dei box agli indici dati (tutti se None). Le colonne vengono convertite
+        in liste Python in un colpo solo: leggere gli scalari NumPy uno per uno è lento.
+        """
+        if indices is None:
+            subset = self
+        else:
+            subset = self.take(indices)
+        tags = subset.tags
+        return [
+            BoundingBox(
+                tag=tags[tag_id],
+                css_selector=css_selector,
+                xpath=xpath,
+                x=x,
+                y=y,
+                width=width,
+                height=height,
+                num_children=num_children,
+            )
+            for tag_id, css_selector, xpath, x, y, width, height, num_children in zip(
+                subset.tag_ids.tolist(),
+                subset.css_selectors,
+                subset.xpaths,
+                subset.x.tolist(),
+                subset.y.tolist(),
+                subset.width.tolist(),
+                subset.height.tolist(),
+                subset.num_children.tolist(),
+            )
+        ]
+
+    def take(self, indices: Union[np.ndarray, Sequence[int]]) -> "BoundingBoxSet":
+        """Sottoinsieme (o riordinamento) dei box agli indici dati; la tabella dei tag è condivisa."""
+        indices = np.asarray(indices, dtype=np.intp)
+        return BoundingBoxSet(
+            **{name: getattr(self, name)[indices] for name in _NUMERIC_COLUMNS},
+            tag_ids=self.tag_ids[indices],
+            tags=self.tags,
+            xpaths=[self.xpaths[i] for i in indices],
+            css_selectors=[self.css_selectors[i] for i in indices],
+        )
+
+    def _slice(self, start: int, stop: int) -> "BoundingBoxSet":
+        """Intervallo contiguo di box: le colonne NumPy sono viste, senza copia."""
+        return BoundingBoxSet(
+            **{name: getattr(self, name)[start:stop] for name in _NUMERIC_COLUMNS},
+            tag_ids=self.tag_ids[start:stop],
+            tags=self.tags,
+            xpaths=self.xpaths[start:stop],
+            css_selectors=self.css_selectors[start:stop],
+        )
+
+    # --- Query vettoriali ---
+
+    def area(self) -> np.ndarray:
+        if self._area is None:
+            self._area = self.width.astype(np.int64) * self.height
+        return self._area
+
+    def argsort_by_area(self, descending: bool = True) -> np.ndarray:
+        # Ordinamento stabile: a parità di area resta l'ordine del documento, come sorted()
+        return np.argsort(-self.area() if descending else self.area(), kind="stable")
+
+    def sorted_by_area(self, descending: bool = True) -> "BoundingBoxSet":
+        return self.take(self.argsort_by_area(descending))
+
+    def contained_in(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Indici dei box interamente contenuti nel rettangolo (bordi compresi)."""
+        mask = (
+            (self.x >= x)
+            & (self.y >= y)
+            & (self.x + self.width <= x + width)
+            & (self.y + self.height <= y + height)
+        )
+        return np.flatnonzero(mask)
+
+    def intersecting(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Indici dei box che si sovrappongono al rettangolo (es. il viewport a un dato scroll)."""
+        mask = (
+            (self.x < x + width)
+            & (self.x + self.width > x)
+            & (self.y < y + height)
+            & (self.y + self.height > y)
+        )
+        return np.flatnonzero(mask)
+
+    def in_viewport(self, scroll_y: int, viewport_height: int, viewport_width: Optional[int] = None) -> np.ndarray:
+        """Indici dei box visibili, anche in parte, nella fascia verticale del viewport."""
+        width = viewport_width if viewport_width is not None else int(np.iinfo(np.int32).max)
+        return self.intersecting(0, scroll_y, width, viewport_height)
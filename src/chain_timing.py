@@ -0,0 +1,114 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# record_span(nome, inizio_s, durata_s, **attributi), es. il tracer di app.ports.tracer
+SpanRecorder = Callable[..., None]
+
+
+@dataclass
+class CallTimings:
+    """Tempi (secondi) di una chiamata prompt -> modello -> parser."""
+
+    operation: str
+    prompt_render_s: float
+    model_s: float
+    parse_s: float
+
+    @property
+    def total_s(self) -> float:
+        return self.prompt_render_s + self.model_s + self.parse_s
+
+
+class TimedChain:
+    """
+    Catena prompt | modello | parser costruita una sola volta e riusata per ogni chiamata.
+    Esegue i tre passi separatamente per misurarne i tempi, registrati in `timings`
+    (gli ultimi max_records) e, se indicato, passati a record_span come span
+    llm.model.<operation>. `chain` espone la composizione LangChain equivalente.
+    Usata sia da src.llm.LLM sia da LangChainLLMAdapter, per avere gli stessi tempi per fase.
+    """
+
+    def __init__(
+        self,
+        operation: str,
+        prompt,
+        llm,
+        parser,
+        timings: Deque[CallTimings],
+        record_span: Optional[SpanRecorder] = None,
+    ):
+        self.operation = operation
+        self.prompt = prompt
+        self.llm = llm
+        self.parser = parser
+        self.chain = prompt | llm | parser
+        self._timings = timings
+        self._record_span = record_span
+
+    def invoke(self, variables: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        prompt_value = self.prompt.invoke(variables)
+        rendered = time.perf_counter()
+        raw = self.llm.invoke(prompt_value)
+        answered = time.perf_counter()
+        parsed = self.parser.invoke(raw)
+        self._record(start, rendered, answered, time.perf_counter())
+        return parsed
+
+    async def ainvoke(self, variables: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        prompt_value = await self.prompt.ainvoke(variables)
+        rendered = time.perf_counter()
+        raw = await self.llm.ainvoke(prompt_value)
+        answered = time.perf_counter()
+        parsed = await self.parser.ainvoke(raw)
+        self._record(start, rendered, answered, time.perf_counter())
+        return parsed
+
+    def _record(self, start: float, rendered: float, answered: float, parsed: float) -> None:
+        if self._record_span is not None:
+            self._record_span(
+                f"llm.model.{self.operation}",
+                start,
+                parsed - start,
+                prompt_render_s=rendered - start,
+                model_s=answered - rendered,
+                parse_s=parsed - answered,
+            )
+        self._timings.append(
+            CallTimings(
+                operation=self.operation,
+                prompt_render_s=rendered - start,
+                model_s=answered - rendered,
+                parse_s=parsed - answered,
+            )
+        )
+
+
+def new_timings_log(max_records: int = 10_000) -> Deque[CallTimings]:
+    return deque(maxlen=max_records)
+
+
+def summarize_timings(timings: List[CallTimings]) -> Dict[str, Dict[str, float]]:
+    """
+    Aggrega i tempi per operazione: numero di chiamate, totali per fase e quota
+    di tempo spesa fuori dal modello (render del prompt + parsing).
+    """
+    summary: Dict[str, Dict[str, float]] = {}
+    for t in timings:
+        agg = summary.setdefault(
+            t.operation,
+            {"calls": 0, "prompt_render_s": 0.0, "model_s": 0.0, "parse_s": 0.0},
+        )
+        agg["calls"] += 1
+        agg["prompt_render_s"] += t.prompt_render_s
+        agg["model_s"] += t.model_s
+        agg["parse_s"] += t.parse_s
+    for agg in summary.values():
+        total = agg["prompt_render_s"] + agg["model_s"] + agg["parse_s"]
+        agg["overhead_ratio"] = (
+            (agg["prompt_render_s"] + agg["parse_s"]) / total if total else 0.0
+        )
+    return summary
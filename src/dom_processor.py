@@ -2,24 +2,44 @@ from src.models import Link
 from bs4 import BeautifulSoup, Tag, NavigableString
 from typing import Optional, Callable, Dict, List, Union
 import requests
+import requests.adapters
 from typing import List, Optional
 
 
-def fetch_html(url: str, timeout: int = 10) -> Optional[str]:
+_session: Optional[requests.Session] = None
+
+
+def _get_session() -> requests.Session:
     """
-    Recupera l'HTML di un sito tramite una richiesta HTTP GET.
-    Restituisce il contenuto HTML come stringa, oppure None in caso di errore.
-    Utilizza un fake user agent per evitare blocchi da parte dei siti.
+    Sessione HTTP condivisa: riusa le connessioni keep-alive verso lo stesso host
+    invece di aprirne una nuova (TCP + TLS) a ogni chiamata di fetch_html.
     """
-    try:
+    global _session
+    if _session is None:
         try:
             from fake_useragent import UserAgent
 
             user_agent = UserAgent().random
         except ImportError:
             user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        headers = {"User-Agent": user_agent}
-        response = requests.get(url, headers=headers, timeout=timeout)
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"User-Agent": user_agent})
+        _session = session
+    return _session
+
+
+def fetch_html(url: str, timeout: int = 10) -> Optional[str]:
+    """
+    Recupera l'HTML di un sito tramite una richiesta HTTP GET.
+    Restituisce il contenuto HTML come stringa, oppure None in caso di errore.
+    Utilizza un fake user agent per evitare blocchi da parte dei siti e una sessione
+    condivisa per riusare le connessioni tra chiamate successive.
+    """
+    try:
+        response = _get_session().get(url, timeout=timeout)
         response.raise_for_status()
         return response.text
     except requests.RequestException as e:
@@ -3,9 +3,10 @@ from src.prompts import filter_links_prompt, summarize_page_prompt, extract_arti
 from enum import Enum
 from langchain_openai import ChatOpenAI
 from langchain_ollama import OllamaLLM
-from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.output_parsers import PydanticOutputParser, StrOutputParser
 from langchain.prompts import PromptTemplate
-from typing import List
+from typing import Dict, List
+from src.chain_timing import TimedChain, new_timings_log, summarize_timings
 
 
 class ModelType(Enum):
@@ -16,10 +17,15 @@ class ModelType(Enum):
 
 
 class LLM:
-    def __init__(self, model=ModelType.LLAMA):
+    def __init__(self, model=ModelType.LLAMA, summary_cache=None):
         """
         Inizializza il modello LLM (OpenAI o Ollama) in base al tipo richiesto.
+        Se summary_cache è fornita, summarize_page riusa i riassunti già generati per lo stesso contenuto.
+        La cache arriva dal chiamante (es. app.adapters.summary_cache.SummaryCache): basta
+        che esponga make_key(modello, template, contenuto), get(chiave) e set(chiave, riassunto).
         """
+        self.model = model
+        self.summary_cache = summary_cache
         print(f"Using {model.value}")
         if model == ModelType.OPENAI:
             print("openai")
@@ -27,21 +33,56 @@ class LLM:
         else:
             self.llm = OllamaLLM(model=model.value, temperature=0)
 
+        # Catene costruite una sola volta (prompt, format instructions, parser) e riusate,
+        # con i tempi per fase come in LangChainLLMAdapter (src/chain_timing.py)
+        self.timings = new_timings_log()
+        link_list_parser = PydanticOutputParser(pydantic_object=LinkList)
+        format_instructions = link_list_parser.get_format_instructions()
+        self.filter_links_chain = TimedChain(
+            "filter_links_by_topics",
+            PromptTemplate(
+                template=filter_links_prompt,
+                input_variables=["links", "topics"],
+                partial_variables={"format_instructions": format_instructions},
+            ),
+            self.llm,
+            link_list_parser,
+            self.timings,
+        )
+        self.extract_article_links_chain = TimedChain(
+            "extract_article_links",
+            PromptTemplate(
+                template=extract_article_links_prompt,
+                input_variables=["summary"],
+                partial_variables={"format_instructions": format_instructions},
+            ),
+            self.llm,
+            link_list_parser,
+            self.timings,
+        )
+        self.summarize_page_chain = TimedChain(
+            "summarize_page",
+            PromptTemplate(
+                template=summarize_page_prompt,
+                input_variables=["page_representation"]
+            ),
+            self.llm,
+            StrOutputParser(),
+            self.timings,
+        )
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Tempi aggregati per operazione (render prompt, modello, parsing).
+        """
+        return summarize_timings(list(self.timings))
+
     def filter_links_by_topics(self, links: List[Link], topics: List[str]) -> LinkList:
         """
         Filtra i link in base alla pertinenza rispetto a una lista di topic usando un LLM.
         """
-        link_list_parser = PydanticOutputParser(pydantic_object=LinkList)
-        prompt = PromptTemplate(
-            template=filter_links_prompt,
-            input_variables=["links", "topics"],
-            partial_variables={
-                "format_instructions": link_list_parser.get_format_instructions()
-            },
-        )
-        chain = prompt | self.llm | link_list_parser
         try:
-            link_list = chain.invoke({"links": links, "topics": topics})
+            link_list = self.filter_links_chain.invoke({"links": links, "topics": topics})
             return link_list
         except Exception as e:
             print(f"Errore durante il filtraggio dei link: {e}")
@@ -51,17 +92,8 @@ class LLM:
         """
         Estrae i link che puntano a pagine di articoli da un riassunto di pagina.
         """
-        from src.prompts import extract_article_links_prompt
-
-        link_list_parser = PydanticOutputParser(pydantic_object=LinkList)
-        prompt = PromptTemplate(
-            template=extract_article_links_prompt,
-            input_variables=["summary"],
-            partial_variables={"format_instructions": link_list_parser.get_format_instructions()},
-        )
-        chain = prompt | self.llm | link_list_parser
         try:
-            article_links = chain.invoke({"summary": summary})
+            article_links = self.extract_article_links_chain.invoke({"summary": summary})
             return article_links
         except Exception as e:
             print(f"Errore durante l'estrazione dei link agli articoli: {e}")
@@ -71,15 +103,19 @@ class LLM:
         """
         Genera un riassunto markdown a partire dalla rappresentazione compatta della pagina.
         """
-        from langchain_core.output_parsers import StrOutputParser
+        cache_key = None
+        if self.summary_cache is not None:
+            cache_key = self.summary_cache.make_key(
+                self.model.value, summarize_page_prompt, page.page_representation
+            )
+            cached = self.summary_cache.get(cache_key)
+            if cached is not None:
+                return PageContent(link=page.link, title=page.title, content=cached)
 
-        prompt = PromptTemplate(
-            template=summarize_page_prompt,
-            input_variables=["page_representation"]
-        )
-        chain = prompt | self.llm | StrOutputParser()
         try:
-            summary = chain.invoke({"page_representation": page.page_representation})
+            summary = self.summarize_page_chain.invoke({"page_representation": page.page_representation})
+            if cache_key is not None and summary:
+                self.summary_cache.set(cache_key, summary)
             return PageContent(link=page.link, title=page.title, content=summary)
         except Exception as e:
             print(f"Errore durante la generazione del riassunto: {e}")
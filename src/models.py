@@ -40,6 +40,7 @@ class ContainerFinderResult(Enum):
     SELECTOR_NOT_FOUND = "selector_not_found"
     INVALID_SELECTOR = "invalid_selector"
     DEPTH_LIMIT_REACHED = "depth_limit_reached"
+    NO_REPEATED_ITEMS = "no_repeated_items"
 
 
 class BoundingBox(BaseModel):
@@ -66,6 +67,15 @@ class ContainerSearchResult:
     depth: int
 
 
+@dataclass
+class RepeatedItemsResult:
+    result_type: ContainerFinderResult
+    container: Optional[BoundingBox]
+    items: List[BoundingBox]  # elementi ripetuti (card), in ordine di lettura
+    score: float
+    message: str
+
+
 # --- Tool Input/Output Schemas ---
 
 
@@ -2,6 +2,176 @@ import os
 from playwright.sync_api import sync_playwright
 from src.browser_session_handler import BrowserSessionHandler
 from PIL import Image  # aggiunto per upscaling
+from typing import List
+
+
+# Estrazione dei bounding box in un'unica visita dall'alto verso il basso: xpath e selettore
+# CSS di ogni elemento si ottengono da quelli del padre, il tag di apertura dagli attributi
+# (senza serializzare outerHTML) e i sottoalberi con display:none vengono saltati interi.
+# Il risultato è colonnare: una lista per campo, tag di apertura in una tabella di stringhe
+# e path relativi all'antenato emesso più vicino (parent), così il payload non ripete
+# i prefissi dei path. decode_bounding_boxes ricostruisce i path completi.
+BOUNDING_BOXES_JS = """
+(selector) => {
+    var out = {
+        count: 0, parent: [], xpath_step: [], css_step: [], tags: [], tag: [],
+        x: [], y: [], width: [], height: [], num_children: [], depth: []
+    };
+    // Sanifica il selettore: rimuovi spazi e virgole finali
+    if (!selector || typeof selector !== 'string') return out;
+    selector = selector.trim();
+    while (selector.endsWith(',')) selector = selector.slice(0, -1).trim();
+    if (!selector) return out;
+    var roots;
+    try {
+        roots = document.querySelectorAll(selector);
+    } catch (e) {
+        return out;
+    }
+
+    // Path completi della sola radice, risalendo fino a <html>
+    function rootXPath(el) {
+        if (el === document.documentElement) return '/html';
+        var parentNode = el.parentNode;
+        if (!parentNode || parentNode.nodeType !== Node.ELEMENT_NODE) {
+            if (el === document.body) return '/html/body';
+            return el.tagName ? '/' + el.tagName.toLowerCase() : '';
+        }
+        var index = Array.prototype.indexOf.call(parentNode.children, el);
+        return rootXPath(parentNode) + '/' + el.tagName.toLowerCase() + '[' + (index + 1) + ']';
+    }
+    function rootCss(el) {
+        var path = [];
+        while (el && el.nodeType === Node.ELEMENT_NODE) {
+            var name = el.nodeName.toLowerCase();
+            var sib = el, nth = 1;
+            while (sib = sib.previousElementSibling) {
+                if (sib.nodeName.toLowerCase() == name) nth++;
+            }
+            path.unshift(nth != 1 ? name + ':nth-of-type(' + nth + ')' : name);
+            el = el.parentNode;
+        }
+        return path.join(' > ');
+    }
+
+    var ESCAPES = {'&': '&amp;', '"': '&quot;', '<': '&lt;', '>': '&gt;', '\\u00a0': '&nbsp;'};
+    function escapeAttr(value) {
+        return value.replace(/[&"<>\\u00a0]/g, function(c) { return ESCAPES[c]; });
+    }
+    var tagIndex = new Map();
+    function tagOpening(el) {
+        var html = '<' + el.tagName.toLowerCase();
+        var attrs = el.attributes;
+        for (var i = 0; i < attrs.length; i++) {
+            html += ' ' + attrs[i].name + '="' + escapeAttr(attrs[i].value) + '"';
+        }
+        html += '>';
+        var index = tagIndex.get(html);
+        if (index === undefined) {
+            index = out.tags.length;
+            tagIndex.set(html, index);
+            out.tags.push(html);
+        }
+        return index;
+    }
+
+    var body = document.body;
+    var scrollX = window.scrollX, scrollY = window.scrollY;
+    for (var r = 0; r < roots.length; r++) {
+        var rootXp = rootXPath(roots[r]);
+        // Pila della visita in pre-ordine (stesso ordine del TreeWalker): ogni voce porta
+        // il path accumulato dall'ultimo antenato emesso, la profondità e se è dentro <body>
+        var stack = [{
+            el: roots[r], parent: -1, xpath: rootXp, css: rootCss(roots[r]),
+            depth: rootXp.split('/').length - 1, inBody: body.contains(roots[r])
+        }];
+        while (stack.length) {
+            var item = stack.pop();
+            var el = item.el;
+            var rect = el.getBoundingClientRect();
+            var hasBox = rect.width > 0 && rect.height > 0;
+            var numChildren = el.children.length;
+            if (!hasBox && numChildren === 0) continue;
+            var style = window.getComputedStyle(el);
+            // Niente di un sottoalbero con display:none è visibile
+            if (style.display === 'none') continue;
+
+            var emitted = item.inBody && hasBox &&
+                style.visibility !== 'hidden' &&
+                parseFloat(style.opacity) > 0 &&
+                el.offsetParent !== null;
+            var index = item.parent;
+            if (emitted) {
+                index = out.count++;
+                out.parent.push(item.parent);
+                out.xpath_step.push(item.xpath);
+                out.css_step.push(item.css);
+                out.tag.push(tagOpening(el));
+                out.x.push(Math.round(rect.left + scrollX));
+                out.y.push(Math.round(rect.top + scrollY));
+                out.width.push(Math.round(rect.width));
+                out.height.push(Math.round(rect.height));
+                out.num_children.push(numChildren);
+                out.depth.push(item.depth);
+            }
+            if (numChildren === 0) continue;
+
+            var xpathPrefix = emitted ? '' : item.xpath + '/';
+            var cssPrefix = emitted ? '' : item.css + ' > ';
+            var sameTag = new Map();
+            var children = [];
+            for (var i = 0; i < numChildren; i++) {
+                var child = el.children[i];
+                var name = child.tagName.toLowerCase();
+                // xpath: posizione tra tutti i fratelli; CSS: nth-of-type tra quelli con lo stesso tag
+                var nth = (sameTag.get(name) || 0) + 1;
+                sameTag.set(name, nth);
+                children.push({
+                    el: child,
+                    parent: index,
+                    xpath: xpathPrefix + name + '[' + (i + 1) + ']',
+                    css: cssPrefix + (nth != 1 ? name + ':nth-of-type(' + nth + ')' : name),
+                    depth: item.depth + 1,
+                    inBody: item.inBody || child === body
+                });
+            }
+            for (var j = children.length - 1; j >= 0; j--) stack.push(children[j]);
+        }
+    }
+    return out;
+}
+"""
+
+
+def decode_bounding_boxes(payload: dict) -> List[dict]:
+    """
+    Converte il payload colonnare di BOUNDING_BOXES_JS in una lista di dict (tag, css_selector,
+    xpath, x, y, width, height, num_children, depth), ricostruendo i path completi: ogni
+    elemento segue il proprio antenato emesso, quindi il path del padre è già disponibile.
+    """
+    tags = payload["tags"]
+    boxes: List[dict] = []
+    for i in range(payload["count"]):
+        parent = payload["parent"][i]
+        xpath = payload["xpath_step"][i]
+        css_selector = payload["css_step"][i]
+        if parent >= 0:
+            xpath = boxes[parent]["xpath"] + "/" + xpath
+            css_selector = boxes[parent]["css_selector"] + " > " + css_selector
+        boxes.append(
+            {
+                "tag": tags[payload["tag"][i]],
+                "css_selector": css_selector,
+                "xpath": xpath,
+                "x": payload["x"][i],
+                "y": payload["y"][i],
+                "width": payload["width"][i],
+                "height": payload["height"][i],
+                "num_children": payload["num_children"][i],
+                "depth": payload["depth"][i],
+            }
+        )
+    return boxes
 
 
 class PlaywrightBrowserSessionHandler(BrowserSessionHandler):
@@ -44,123 +214,19 @@ class PlaywrightBrowserSessionHandler(BrowserSessionHandler):
     def get_bounding_boxes(self, selector: str = "body"):
         """
         Recupera tutti i bounding box visibili a partire da un selettore (default: body).
-        Ritorna una lista di dict con html, selettore css (full path), xpath (full path), coordinate, dimensioni, attributi del tag e numero figli.
-        Il campo 'tag' contiene sempre il tag di apertura (es: <div class="...">).
+        Ritorna una lista di dict con tag di apertura (es: <div class="...">), selettore css (full path),
+        xpath (full path), coordinate, dimensioni, numero figli e profondità (vedi decode_bounding_boxes).
+        """
+        return decode_bounding_boxes(self.get_bounding_boxes_columnar(selector))
+
+    def get_bounding_boxes_columnar(self, selector: str = "body") -> dict:
+        """
+        Come get_bounding_boxes, ma ritorna il payload colonnare prodotto dal browser
+        (una lista per campo, tag di apertura in una tabella di stringhe, path relativi al padre).
         """
         if not self.browser or not self.page:
             raise RuntimeError("Session not open. Call open_session() first.")
-        js = """
-        (selector) => {
-            // Sanifica il selettore: rimuovi spazi e virgole finali
-            if (!selector || typeof selector !== 'string') return [];
-            selector = selector.trim();
-            while (selector.endsWith(',')) selector = selector.slice(0, -1).trim();
-            if (!selector) return [];
-            function getXPathForElement(el) {
-                if (!el || !(el instanceof Element)) return '';
-                if (el === document.documentElement) return '/html';
-                var parentNode = el.parentNode;
-                if (!parentNode || parentNode.nodeType !== Node.ELEMENT_NODE) {
-                    if (el === document.body) return '/html/body';
-                    return el.tagName ? '/' + el.tagName.toLowerCase() : '';
-                }
-                var siblings = parentNode.children;
-                for (var i = 0; i < siblings.length; i++) {
-                    var sibling = siblings[i];
-                    if (sibling === el) {
-                        let parentPath = getXPathForElement(parentNode);
-                        let tagName = el.tagName.toLowerCase();
-                        return parentPath + '/' + tagName + '[' + (i + 1) + ']';
-                    }
-                }
-                return '';
-            }
-            function getCssSelector(el) {
-                if (!(el instanceof Element)) return '';
-                var path = [];
-                while (el && el.nodeType === Node.ELEMENT_NODE) {
-                    var selector = el.nodeName.toLowerCase();
-                    var sib = el, nth = 1;
-                    while (sib = sib.previousElementSibling) {
-                        if (sib.nodeName.toLowerCase() == selector) nth++;
-                    }
-                    if (nth != 1) selector += ':nth-of-type(' + nth + ')';
-                    path.unshift(selector);
-                    el = el.parentNode;
-                }
-                return path.join(' > ');
-            }
-            function getAttributesFull(el) {
-                var attrs = {};
-                if (el && el.attributes) {
-                    for (var i = 0; i < el.attributes.length; i++) {
-                        var attr = el.attributes[i];
-                        attrs[attr.name] = attr.value;
-                    }
-                }
-                attrs['id'] = el.id || '';
-                attrs['class'] = el.className || '';
-                return attrs;
-            }
-            function getNumChildren(el) {
-                if (!el || !el.children) return 0;
-                return el.children.length;
-            }
-            function getTagOpening(el) {
-                if (!el || !el.outerHTML) return '';
-                const html = el.outerHTML;
-                const end = html.indexOf('>');
-                if (end !== -1) return html.slice(0, end+1);
-                return '';
-            }
-            function getBoundingBoxes(selector) {
-                var elements = [];
-                try {
-                    elements = Array.from(document.querySelectorAll(selector));
-                } catch (e) {
-                    return [];
-                }
-                var results = [];
-                elements.forEach(function(root) {
-                    var walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT, null, false);
-                    var currentNode = root;
-                    do {
-                        var el = currentNode;
-                        if (!document.body.contains(el)) { 
-                            currentNode = walker.nextNode(); 
-                            continue; 
-                        }
-                        var rect = el.getBoundingClientRect();
-                        var style = window.getComputedStyle(el);
-                        let isVisible = rect.width > 0 && rect.height > 0 && 
-                                       style.display !== 'none' && 
-                                       style.visibility !== 'hidden' && 
-                                       parseFloat(style.opacity) > 0 && 
-                                       el.offsetParent !== null;
-                        if (isVisible) {
-                            results.push({
-                                tag: getTagOpening(el),
-                                css_selector: getCssSelector(el),
-                                xpath: getXPathForElement(el),
-                                attributes: getAttributesFull(el),
-                                id: el.id || '',
-                                class: el.className || '',
-                                x: Math.round(rect.left + window.scrollX),
-                                y: Math.round(rect.top + window.scrollY),
-                                width: Math.round(rect.width),
-                                height: Math.round(rect.height),
-                                num_children: getNumChildren(el)
-                            });
-                        }
-                        currentNode = walker.nextNode();
-                    } while(currentNode);
-                });
-                return results;
-            }
-            return getBoundingBoxes(selector);
-        }
-        """
-        return self.page.evaluate(js, selector)
+        return self.page.evaluate(BOUNDING_BOXES_JS, selector)
 
     def highlight_bounding_box(self, selector: str, color: str = None):
         """
@@ -0,0 +1,168 @@
+import re
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from src.bounding_box_set import BoundingBoxSet
+from src.models import BoundingBox, ContainerFinderResult, RepeatedItemsResult
+
+_TAG_NAME_RE = re.compile(r"<\s*([\w-]+)")
+_CLASS_RE = re.compile(r"""\sclass\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def tag_signature(tag: str) -> str:
+    """
+    Firma di un tag di apertura: nome e classi ordinate, con le cifre rimosse perché
+    le card generate spesso hanno classi numerate (card-12, item-3).
+    Es: '<div class="card card-12" data-id="12">' -> 'div.card.card-'
+    """
+    match = _TAG_NAME_RE.match(tag)
+    name = match.group(1).lower() if match else ""
+    match = _CLASS_RE.search(tag) if "class" in tag.lower() else None
+    if not match:
+        return name
+    classes = next(group for group in match.groups() if group is not None)
+    return ".".join([name, *sorted(set(_DIGITS_RE.sub("", classes).split()))])
+
+
+class RepeatedItemsDetector:
+    """
+    Rileva le card ripetute di una pagina di listing a partire dai bounding box
+    (get_bounding_box_set / get_bounding_boxes), senza xpath scritti a mano.
+    I candidati sono gruppi di fratelli con la stessa firma del tag (stesso xpath del padre,
+    anche se il padre non ha un box, stesso nome e classi); in ogni gruppo restano gli elementi con dimensioni entro size_tolerance
+    dalla mediana del gruppo. Il punteggio è l'area coperta, pesata per la frazione di
+    elementi allineati in righe o colonne e per la frazione del gruppo che ha passato il
+    filtro sulle dimensioni. Tutti i confronti sono vettoriali sugli array del set.
+    """
+
+    def __init__(self, min_items: int = 3, size_tolerance: float = 0.2, min_item_area: int = 2500):
+        self.min_items = min_items
+        self.size_tolerance = size_tolerance
+        self.min_item_area = min_item_area
+
+    def detect(self, boxes: Union[BoundingBoxSet, List[BoundingBox]]) -> RepeatedItemsResult:
+        if not isinstance(boxes, BoundingBoxSet):
+            boxes = BoundingBoxSet.from_boxes(boxes)
+        parents, index = self._parents(boxes)
+        signatures, num_signatures = self._signatures(boxes)
+
+        # Gruppi (padre, firma) con almeno min_items elementi abbastanza grandi
+        ids = np.flatnonzero(boxes.area() >= self.min_item_area)
+        keys = parents[ids] * num_signatures + signatures[ids]
+        _, groups, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        keep = counts[groups] >= self.min_items
+        ids = ids[keep]
+        _, groups = np.unique(groups[keep], return_inverse=True)
+        if len(ids) == 0:
+            return self._not_found()
+        num_groups = int(groups.max()) + 1
+        group_sizes = np.bincount(groups, minlength=num_groups)
+
+        # Dimensioni simili: entro size_tolerance dalla mediana del gruppo
+        width = boxes.width[ids].astype(np.int64)
+        height = boxes.height[ids].astype(np.int64)
+        median_width = self._group_median(groups, width, group_sizes)[groups]
+        median_height = self._group_median(groups, height, group_sizes)[groups]
+        similar = (np.abs(width - median_width) <= self.size_tolerance * median_width) & (
+            np.abs(height - median_height) <= self.size_tolerance * median_height
+        )
+        ids, groups = ids[similar], groups[similar]
+
+        # Allineati: stessa x (colonna) o stessa y (riga) di un altro elemento del gruppo
+        aligned = np.zeros(len(ids), dtype=bool)
+        for coordinate in (boxes.x[ids].astype(np.int64), boxes.y[ids].astype(np.int64)):
+            if len(ids) == 0:
+                break
+            span = int(coordinate.max() - coordinate.min()) + 1
+            _, inverse, counts = np.unique(
+                groups * span + (coordinate - coordinate.min()), return_inverse=True, return_counts=True
+            )
+            aligned |= counts[inverse] > 1
+
+        similar_sizes = np.bincount(groups, minlength=num_groups)
+        covered = np.bincount(groups, weights=boxes.area()[ids], minlength=num_groups)
+        aligned_sizes = np.bincount(groups, weights=aligned, minlength=num_groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            scores = covered * (aligned_sizes / similar_sizes) * (similar_sizes / group_sizes)
+        scores[similar_sizes < self.min_items] = 0.0
+        best = int(np.argmax(scores))
+        if scores[best] <= 0:
+            return self._not_found()
+
+        items = ids[groups == best]
+        # Ordine di lettura: per riga, poi per colonna
+        items = items[np.lexsort((boxes.x[items], boxes.y[items]))]
+        container = self._container(boxes, items, index)
+        return RepeatedItemsResult(
+            result_type=ContainerFinderResult.SUCCESS,
+            container=container,
+            items=boxes.to_bounding_boxes(items),
+            score=float(scores[best]),
+            message=f"Trovati {len(items)} elementi ripetuti in {container.xpath}",
+        )
+
+    def _not_found(self) -> RepeatedItemsResult:
+        return RepeatedItemsResult(
+            result_type=ContainerFinderResult.NO_REPEATED_ITEMS,
+            container=None,
+            items=[],
+            score=0.0,
+            message=f"Nessun gruppo di almeno {self.min_items} fratelli simili e allineati",
+        )
+
+    @staticmethod
+    def _parents(boxes: BoundingBoxSet) -> Tuple[np.ndarray, Dict[str, int]]:
+        """
+        Id dell'xpath del padre di ogni box, che il padre sia nel set o no (un <ul> senza box
+        raggruppa comunque i suoi <li>), e indice xpath -> posizione dei box del set.
+        """
+        index: Dict[str, int] = {xpath: i for i, xpath in enumerate(boxes.xpaths)}
+        parent_ids: Dict[str, int] = {}
+        parents = np.fromiter(
+            (parent_ids.setdefault(xpath[: xpath.rfind("/")], len(parent_ids)) for xpath in boxes.xpaths),
+            dtype=np.int64,
+            count=len(boxes),
+        )
+        return parents, index
+
+    @staticmethod
+    def _container(boxes: BoundingBoxSet, items: np.ndarray, index: Dict[str, int]) -> BoundingBox:
+        """Antenato più vicino presente nel set; se non ce n'è, il rettangolo che racchiude gli elementi."""
+        first = boxes[int(items[0])]
+        parent_xpath = first.xpath[: first.xpath.rfind("/")]
+        xpath = parent_xpath
+        while xpath:
+            if xpath in index:
+                return boxes[index[xpath]]
+            xpath = xpath[: xpath.rfind("/")]
+        x0, y0 = int(boxes.x[items].min()), int(boxes.y[items].min())
+        x1 = int((boxes.x[items] + boxes.width[items]).max())
+        y1 = int((boxes.y[items] + boxes.height[items]).max())
+        return BoundingBox(
+            tag="",
+            css_selector=first.css_selector.rsplit(" > ", 1)[0],
+            xpath=parent_xpath,
+            x=x0,
+            y=y0,
+            width=x1 - x0,
+            height=y1 - y0,
+            num_children=len(items),
+        )
+
+    @staticmethod
+    def _signatures(boxes: BoundingBoxSet):
+        """Id della firma di ogni box: calcolata una volta per tag distinto della tabella del set."""
+        signature_ids: Dict[str, int] = {}
+        by_tag = np.fromiter(
+            (signature_ids.setdefault(tag_signature(tag), len(signature_ids)) for tag in boxes.tags),
+            dtype=np.int64,
+            count=len(boxes.tags),
+        )
+        return by_tag[boxes.tag_ids], max(len(signature_ids), 1)
+
+    @staticmethod
+    def _group_median(groups: np.ndarray, values: np.ndarray, group_sizes: np.ndarray) -> np.ndarray:
+        """Mediana (superiore) di values per gruppo, con un solo ordinamento."""
+        order = np.lexsort((values, groups))
+        starts = np.cumsum(group_sizes) - group_sizes
+        return values[order][starts + group_sizes // 2]
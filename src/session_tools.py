@@ -22,6 +22,7 @@ from src.models import (
     PageInfoOutput,
 )
 from src.vlm import VLM, ModelType
+from src.bounding_box_set import BoundingBoxSet
 from bs4 import BeautifulSoup
 from typing import List
 from pydantic import BaseModel
@@ -139,30 +140,25 @@ def safe_class(val):
     return ""
 
 
+def get_bounding_box_set(input_data: GetBoundingBoxesInput) -> BoundingBoxSet:
+    """
+    Recupera tutti i bounding box visibili a partire da un selettore (default: body)
+    come BoundingBoxSet colonnare (array NumPy), senza creare un BoundingBox per elemento.
+    """
+    try:
+        payload = BROWSER_HANDLER.get_bounding_boxes_columnar(input_data.selector)
+        return BoundingBoxSet.from_columnar(payload)
+    except RuntimeError:
+        return BoundingBoxSet.from_boxes([])
+
+
 def get_bounding_boxes(input_data: GetBoundingBoxesInput) -> GetBoundingBoxesOutput:
     """
     Recupera tutti i bounding box visibili a partire da un selettore (default: body).
     Ritorna una lista di BoundingBox con solo il tag di apertura (es: <div class="...">) e il numero di figli.
     """
-    try:
-        results = BROWSER_HANDLER.get_bounding_boxes(input_data.selector)
-        bounding_boxes = []
-        for box in results:
-            bounding_boxes.append(
-                BoundingBox(
-                    tag=box.get("tag", ""),
-                    css_selector=box["css_selector"],
-                    xpath=box["xpath"],
-                    x=box["x"],
-                    y=box["y"],
-                    width=box["width"],
-                    height=box["height"],
-                    num_children=box.get("num_children", 0),
-                )
-            )
-        return GetBoundingBoxesOutput(bounding_boxes=bounding_boxes)
-    except RuntimeError:
-        return GetBoundingBoxesOutput(bounding_boxes=[])
+    bounding_boxes = get_bounding_box_set(input_data).to_bounding_boxes()
+    return GetBoundingBoxesOutput(bounding_boxes=bounding_boxes)
 
 
 def highlight_bounding_box(
@@ -0,0 +1,251 @@
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from src.bounding_box_set import BoundingBoxSet
+from src.models import BoundingBox, ContainerFinderResult, RepeatedItemsResult
+
+
+class SpatialIndex:
+    """
+    Indice a griglia uniforme sui bounding box di una pagina (coordinate assolute).
+    Ogni box è registrato nelle celle che copre; i box che coprirebbero più di
+    max_cells_per_box celle (body, wrapper a tutta pagina) stanno in una lista a parte,
+    sempre candidata. Una query legge solo le celle del rettangolo richiesto e poi
+    filtra i candidati in modo vettoriale. Le query ritornano indici in `boxes`.
+    """
+
+    def __init__(
+        self,
+        boxes: Union[BoundingBoxSet, List[BoundingBox]],
+        cell_size: int = 256,
+        max_cells_per_box: int = 64,
+    ):
+        self.boxes = boxes if isinstance(boxes, BoundingBoxSet) else BoundingBoxSet.from_boxes(boxes)
+        self.cell_size = cell_size
+        self._x0 = self.boxes.x.astype(np.int64)
+        self._y0 = self.boxes.y.astype(np.int64)
+        self._x1 = self._x0 + self.boxes.width
+        self._y1 = self._y0 + self.boxes.height
+        self._build(max_cells_per_box)
+
+    def _build(self, max_cells_per_box: int) -> None:
+        cx0, cy0 = self._x0 // self.cell_size, self._y0 // self.cell_size
+        cx1 = (self._x1 - 1) // self.cell_size
+        cy1 = (self._y1 - 1) // self.cell_size
+        nx, ny = cx1 - cx0 + 1, cy1 - cy0 + 1
+        cells_per_box = nx * ny
+        small = cells_per_box <= max_cells_per_box
+        self._large = np.flatnonzero(~small)
+
+        self._cx_min = int(cx0.min()) if len(cx0) else 0
+        self._cy_min = int(cy0.min()) if len(cy0) else 0
+        self._cy_span = int(cy1.max()) - self._cy_min + 1 if len(cy1) else 1
+        self._cx_max = int(cx1.max()) if len(cx1) else 0
+        self._cy_max = int(cy1.max()) if len(cy1) else 0
+
+        # Espansione vettoriale box -> celle: per ogni box i suoi nx * ny indici di cella
+        box_ids = np.flatnonzero(small)
+        counts = cells_per_box[box_ids]
+        owner = np.repeat(box_ids, counts)
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        local = np.arange(len(owner)) - starts
+        row_len = nx[owner]
+        cell_x = cx0[owner] + local % row_len
+        cell_y = cy0[owner] + local // row_len
+        keys = (cell_x - self._cx_min) * self._cy_span + (cell_y - self._cy_min)
+
+        order = np.argsort(keys, kind="stable")
+        self._cell_boxes = owner[order]
+        sorted_keys = keys[order]
+        unique_keys, first = np.unique(sorted_keys, return_index=True)
+        last = np.append(first[1:], len(sorted_keys))
+        self._cells = {
+            key: (start, end) for key, start, end in zip(unique_keys.tolist(), first.tolist(), last.tolist())
+        }
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    # --- Candidati ---
+
+    def _candidates(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """Box registrati nelle celle che toccano [x0, x1) x [y0, y1), più quelli grandi."""
+        cx0 = max(x0 // self.cell_size, self._cx_min)
+        cy0 = max(y0 // self.cell_size, self._cy_min)
+        cx1 = min((x1 - 1) // self.cell_size, self._cx_max)
+        cy1 = min((y1 - 1) // self.cell_size, self._cy_max)
+        if cx1 < cx0 or cy1 < cy0:
+            return self._large
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) >= len(self._cells):
+            # Rettangolo grande quanto la pagina: più rapido filtrare tutti i box
+            return np.arange(len(self.boxes))
+        parts = [self._large]
+        for cx in range(cx0, cx1 + 1):
+            base = (cx - self._cx_min) * self._cy_span - self._cy_min
+            for cy in range(cy0, cy1 + 1):
+                span = self._cells.get(base + cy)
+                if span is not None:
+                    parts.append(self._cell_boxes[span[0] : span[1]])
+        # Può contenere ripetizioni (box su più celle): le query deduplicano dopo il filtro
+        return np.concatenate(parts)
+
+    # --- Query ---
+
+    def intersecting(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Box che si sovrappongono al rettangolo (es. una fascia di viewport)."""
+        ids = self._candidates(x, y, x + width, y + height)
+        mask = (
+            (self._x0[ids] < x + width)
+            & (self._x1[ids] > x)
+            & (self._y0[ids] < y + height)
+            & (self._y1[ids] > y)
+        )
+        return np.unique(ids[mask])
+
+    def contained_in(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Box interamente dentro il rettangolo (bordi compresi)."""
+        ids = self._candidates(x, y, x + width, y + height)
+        mask = (
+            (self._x0[ids] >= x)
+            & (self._y0[ids] >= y)
+            & (self._x1[ids] <= x + width)
+            & (self._y1[ids] <= y + height)
+        )
+        return np.unique(ids[mask])
+
+    def containing(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """Box che contengono interamente il rettangolo, dal più piccolo al più grande."""
+        # Chi contiene il rettangolo contiene anche il suo angolo: basta la cella dell'angolo
+        ids = self._candidates(x, y, x + 1, y + 1)
+        mask = (
+            (self._x0[ids] <= x)
+            & (self._y0[ids] <= y)
+            & (self._x1[ids] >= x + width)
+            & (self._y1[ids] >= y + height)
+        )
+        ids = ids[mask]
+        return ids[np.argsort(self.boxes.area()[ids], kind="stable")]
+
+    def at_point(self, x: int, y: int) -> np.ndarray:
+        """Box che contengono il punto (x, y), dal più interno (area minore) al più esterno."""
+        ids = self._candidates(x, y, x + 1, y + 1)
+        mask = (self._x0[ids] <= x) & (self._x1[ids] > x) & (self._y0[ids] <= y) & (self._y1[ids] > y)
+        ids = ids[mask]
+        return ids[np.argsort(self.boxes.area()[ids], kind="stable")]
+
+
+class GeometricContainerFinder:
+    """
+    Variante geometrica di DOMContainerFinder: invece di scendere nell'albero finché un nodo
+    ha più figli, cerca nella regione (un box di partenza o tutta la pagina) gruppi di box
+    con dimensioni quasi uguali (entro size_tolerance dalla mediana del gruppo) e allineati
+    in righe o colonne, cioè le card di una griglia di listing. Vince il gruppo che copre
+    più area; il container è il box più piccolo che contiene tutti gli elementi del gruppo.
+    """
+
+    def __init__(
+        self,
+        index: SpatialIndex,
+        min_items: int = 3,
+        size_tolerance: float = 0.1,
+        min_item_area: int = 2500,
+    ):
+        self.index = index
+        self.min_items = min_items
+        self.size_tolerance = size_tolerance
+        self.min_item_area = min_item_area
+
+    def find_container(self, start: Optional[BoundingBox] = None) -> RepeatedItemsResult:
+        boxes = self.index.boxes
+        if start is not None:
+            ids = self.index.contained_in(start.x, start.y, start.width, start.height)
+        else:
+            ids = np.arange(len(boxes))
+        ids = ids[boxes.area()[ids] >= self.min_item_area]
+        best_ids, best_score = self._best_group(ids)
+        if best_ids is None:
+            return RepeatedItemsResult(
+                result_type=ContainerFinderResult.NO_REPEATED_ITEMS,
+                container=None,
+                items=[],
+                score=0.0,
+                message=f"Nessun gruppo di almeno {self.min_items} elementi simili e allineati",
+            )
+
+        # Ordine di lettura: per riga, poi per colonna
+        best_ids = best_ids[np.lexsort((boxes.x[best_ids], boxes.y[best_ids]))]
+        x0 = int(boxes.x[best_ids].min())
+        y0 = int(boxes.y[best_ids].min())
+        x1 = int((boxes.x[best_ids] + boxes.width[best_ids]).max())
+        y1 = int((boxes.y[best_ids] + boxes.height[best_ids]).max())
+        containers = self.index.containing(x0, y0, x1 - x0, y1 - y0)
+        container = boxes[int(containers[0])] if len(containers) else None
+        return RepeatedItemsResult(
+            result_type=ContainerFinderResult.SUCCESS,
+            container=container,
+            items=boxes.to_bounding_boxes(best_ids),
+            score=best_score,
+            message=f"Trovati {len(best_ids)} elementi ripetuti",
+        )
+
+    def _best_group(self, ids: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+        if len(ids) < self.min_items:
+            return None, 0.0
+        boxes = self.index.boxes
+        best_ids, best_score = None, 0.0
+        for members in self._size_groups(ids):
+            members = self._similar_to_median(members)
+            if len(members) < self.min_items:
+                continue
+            # Wrapper annidati con lo stesso rettangolo: resta il più esterno (profondità minore)
+            members = members[np.argsort(boxes.depth[members], kind="stable")]
+            rects = np.stack(
+                [boxes.x[members], boxes.y[members], boxes.width[members], boxes.height[members]], axis=1
+            )
+            _, first = np.unique(rects, axis=0, return_index=True)
+            members = members[np.sort(first)]
+            if len(members) < self.min_items:
+                continue
+            score = self._score(members)
+            if score > best_score:
+                best_ids, best_score = members, score
+        return best_ids, best_score
+
+    def _size_groups(self, ids: np.ndarray) -> List[np.ndarray]:
+        """
+        Gruppi di box con dimensioni vicine: ordinati per larghezza, un nuovo gruppo parte
+        quando la larghezza supera la precedente di più di size_tolerance (404 e 406 restano
+        insieme); dentro ogni gruppo lo stesso sull'altezza. Ogni gruppo è un tratto contiguo
+        dell'ordinamento, quindi i membri si ottengono senza rileggere tutti gli id per gruppo.
+        """
+        boxes = self.index.boxes
+        width = boxes.width[ids].astype(np.float64)
+        order = np.argsort(width, kind="stable")
+        ids, width = ids[order], width[order]
+        width_group = np.concatenate(([0], np.cumsum(width[1:] > width[:-1] * (1 + self.size_tolerance))))
+
+        height = boxes.height[ids].astype(np.float64)
+        order = np.lexsort((height, width_group))
+        ids, height, width_group = ids[order], height[order], width_group[order]
+        breaks = np.flatnonzero(
+            (width_group[1:] != width_group[:-1]) | (height[1:] > height[:-1] * (1 + self.size_tolerance))
+        ) + 1
+        return [group for group in np.split(ids, breaks) if len(group) >= self.min_items]
+
+    def _similar_to_median(self, members: np.ndarray) -> np.ndarray:
+        """Membri entro size_tolerance dalla mediana del gruppo (come RepeatedItemsDetector)."""
+        boxes = self.index.boxes
+        keep = np.ones(len(members), dtype=bool)
+        for column in (boxes.width[members], boxes.height[members]):
+            values = column.astype(np.int64)
+            median = np.sort(values)[len(values) // 2]
+            keep &= np.abs(values - median) <= self.size_tolerance * median
+        return members[keep]
+
+    def _score(self, members: np.ndarray) -> float:
+        """Area coperta dal gruppo pesata per la frazione di elementi allineati ad almeno un altro."""
+        boxes = self.index.boxes
+        aligned = np.zeros(len(members), dtype=bool)
+        for column in (boxes.x[members], boxes.y[members]):
+            _, inverse, counts = np.unique(column, return_inverse=True, return_counts=True)
+            aligned |= counts[inverse] > 1
+        return float(boxes.area()[members].sum()) * float(aligned.mean())
@@ -0,0 +1,103 @@
+import numpy as np
+
+from src import bounding_box_set
+from src.bounding_box_set import BoundingBoxSet
+from src.models import BoundingBox
+from src.playwright_scraper import decode_bounding_boxes
+
+# Payload colonnare come lo produce BOUNDING_BOXES_JS: path relativi all'antenato emesso
+PAYLOAD = {
+    "count": 4,
+    "parent": [-1, 0, 1, 1],
+    "xpath_step": ["/html/body", "div[2]", "a[1]", "span[1]/a[1]"],
+    "css_step": ["body", "div:nth-of-type(2)", "a:nth-of-type(1)", "span > a"],
+    "tags": ["<body>", '<div class="card">', '<a href="/x">'],
+    "tag": [0, 1, 2, 2],
+    "x": [0, 10, 12, 40],
+    "y": [0, 20, 22, 22],
+    "width": [800, 300, 100, 50],
+    "height": [600, 200, 30, 30],
+    "num_children": [3, 2, 0, 0],
+    "depth": [2, 3, 4, 5],
+}
+
+
+def boxes(n):
+    return [
+        BoundingBox(
+            tag=f'<div class="c{i % 3}">',
+            css_selector=f"body > div:nth-of-type({i + 1})",
+            xpath=f"/html/body/div[{i + 1}]",
+            x=i,
+            y=2 * i,
+            width=10 + i,
+            height=20,
+            num_children=i % 4,
+        )
+        for i in range(n)
+    ]
+
+
+def test_from_columnar_matches_decoder():
+    box_set = BoundingBoxSet.from_columnar(PAYLOAD)
+    decoded = decode_bounding_boxes(PAYLOAD)
+    assert box_set.xpaths == [d["xpath"] for d in decoded]
+    assert box_set.xpaths[-1] == "/html/body/div[2]/span[1]/a[1]"
+    assert box_set.css_selectors[-1] == "body > div:nth-of-type(2) > span > a"
+    assert box_set.to_bounding_boxes() == [
+        BoundingBox(**{k: v for k, v in d.items() if k != "depth"}) for d in decoded
+    ]
+    assert box_set.depth.tolist() == PAYLOAD["depth"]
+
+
+def test_round_trip_from_boxes():
+    original = boxes(7)
+    box_set = BoundingBoxSet.from_boxes(original)
+    assert len(box_set) == 7
+    assert box_set.to_bounding_boxes() == original
+    assert box_set[3] == original[3]
+    assert box_set.to_bounding_boxes([5, 1]) == [original[5], original[1]]
+    # Stessa tabella dei tag: tre tag distinti per sette box
+    assert len(box_set.tags) == 3
+    assert box_set.depth.tolist() == [3] * 7
+    again = BoundingBoxSet.from_boxes([box.model_dump() for box in box_set])
+    assert again.to_bounding_boxes() == original
+
+
+def test_chunked_iteration(monkeypatch):
+    monkeypatch.setattr(bounding_box_set, "_ITER_CHUNK", 3)
+    original = boxes(8)
+    box_set = BoundingBoxSet.from_boxes(original)
+    slices = []
+    real_slice = BoundingBoxSet._slice
+
+    def spy(self, start, stop):
+        slices.append((start, stop))
+        return real_slice(self, start, stop)
+
+    monkeypatch.setattr(BoundingBoxSet, "_slice", spy)
+    iterator = iter(box_set)
+    assert next(iterator) == original[0]
+    # Solo il primo blocco è stato convertito
+    assert slices == [(0, 3)]
+    assert [original[0], *iterator] == original
+    assert slices == [(0, 3), (3, 6), (6, 9)]
+    assert list(BoundingBoxSet.from_boxes([])) == []
+
+
+def test_slice_shares_memory():
+    box_set = BoundingBoxSet.from_boxes(boxes(5))
+    part = box_set._slice(1, 4)
+    assert np.shares_memory(part.x, box_set.x)
+    assert part.xpaths == box_set.xpaths[1:4]
+
+
+def test_vectorized_queries():
+    box_set = BoundingBoxSet.from_columnar(PAYLOAD)
+    assert box_set.area().tolist() == [480000, 60000, 3000, 1500]
+    assert box_set.argsort_by_area().tolist() == [0, 1, 2, 3]
+    assert box_set.sorted_by_area(descending=False).xpaths[0] == box_set.xpaths[3]
+    assert box_set.contained_in(10, 20, 300, 200).tolist() == [1, 2, 3]
+    assert box_set.intersecting(35, 0, 10, 10).tolist() == [0]
+    assert box_set.in_viewport(scroll_y=25, viewport_height=10).tolist() == [0, 1, 2, 3]
+    assert box_set.in_viewport(scroll_y=300, viewport_height=100).tolist() == [0]
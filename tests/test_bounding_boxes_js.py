@@ -0,0 +1,60 @@
+import pytest
+
+sync_api = pytest.importorskip("playwright.sync_api")
+
+from benchmarks.bench_bounding_boxes import LEGACY_BOUNDING_BOXES_JS, legacy_to_boxes, listing_page_html
+from benchmarks.local_server import LocalStaticServer
+from src.playwright_scraper import BOUNDING_BOXES_JS, decode_bounding_boxes
+
+pytestmark = pytest.mark.playwright
+
+# Casi limite per i due estrattori: attributi da escapare, sottoalberi nascosti in modi diversi,
+# box vuoti con figli visibili, elementi fissi, SVG, tbody implicito e fratelli con lo stesso tag.
+# Niente < o > negli attributi: outerHTML li escapa solo nelle versioni recenti di Chromium.
+EDGE_CASES_HTML = """<!DOCTYPE html><html><head><title>Casi limite</title></head><body>
+<header id="top" class="a  b"><nav><a href="/a?x=1&amp;y=2" title='dice "ciao"'>Home</a><a href="/b">B</a></nav></header>
+<div style="visibility:hidden"><p style="visibility:visible">visibile dentro nascosto</p><span>nascosto</span></div>
+<div style="opacity:0"><p>trasparente</p></div>
+<div style="display:none"><p>assente</p></div>
+<div style="position:fixed;top:0;right:0;width:50px;height:50px">fisso</div>
+<div style="width:0;height:0"><p style="position:absolute;top:900px">figlio di un box vuoto</p></div>
+<section><p>uno</p><div>a</div><p data-x="&nbsp;1">due</p><p>tre</p><div><p>annidato</p></div></section>
+<svg width="100" height="50"><rect width="50" height="20"></rect></svg>
+<table><tr><td>cella</td><td><span>altra</span></td></tr></table>
+</body></html>"""
+
+
+@pytest.fixture(scope="module")
+def served_page(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("dom")
+    (directory / "listing.html").write_text(listing_page_html(500), encoding="utf-8")
+    (directory / "edge_cases.html").write_text(EDGE_CASES_HTML, encoding="utf-8")
+    with sync_api.sync_playwright() as playwright:
+        try:
+            browser = playwright.chromium.launch()
+        except sync_api.Error as error:
+            pytest.skip(f"Chromium di Playwright non disponibile: {error}")
+        page = browser.new_page(viewport={"width": 1280, "height": 800})
+        with LocalStaticServer(str(directory)) as server:
+            yield page, server.base_url
+        browser.close()
+
+
+@pytest.mark.parametrize(
+    "document, selector",
+    [
+        ("listing.html", "body"),
+        ("listing.html", ".grid > .card:nth-child(3)"),
+        ("edge_cases.html", "body"),
+        ("edge_cases.html", "section, nav"),
+        ("edge_cases.html", "table td ,"),
+        ("edge_cases.html", "::invalido"),
+    ],
+)
+def test_single_pass_matches_legacy_extractor(served_page, document, selector):
+    page, base_url = served_page
+    page.goto(f"{base_url}/{document}")
+    legacy = legacy_to_boxes(page.evaluate(LEGACY_BOUNDING_BOXES_JS, selector))
+    boxes = decode_bounding_boxes(page.evaluate(BOUNDING_BOXES_JS, selector))
+    assert [{k: v for k, v in box.items() if k != "depth"} for box in boxes] == legacy
+    assert [box["depth"] for box in boxes] == [box["xpath"].count("/") for box in boxes]
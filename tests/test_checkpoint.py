@@ -0,0 +1,56 @@
+import json
+import os
+from datetime import datetime
+
+from app.domain.checkpoint import RunCheckpoint
+from app.domain.domain_utils import ArticleSummary
+from app.ports.models import ListingToArticles, NewArticleLink
+
+
+def set_created_at(checkpoint: RunCheckpoint, created_at: str) -> None:
+    meta = checkpoint.meta
+    meta["created_at"] = created_at
+    with open(os.path.join(checkpoint.path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def test_latest_uses_creation_time_not_run_id(tmp_path):
+    base = str(tmp_path)
+    older = RunCheckpoint(base, "zz-manuale")
+    newer = RunCheckpoint(base, "20240101T000000")
+    set_created_at(older, "2024-05-01T10:00:00")
+    set_created_at(newer, "2024-05-02T10:00:00")
+    assert RunCheckpoint.latest(base).run_id == "20240101T000000"
+
+    newer.mark_completed()
+    assert RunCheckpoint.latest(base).run_id == "zz-manuale"
+    assert RunCheckpoint.latest(base, include_completed=True).run_id == "20240101T000000"
+
+
+def test_latest_without_runs(tmp_path):
+    assert RunCheckpoint.latest(str(tmp_path / "assente")) is None
+    assert RunCheckpoint.latest(str(tmp_path)) is None
+
+
+def test_round_trip_and_truncated_line(tmp_path):
+    checkpoint = RunCheckpoint(str(tmp_path), "run")
+    listing = ListingToArticles(listing_url="https://l.example", markdown="# l", article_links=["https://a.example/1"])
+    article = NewArticleLink(
+        listing_url="https://l.example",
+        url="https://a.example/1",
+        added_at=datetime(2024, 5, 1, 12, 0),
+        fetch_url="https://a.example/1?utm_source=x",
+    )
+    checkpoint.save_extracted_listings([listing])
+    checkpoint.save_new_articles([article])
+    # Riga scritta a metà da un crash: ignorata in lettura, le scritture successive ripartono a capo
+    with open(os.path.join(checkpoint.path, "summaries.jsonl"), "w", encoding="utf-8") as f:
+        f.write('{"url": "https://a.exa')
+    resumed = RunCheckpoint(str(tmp_path), "run")
+    resumed.save_summaries([ArticleSummary(url="https://a.example/1", summary="riassunto")])
+
+    assert resumed.load_extracted_listings() == [listing]
+    assert resumed.load_new_articles() == [article]
+    summaries = resumed.load_summaries()
+    assert list(summaries) == ["https://a.example/1"]
+    assert summaries["https://a.example/1"].source_urls == ["https://a.example/1"]
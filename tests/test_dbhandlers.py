@@ -0,0 +1,182 @@
+from datetime import datetime
+
+import pytest
+
+from app.adapters.mock_dbhandler import MockDBHandler
+from app.adapters.sqlite_dbhandler import SQLiteDBHandler
+from app.ports.models import ArticleVisitUpdate, ListingFingerprint, PendingArticleLink
+
+# Oltre il limite di parametri per statement di SQLite: esercita le query IN (...) a blocchi
+MANY = 2500
+
+
+@pytest.fixture(params=["mock", "sqlite"])
+def db(request, tmp_path):
+    if request.param == "mock":
+        yield MockDBHandler()
+    else:
+        handler = SQLiteDBHandler(str(tmp_path / "news.sqlite"))
+        yield handler
+        handler.close()
+
+
+def urls(n, prefix="https://example.com/articolo/"):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+def test_news_listing_urls(db):
+    first = db.add_news_listing_url("https://news.ycombinator.com")
+    second = db.add_news_listing_url("https://github.com/trending")
+    assert first.id != second.id
+    assert [item.url for item in db.get_all_news_listing_urls()] == [
+        "https://news.ycombinator.com",
+        "https://github.com/trending",
+    ]
+
+
+def test_get_existing_urls(db):
+    assert db.get_existing_urls(urls(3)) == set()
+    db.add_article_links(urls(2))
+    assert db.get_existing_urls(urls(3)) == set(urls(2))
+    assert db.get_existing_urls([]) == set()
+
+
+def test_get_existing_urls_many(db):
+    db.add_article_links(urls(MANY)[::2])
+    assert db.get_existing_urls(urls(MANY)) == set(urls(MANY)[::2])
+    # URL ripetuti nell'input non cambiano il risultato
+    assert db.get_existing_urls(urls(4) * 3) == {urls(4)[0], urls(4)[2]}
+
+
+def test_add_article_links(db):
+    added_at = datetime(2024, 5, 1, 12, 0)
+    links = db.add_article_links(urls(3), added_at=added_at)
+    assert [link.url for link in links] == urls(3)
+    assert len({link.id for link in links}) == 3
+    assert all(link.added_at == added_at and not link.visited for link in links)
+    assert [link.url for link in db.get_all_article_links()] == urls(3)
+    assert [link.url for link in db.get_all_article_links(visited=False)] == urls(3)
+    assert db.get_all_article_links(visited=True) == []
+    assert db.get_article_link_by_url(urls(3)[1]) == links[1]
+    assert db.get_article_link_by_url("https://example.com/assente") is None
+    assert db.add_article_links([]) == []
+
+
+def test_add_article_links_many(db):
+    links = db.add_article_links(urls(MANY))
+    assert len({link.id for link in links}) == MANY
+    assert db.get_article_link_by_url(urls(MANY)[-1]).id == links[-1].id
+
+
+def test_duplicate_inserts_are_rejected(db):
+    db.add_article_link(urls(1)[0])
+    with pytest.raises(ValueError):
+        db.add_article_link(urls(1)[0])
+    # Un duplicato nel blocco annulla tutto il blocco
+    with pytest.raises(ValueError):
+        db.add_article_links(urls(3))
+    with pytest.raises(ValueError):
+        db.add_article_links(["https://example.com/nuovo", "https://example.com/nuovo"])
+    assert db.get_existing_urls(urls(3) + ["https://example.com/nuovo"]) == {urls(1)[0]}
+
+
+def test_mark_articles_visited(db):
+    db.add_article_links(urls(3))
+    db.mark_articles_visited(
+        [
+            ArticleVisitUpdate(url=urls(3)[0], summary="riassunto", tags=["python"]),
+            ArticleVisitUpdate(url=urls(3)[2]),
+        ]
+    )
+    db.mark_article_as_visited(urls(3)[1], summary="altro")
+    visited = {link.url: link for link in db.get_all_article_links(visited=True)}
+    assert set(visited) == set(urls(3))
+    assert visited[urls(3)[0]].summary == "riassunto"
+    assert visited[urls(3)[0]].tags == ["python"]
+    assert visited[urls(3)[1]].summary == "altro"
+    assert visited[urls(3)[2]].summary is None
+    assert all(link.visited_at is not None for link in visited.values())
+    assert db.get_all_article_links(visited=False) == []
+
+
+def test_mark_articles_visited_many(db):
+    db.add_article_links(urls(MANY))
+    db.mark_articles_visited([ArticleVisitUpdate(url=url) for url in urls(MANY)[:1200]])
+    assert len(db.get_all_article_links(visited=True)) == 1200
+    assert len(db.get_all_article_links(visited=False)) == MANY - 1200
+
+
+def test_mark_articles_visited_unknown_url(db):
+    db.add_article_links(urls(2))
+    with pytest.raises(ValueError):
+        db.mark_articles_visited(
+            [ArticleVisitUpdate(url=urls(2)[0]), ArticleVisitUpdate(url="https://example.com/assente")]
+        )
+    # Nessun aggiornamento parziale
+    assert db.get_all_article_links(visited=True) == []
+    with pytest.raises(ValueError):
+        db.mark_article_as_visited("https://example.com/assente")
+
+
+def test_remove_article_link(db):
+    db.add_article_links(urls(3))
+    db.mark_article_as_visited(urls(3)[2])
+    db.remove_article_link(urls(3)[0])
+    db.remove_article_link(urls(3)[2])
+    db.remove_article_link("https://example.com/assente")
+    assert db.get_existing_urls(urls(3)) == {urls(3)[1]}
+    assert [link.url for link in db.get_all_article_links(visited=False)] == [urls(3)[1]]
+    assert db.get_all_article_links(visited=True) == []
+    # Dopo la rimozione l'URL può essere reinserito
+    db.add_article_links([urls(3)[0]])
+    assert db.get_existing_urls(urls(3)) == {urls(3)[0], urls(3)[1]}
+
+
+def test_listing_fingerprints(db):
+    listing_url = "https://news.ycombinator.com"
+    assert db.get_listing_fingerprint(listing_url) is None
+    first = ListingFingerprint(listing_url, "hash1", ["a", "b"], datetime(2024, 5, 1))
+    db.save_listing_fingerprint(first)
+    assert db.get_listing_fingerprint(listing_url) == first
+    second = ListingFingerprint(listing_url, "hash2", ["c"], datetime(2024, 5, 2))
+    db.save_listing_fingerprint(second)
+    assert db.get_listing_fingerprint(listing_url) == second
+    assert db.get_listing_fingerprint("https://github.com/trending") is None
+
+
+def pending(url, added_at=datetime(2024, 5, 1), **kwargs):
+    return PendingArticleLink(url, "https://news.ycombinator.com", url, added_at, **kwargs)
+
+
+def test_pending_article_links(db):
+    assert db.get_pending_article_links() == []
+    first = pending(urls(1)[0], title="Titolo", rank=3, published_at=datetime(2024, 4, 30, 8, 0))
+    db.save_pending_article_links([first, pending(urls(2)[1])])
+    assert sorted(db.get_pending_article_links(), key=lambda p: p.url) == [first, pending(urls(2)[1])]
+    # Un nuovo salvataggio aggiorna i dati ma conserva la data della prima esclusione
+    db.save_pending_article_links([pending(urls(1)[0], added_at=datetime(2024, 5, 2), rank=7)])
+    updated = {p.url: p for p in db.get_pending_article_links()}[urls(1)[0]]
+    assert (updated.added_at, updated.rank, updated.title) == (datetime(2024, 5, 1), 7, "")
+    db.remove_pending_article_links([urls(2)[1], "https://example.com/assente"])
+    assert [p.url for p in db.get_pending_article_links()] == [urls(1)[0]]
+    db.save_pending_article_links([])
+    db.remove_pending_article_links([])
+
+
+def test_pending_article_links_many(db):
+    db.save_pending_article_links([pending(url) for url in urls(MANY)])
+    db.remove_pending_article_links(urls(MANY)[1:])
+    assert [p.url for p in db.get_pending_article_links()] == urls(1)
+
+
+def test_sqlite_history_survives_restart(tmp_path):
+    path = str(tmp_path / "news.sqlite")
+    db = SQLiteDBHandler(path)
+    db.add_article_links(urls(3))
+    db.mark_article_as_visited(urls(3)[0], summary="riassunto")
+    db.close()
+
+    db = SQLiteDBHandler(path)
+    assert db.get_existing_urls(urls(4)) == set(urls(3))
+    assert db.get_article_link_by_url(urls(3)[0]).summary == "riassunto"
+    db.close()
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+from typing import List
+
+import pytest
+
+from app.domain.dedup import ContentDeduplicator, canonicalize_url
+from app.domain.domain_utils import pipeline_scrape_and_summarize_articles
+from app.ports.llm import LLMPort
+from app.ports.scraper import ScraperPort
+from app.ports.models import NewArticleLink, ScrapeResult, SummarizePageInput, SummarizePageOutput
+
+
+def article(n: int, words: int = 60) -> str:
+    return " ".join(f"parola{n}_{i}" for i in range(words))
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("HTTPS://Example.COM:443/a/b/?utm_source=x&b=2&a=1#top", "https://example.com/a/b?a=1&b=2"),
+        ("http://example.com:8080//a//b", "http://example.com:8080/a/b"),
+        ("https://example.com/post?fbclid=abc&ref=home", "https://example.com/post?ref=home"),
+        ("https://example.com", "https://example.com/"),
+        ("https://example.com/news/titolo-articolo/amp", "https://example.com/news/titolo-articolo"),
+        ("https://example.com/news/articolo.amp.html", "https://example.com/news/articolo.html"),
+        (
+            "https://example-com.cdn.ampproject.org/c/s/example.com/news/articolo",
+            "https://example.com/news/articolo",
+        ),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://github.com/owner/amp",
+        "https://www.example.com/a",
+        "https://m.example.com/a",
+        "https://example.com/search?q=amp&source=hn",
+    ],
+)
+def test_canonicalize_url_keeps_meaningful_parts(url):
+    assert canonicalize_url(url) == url
+
+
+def test_deduplicator_links_near_duplicates():
+    dedup = ContentDeduplicator(max_distance=3)
+    text = article(1)
+    assert dedup.register("https://a.example/1", text) is None
+    assert dedup.register("https://b.example/1", text + " fine") == "https://a.example/1"
+    assert dedup.register("https://c.example/2", article(2)) is None
+    assert dedup.source_urls("https://a.example/1") == ["https://a.example/1", "https://b.example/1"]
+    assert dedup.source_urls("https://c.example/2") == ["https://c.example/2"]
+
+
+def test_deduplicator_ignores_short_pages():
+    dedup = ContentDeduplicator()
+    assert dedup.register("https://a.example/1", "troppo corto") is None
+    assert dedup.register("https://b.example/1", "troppo corto") is None
+
+
+def test_deduplicator_promote():
+    dedup = ContentDeduplicator()
+    text = article(1)
+    dedup.register("https://a.example/1", text)
+    dedup.register("https://b.example/1", text)
+    dedup.register("https://c.example/1", text)
+    assert dedup.promote("https://a.example/1") == "https://b.example/1"
+    assert dedup.source_urls("https://b.example/1") == [
+        "https://b.example/1",
+        "https://c.example/1",
+        "https://a.example/1",
+    ]
+    # Le pagine successive vengono collegate al nuovo originale
+    assert dedup.register("https://d.example/1", text) == "https://b.example/1"
+    assert dedup.promote("https://c.example/2") is None
+
+
+class PagesScraper(ScraperPort):
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        return [ScrapeResult(url=url, success=True, content=self.pages[url]) for url in urls]
+
+
+class FailingLLM(LLMPort):
+    """Riassunto vuoto (fallito) per le pagine in failing, il titolo della pagina per le altre."""
+
+    def __init__(self, failing):
+        self.failing = set(failing)
+        self.calls: List[str] = []
+
+    def extract_article_links(self, data):
+        raise NotImplementedError
+
+    def summarize_page(self, data):
+        raise NotImplementedError
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        url = data.page_representation.split("\n", 1)[0]
+        self.calls.append(url)
+        return SummarizePageOutput(summary_markdown="" if url in self.failing else f"riassunto {url}")
+
+
+def test_batch_pipeline_promotes_duplicate_when_primary_fails():
+    urls = ["https://a.example/1", "https://b.example/1", "https://c.example/2"]
+    # Le prime due pagine differiscono solo per la riga con l'URL
+    pages = {url: f"{url}\n{article(1 if url != urls[2] else 2)}" for url in urls}
+    links = [NewArticleLink(listing_url="https://listing.example", url=url, added_at=datetime.utcnow()) for url in urls]
+    llm = FailingLLM(failing=[urls[0]])
+    summaries = asyncio.run(
+        pipeline_scrape_and_summarize_articles(links, PagesScraper(pages), llm, chunk_size=1, max_concurrency=1)
+    )
+    by_url = {s.url: s for s in summaries}
+    assert by_url[urls[0]].summary == ""
+    assert by_url[urls[0]].source_urls == [urls[0]]
+    assert by_url[urls[1]].summary == f"riassunto {urls[1]}"
+    assert urls[0] in by_url[urls[1]].source_urls
+    assert by_url[urls[2]].source_urls == [urls[2]]
+    assert sorted(llm.calls) == sorted(urls)
@@ -0,0 +1,36 @@
+from app.domain.link_extraction import prefilter_article_links, registrable_domain
+
+
+def urls(candidates):
+    return [candidate.url for candidate in candidates]
+
+
+def test_registrable_domain():
+    assert registrable_domain("news.ycombinator.com") == "ycombinator.com"
+    assert registrable_domain("blog.example.co.uk") == "example.co.uk"
+    assert registrable_domain("github.com") == "github.com"
+
+
+def test_allow_patterns_only_on_listing_host():
+    markdown = (
+        "[repo](https://github.com/owner/repo) "
+        "[repo www](https://www.github.com/owner/other/) "
+        "[docs](https://docs.github.com/en/foo) "
+        "[stelle](https://github.com/owner/repo/stargazers)"
+    )
+    result = prefilter_article_links("https://github.com/trending", markdown)
+    assert urls(result.accepted) == ["https://github.com/owner/repo", "https://www.github.com/owner/other"]
+    assert urls(result.ambiguous) == ["https://docs.github.com/en/foo"]
+    assert result.rejected == 1
+
+
+def test_external_links_are_articles():
+    markdown = (
+        "[articolo](https://example.com/post) "
+        "[commenti](https://news.ycombinator.com/item?id=1) "
+        "[faq](https://www.ycombinator.com/faq)"
+    )
+    result = prefilter_article_links("https://news.ycombinator.com", markdown)
+    assert urls(result.accepted) == ["https://example.com/post"]
+    assert result.ambiguous == []
+    assert result.rejected == 2
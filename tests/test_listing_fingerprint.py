@@ -0,0 +1,86 @@
+import asyncio
+
+from app.adapters.mock_dbhandler import MockDBHandler
+from app.domain.listing_fingerprint import (
+    compute_listing_delta,
+    extract_article_links_incremental,
+    split_link_blocks,
+)
+from app.ports.llm import LLMPort
+from app.ports.models import ArticleLinkExtractionInput, ArticleLinkExtractionOutput, ArticleLinkLLM
+
+LISTING = "https://blog.example.com"
+
+
+def listing(points, comments, extra=()):
+    rows = [
+        f"{i + 1}. [Articolo {i}](https://blog.example.com/post-{i}) {points[i]} points | "
+        f"[{comments[i]} comments](https://blog.example.com/post-{i}#commenti)"
+        for i in range(len(points))
+    ]
+    return "\n".join(["# Blog", "Testo senza link", *rows, *extra])
+
+
+def test_block_hashes_ignore_counters_and_link_text():
+    first = split_link_blocks(listing([10, 20], [1, 2]))
+    second = split_link_blocks(listing([99, 5], [40, 0]))
+    assert len(first) == 2
+    assert [b.hash for b in first] == [b.hash for b in second]
+    assert first[0].hash != first[1].hash
+
+
+def test_fingerprint_is_stable_across_whitespace():
+    markdown = listing([10, 20], [1, 2])
+    first = compute_listing_delta(LISTING, markdown, None)
+    second = compute_listing_delta(LISTING, markdown.replace(" ", "  ") + "\n\n", first.fingerprint)
+    assert second.fingerprint.page_hash == first.fingerprint.page_hash
+    assert second.fingerprint.block_hashes == first.fingerprint.block_hashes
+    assert second.unchanged
+
+
+def test_delta_contains_only_new_blocks():
+    first = compute_listing_delta(LISTING, listing([10, 20], [1, 2]), None)
+    assert first.markdown == listing([10, 20], [1, 2])
+    new_row = "[Nuovo](https://blog.example.com/nuovo)"
+    second = compute_listing_delta(LISTING, listing([11, 21], [3, 4], extra=[new_row]), first.fingerprint)
+    assert not second.unchanged
+    assert second.markdown == new_row
+    assert second.total_blocks == 3
+
+
+class ScriptedLLM(LLMPort):
+    def __init__(self, failed=False):
+        self.failed = failed
+        self.calls = 0
+
+    def extract_article_links(self, data):
+        raise NotImplementedError
+
+    def summarize_page(self, data):
+        raise NotImplementedError
+
+    async def aextract_article_links(self, data: ArticleLinkExtractionInput) -> ArticleLinkExtractionOutput:
+        self.calls += 1
+        if self.failed:
+            return ArticleLinkExtractionOutput(links=[], failed=True)
+        urls = [line.split(", Text:")[0][len("Link: "):] for line in data.markdown.splitlines()]
+        return ArticleLinkExtractionOutput(links=[ArticleLinkLLM(link=url) for url in urls if "post-" in url])
+
+
+def test_incremental_extraction_saves_fingerprint_only_on_success():
+    db = MockDBHandler()
+    markdown = listing([10, 20], [1, 2])
+
+    failing = ScriptedLLM(failed=True)
+    asyncio.run(extract_article_links_incremental(LISTING, markdown, failing, db))
+    assert failing.calls == 1
+    assert db.get_listing_fingerprint(LISTING) is None
+
+    llm = ScriptedLLM()
+    links = asyncio.run(extract_article_links_incremental(LISTING, markdown, llm, db))
+    assert links == ["https://blog.example.com/post-0", "https://blog.example.com/post-1"]
+    assert db.get_listing_fingerprint(LISTING) is not None
+
+    # Listing invariato: nessuna chiamata all'LLM
+    assert asyncio.run(extract_article_links_incremental(LISTING, markdown, llm, db)) == []
+    assert llm.calls == 1
@@ -0,0 +1,56 @@
+import asyncio
+import gc
+import json
+
+from app.adapters.memory_tracer import InMemoryTracer
+
+
+def test_each_task_gets_its_own_track():
+    tracer = InMemoryTracer()
+
+    async def work(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+        tracer.count(f"{name}.done")
+
+    async def main():
+        await asyncio.gather(*(work(f"task{i}") for i in range(3)))
+
+    asyncio.run(main())
+    tracks = {event.name: event.track for event in tracer.events}
+    assert tracks["task0"] == tracks["task0.done"]
+    assert len({tracks["task0"], tracks["task1"], tracks["task2"]}) == 3
+
+
+def test_finished_tasks_do_not_share_or_keep_tracks():
+    tracer = InMemoryTracer()
+
+    async def record(i):
+        tracer.count("step", i=i)
+
+    async def sequential():
+        for i in range(20):
+            await asyncio.create_task(record(i))
+            gc.collect()
+
+    asyncio.run(sequential())
+    # Task creati e raccolti uno dopo l'altro: id di traccia tutti diversi, tabella vuota
+    assert len({event.track for event in tracer.events}) == 20
+    gc.collect()
+    assert len(tracer._task_tracks) == 0
+
+
+def test_export_chrome_trace(tmp_path):
+    tracer = InMemoryTracer()
+    with tracer.span("stage.scrape", urls=2):
+        tracer.count("scrape.pages", 2)
+    tracer.count("scrape.pages", 3)
+    path = tmp_path / "trace" / "run.json"
+    tracer.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    counters = [e["args"]["value"] for e in events if e["ph"] == "C"]
+    assert [e["name"] for e in spans] == ["stage.scrape"]
+    assert spans[0]["args"] == {"urls": 2}
+    assert counters == [2, 5]
+    assert tracer.summary()["scrape.pages"]["total"] == 5
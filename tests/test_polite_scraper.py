@@ -0,0 +1,90 @@
+import asyncio
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from app.adapters.polite_scraper import (
+    HostPolicy,
+    PoliteScraperAdapter,
+    interleave_by_host,
+    parse_retry_after,
+)
+from app.ports.models import ScrapeResult
+from app.ports.scraper import ScraperPort
+
+
+class RecordingScraper(ScraperPort):
+    """Registra ogni chiamata (istante, URL); le risposte 429 sono prese da throttled."""
+
+    def __init__(self, throttled: Dict[str, List[float]] = None):
+        self.calls: List[Tuple[float, List[str]]] = []
+        self.throttled = {url: list(waits) for url, waits in (throttled or {}).items()}
+
+    async def fetch_pages_content(self, urls: List[str]) -> List[ScrapeResult]:
+        self.calls.append((time.monotonic(), list(urls)))
+        results = []
+        for url in urls:
+            waits = self.throttled.get(url)
+            if waits:
+                results.append(ScrapeResult(url=url, success=False, status_code=429, retry_after=waits.pop(0)))
+            else:
+                results.append(ScrapeResult(url=url, success=True, content=url, status_code=200))
+        return results
+
+    def starts(self, url: str) -> List[float]:
+        return [at for at, urls in self.calls if url in urls]
+
+
+def test_interleave_by_host():
+    urls = ["http://a/1", "http://a/2", "http://a/3", "http://b/1", "http://c/1", "http://b/2"]
+    assert interleave_by_host(urls) == ["http://a/1", "http://b/1", "http://c/1", "http://a/2", "http://b/2", "http://a/3"]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("domani") is None
+    http_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(http_date) <= 30
+
+
+def test_per_host_spacing_and_batched_rounds():
+    inner = RecordingScraper()
+    scraper = PoliteScraperAdapter(inner, default_policy=HostPolicy(max_concurrency=1, min_interval_s=0.05))
+    urls = ["http://a.example/1", "http://a.example/2", "http://a.example/3", "http://b.example/1"]
+    results = asyncio.run(scraper.fetch_pages_content(urls))
+
+    assert [r.url for r in results] == urls
+    assert all(r.success for r in results)
+    # Primo turno: un URL per host nella stessa chiamata allo scraper interno
+    assert inner.calls[0][1] == ["http://a.example/1", "http://b.example/1"]
+    starts = [inner.starts(url)[0] for url in urls[:3]]
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_retry_after_pauses_only_the_throttled_host():
+    inner = RecordingScraper(throttled={"http://a.example/1": [0.2]})
+    scraper = PoliteScraperAdapter(
+        inner, default_policy=HostPolicy(max_concurrency=2, min_interval_s=0.0), backoff_s=0.01
+    )
+    urls = ["http://a.example/1", "http://b.example/1", "http://b.example/2"]
+    results = asyncio.run(scraper.fetch_pages_content(urls))
+
+    assert all(r.success for r in results)
+    first, retry = inner.starts("http://a.example/1")
+    assert retry - first >= 0.19
+    # L'altro host non aspetta la pausa di a.example
+    assert inner.starts("http://b.example/2")[0] - first < 0.1
+    # Dopo un 429 l'intervallo minimo dell'host raddoppia (almeno backoff_s)
+    assert scraper._hosts["a.example"].interval_s == 0.01
+
+
+def test_gives_up_after_max_retries():
+    inner = RecordingScraper(throttled={"http://a.example/1": [0.0, 0.0, 0.0]})
+    scraper = PoliteScraperAdapter(
+        inner, default_policy=HostPolicy(min_interval_s=0.0), max_retries=2, backoff_s=0.0
+    )
+    [result] = asyncio.run(scraper.fetch_pages_content(["http://a.example/1"]))
+    assert result.status_code == 429
+    assert len(inner.starts("http://a.example/1")) == 3
@@ -0,0 +1,64 @@
+from src.models import ContainerFinderResult
+from src.repeated_items import RepeatedItemsDetector, tag_signature
+
+
+def box(tag, xpath, css_selector, x, y, width, height, num_children=0):
+    return dict(
+        tag=tag, css_selector=css_selector, xpath=xpath, x=x, y=y, width=width, height=height, num_children=num_children
+    )
+
+
+def product_grid():
+    """12 <li> in una griglia 4x3 dentro un <ul> che non ha un box (es. display: contents)."""
+    return [
+        box(
+            '<li class="product product-%d">' % i,
+            f"/html/body[2]/ul[1]/li[{i + 1}]",
+            f"html > body:nth-of-type(2) > ul > li:nth-child({i + 1})",
+            10 + (i % 4) * 300,
+            100 + (i // 4) * 400,
+            280 if i % 3 else 284,
+            380,
+            num_children=2,
+        )
+        for i in range(12)
+    ]
+
+
+def page_boxes():
+    return [
+        box("<html>", "/html", "html", 0, 0, 1300, 3000, num_children=2),
+        box("<body>", "/html/body[2]", "html > body:nth-of-type(2)", 0, 0, 1300, 3000, num_children=1),
+    ]
+
+
+def test_tag_signature():
+    assert tag_signature('<div class="card card-12" data-id="12">') == "div.card.card-"
+    assert tag_signature("<LI class='b a'>") == "li.a.b"
+    assert tag_signature("<section>") == "section"
+    assert tag_signature("") == ""
+
+
+def test_parent_without_box_uses_nearest_ancestor():
+    result = RepeatedItemsDetector().detect(page_boxes() + product_grid())
+    assert result.result_type == ContainerFinderResult.SUCCESS
+    assert [item.xpath for item in result.items] == [f"/html/body[2]/ul[1]/li[{i + 1}]" for i in range(12)]
+    assert result.container.xpath == "/html/body[2]"
+
+
+def test_parent_without_box_and_no_ancestors():
+    result = RepeatedItemsDetector().detect(product_grid())
+    assert result.result_type == ContainerFinderResult.SUCCESS
+    assert len(result.items) == 12
+    # Container sintetizzato: il rettangolo che racchiude gli elementi
+    container = result.container
+    assert (container.tag, container.xpath) == ("", "/html/body[2]/ul[1]")
+    assert container.css_selector == "html > body:nth-of-type(2) > ul"
+    assert (container.x, container.y, container.width, container.height) == (10, 100, 1184, 1180)
+    assert container.num_children == 12
+
+
+def test_no_repeated_items():
+    boxes = page_boxes() + product_grid()[:2]
+    assert RepeatedItemsDetector().detect(boxes).result_type == ContainerFinderResult.NO_REPEATED_ITEMS
+    assert RepeatedItemsDetector().detect([]).result_type == ContainerFinderResult.NO_REPEATED_ITEMS
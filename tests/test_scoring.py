@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+
+from app.adapters.mock_dbhandler import MockDBHandler
+from app.domain.domain_utils import filter_and_save_new_articles
+from app.domain.scoring import (
+    ArticleCandidate,
+    ScoringConfig,
+    collect_candidates,
+    score_candidate,
+    select_top_k,
+)
+from app.ports.models import ListingToArticles, PendingArticleLink
+
+NOW = datetime.datetime(2024, 5, 10, 12, 0)
+
+
+def hn_listing(rows, listing_url="https://news.ycombinator.com"):
+    """rows: (url, titolo, età) -> markdown in stile Hacker News e link articolo."""
+    lines = []
+    for i, (url, title, age) in enumerate(rows):
+        lines.append(f"{i + 1}. [{title}]({url})")
+        lines.append(f"10 points | {age} | [3 comments](https://news.ycombinator.com/item?id={i})")
+    return ListingToArticles(
+        listing_url=listing_url, markdown="\n".join(lines), article_links=[url for url, _, _ in rows]
+    )
+
+
+def test_collect_candidates():
+    first = hn_listing(
+        [
+            ("https://a.example/post?utm_source=hn", "Python 3.13 rilasciato", "2 hours ago"),
+            ("https://b.example/2024/05/08/notizia", "Altra notizia", ""),
+        ]
+    )
+    second = hn_listing(
+        [("https://c.example/python", "Python 3.13 rilasciato", "1 day ago")], listing_url="https://lobste.rs"
+    )
+    candidates = {c.url: c for c in collect_candidates([first, second], NOW)}
+
+    a = candidates["https://a.example/post"]
+    assert (a.rank, a.age_hours, a.title) == (0, 2.0, "Python 3.13 rilasciato")
+    # Stesso titolo in due listing: conta come articolo riportato due volte
+    assert a.occurrences == 2 and candidates["https://c.example/python"].occurrences == 2
+    b = candidates["https://b.example/2024/05/08/notizia"]
+    assert (b.rank, b.age_hours) == (1, 60.0)
+
+
+def test_score_components():
+    config = ScoringConfig(topics=["python"], source_weights={"slow.example": 0.5})
+    base = ArticleCandidate(url="https://x.example/a", listing_url="https://l.example", age_hours=24.0)
+    on_topic = ArticleCandidate(
+        url="https://x.example/b", listing_url="https://l.example", age_hours=24.0, title="Novità Python"
+    )
+    downweighted = ArticleCandidate(url="https://slow.example/a", listing_url="https://l.example", age_hours=24.0)
+    lower_rank = ArticleCandidate(url="https://x.example/c", listing_url="https://l.example", age_hours=24.0, rank=8)
+    older = ArticleCandidate(url="https://x.example/d", listing_url="https://l.example", age_hours=72.0)
+    assert score_candidate(base, config) == 1.5
+    assert score_candidate(on_topic, config) > score_candidate(base, config)
+    assert score_candidate(downweighted, config) == 0.75
+    assert score_candidate(lower_rank, config) < score_candidate(base, config)
+    assert score_candidate(older, config) < score_candidate(base, config)
+
+
+def test_select_top_k_orders_by_score_then_appearance():
+    candidates = [
+        ArticleCandidate(url=f"https://x.example/{i}", listing_url="https://l.example", rank=rank)
+        for i, rank in enumerate([5, 0, 5, 1])
+    ]
+    selected = select_top_k(candidates, 3)
+    assert [c.url for c in selected] == ["https://x.example/1", "https://x.example/3", "https://x.example/0"]
+    assert selected[0].score > selected[1].score > selected[2].score
+    assert select_top_k(candidates, 10)[-1].url == "https://x.example/2"
+    assert select_top_k([], 3) == []
+
+
+def test_unselected_candidates_stay_pending_for_later_runs():
+    db = MockDBHandler()
+    rows = [(f"https://x.example/post-{i}", f"Articolo {i}", f"{i + 1} hours ago") for i in range(4)]
+    listing = hn_listing(rows)
+
+    first = asyncio.run(filter_and_save_new_articles(db, [listing], max_articles=2))
+    assert [a.url for a in first] == ["https://x.example/post-0", "https://x.example/post-1"]
+    pending = {link.url: link for link in db.get_pending_article_links()}
+    assert set(pending) == {"https://x.example/post-2", "https://x.example/post-3"}
+    assert pending["https://x.example/post-2"].rank == 2
+
+    # Run successivo senza listing nuovi (estrazione incrementale): i link in attesa tornano candidati
+    second = asyncio.run(filter_and_save_new_articles(db, [], max_articles=1))
+    assert [a.url for a in second] == ["https://x.example/post-2"]
+    assert [link.url for link in db.get_pending_article_links()] == ["https://x.example/post-3"]
+
+
+def test_expired_pending_links_are_dropped():
+    db = MockDBHandler()
+    old = datetime.datetime.utcnow() - datetime.timedelta(hours=100)
+    db.save_pending_article_links(
+        [
+            PendingArticleLink(
+                url="https://x.example/vecchio",
+                listing_url="https://l.example",
+                fetch_url="https://x.example/vecchio?ref=l",
+                added_at=old,
+            )
+        ]
+    )
+    assert asyncio.run(filter_and_save_new_articles(db, [], max_articles=5)) == []
+    assert db.get_pending_article_links() == []
+    assert db.get_all_article_links() == []
@@ -0,0 +1,96 @@
+import numpy as np
+
+from src.bounding_box_set import BoundingBoxSet
+from src.models import ContainerFinderResult
+from src.spatial_index import GeometricContainerFinder, SpatialIndex
+
+
+def box(xpath, x, y, width, height, tag="<div>"):
+    return dict(tag=tag, css_selector=xpath, xpath=xpath, x=x, y=y, width=width, height=height, num_children=0)
+
+
+def random_page(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = [box("/html/body", 0, 0, 1280, 6000)]
+    for i in range(n):
+        rows.append(
+            box(
+                f"/html/body/div[{i + 1}]",
+                int(rng.integers(0, 1200)),
+                int(rng.integers(0, 5800)),
+                int(rng.integers(1, 400)),
+                int(rng.integers(1, 300)),
+            )
+        )
+    return BoundingBoxSet.from_boxes(rows)
+
+
+def brute_force(boxes, predicate):
+    return [i for i in range(len(boxes)) if predicate(boxes[i])]
+
+
+def test_queries_match_brute_force():
+    boxes = random_page()
+    # Celle piccole: il body finisce nella lista dei box grandi, gli altri su più celle
+    index = SpatialIndex(boxes, cell_size=128, max_cells_per_box=16)
+    for x, y, w, h in [(100, 200, 300, 400), (0, 5900, 50, 50), (640, 3000, 1, 1), (1279, 0, 1, 6000)]:
+        assert index.intersecting(x, y, w, h).tolist() == brute_force(
+            boxes, lambda b: b.x < x + w and b.x + b.width > x and b.y < y + h and b.y + b.height > y
+        )
+        assert index.contained_in(x, y, w, h).tolist() == brute_force(
+            boxes, lambda b: b.x >= x and b.y >= y and b.x + b.width <= x + w and b.y + b.height <= y + h
+        )
+        assert sorted(index.containing(x, y, w, h).tolist()) == brute_force(
+            boxes, lambda b: b.x <= x and b.y <= y and b.x + b.width >= x + w and b.y + b.height >= y + h
+        )
+
+
+def test_at_point_from_innermost():
+    boxes = BoundingBoxSet.from_boxes(
+        [
+            box("/html/body", 0, 0, 1000, 1000),
+            box("/html/body/a", 50, 50, 10, 10),
+            box("/html/body/div", 0, 0, 500, 500),
+        ]
+    )
+    index = SpatialIndex(boxes, cell_size=64, max_cells_per_box=4)
+    assert index.at_point(55, 55).tolist() == [1, 2, 0]
+    assert index.at_point(600, 600).tolist() == [0]
+    # Bordo destro/inferiore escluso
+    assert index.at_point(1000, 10).tolist() == []
+
+
+def test_rectangle_larger_than_page():
+    boxes = random_page(n=50, seed=1)
+    index = SpatialIndex(boxes)
+    everything = list(range(len(boxes)))
+    assert index.intersecting(-500, -500, 10000, 10000).tolist() == everything
+    assert index.contained_in(-500, -500, 10000, 10000).tolist() == everything
+    assert index.containing(-500, -500, 10000, 10000).tolist() == []
+    # Fuori dalla pagina: nessun box
+    assert index.intersecting(5000, 9000, 10, 10).tolist() == []
+
+
+def test_empty_set():
+    index = SpatialIndex(BoundingBoxSet.from_boxes([]))
+    assert len(index) == 0
+    assert index.intersecting(0, 0, 100, 100).tolist() == []
+    assert index.contained_in(0, 0, 100, 100).tolist() == []
+    assert index.at_point(10, 10).tolist() == []
+    result = GeometricContainerFinder(index).find_container()
+    assert result.result_type == ContainerFinderResult.NO_REPEATED_ITEMS
+
+
+def test_geometric_container_groups_near_equal_cards():
+    rows = [
+        box("/html/body", 0, 0, 1300, 3000, tag="<body>"),
+        box("/html/body/div", 0, 0, 1300, 2000, tag='<div class="grid">'),
+    ]
+    for i in range(12):
+        row, col = divmod(i, 3)
+        # 404 e 406 di larghezza: la stessa card con arrotondamenti diversi
+        rows.append(box(f"/html/body/div/div[{i + 1}]", 10 + col * 420, 10 + row * 500, 404 if i % 2 else 406, 480))
+    result = GeometricContainerFinder(SpatialIndex(BoundingBoxSet.from_boxes(rows))).find_container()
+    assert result.result_type == ContainerFinderResult.SUCCESS
+    assert result.container.xpath == "/html/body/div"
+    assert [item.xpath for item in result.items] == [f"/html/body/div/div[{i + 1}]" for i in range(12)]
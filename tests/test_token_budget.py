@@ -0,0 +1,110 @@
+import asyncio
+from typing import List
+
+from app.domain import token_budget
+from app.domain.token_budget import (
+    TokenBudget,
+    TruncationStrategy,
+    estimate_tokens,
+    fit_to_budget,
+    select_sections,
+    strip_boilerplate,
+    summarize_within_budget,
+    truncate_head_tail,
+)
+from app.ports.llm import LLMPort
+from app.ports.models import SummarizePageInput, SummarizePageOutput
+
+
+def paragraph(label: str, words: int = 40) -> str:
+    return " ".join(f"{label}{i}" for i in range(words))
+
+
+def test_short_content_is_unchanged():
+    content = "# Titolo\n\n[menu](a) [altro](b)\n\nTesto breve."
+    assert fit_to_budget(content, TokenBudget(max_input_tokens=1000)) == content
+
+
+def test_strip_boilerplate_keeps_headings_and_code():
+    markdown = "\n".join(
+        [
+            "# Titolo",
+            "[Home](/) | [Blog](/blog) | [Chi siamo](/about)",
+            "We use cookies to improve your experience.",
+            "Il paragrafo dell'articolo parla di cookie e newsletter.",
+            "```",
+            "x = 1",
+            "x = 1",
+            "```",
+        ]
+    )
+    assert strip_boilerplate(markdown).splitlines() == [
+        "# Titolo",
+        "Il paragrafo dell'articolo parla di cookie e newsletter.",
+        "```",
+        "x = 1",
+        "x = 1",
+        "```",
+    ]
+
+
+def test_truncate_head_tail():
+    text = "\n".join([paragraph("inizio")] + [paragraph(f"mezzo{i}_") for i in range(20)] + [paragraph("fine")])
+    budget = TokenBudget(max_input_tokens=200, head_ratio=0.7)
+    truncated = truncate_head_tail(text, budget)
+    assert len(truncated) <= 200 * budget.chars_per_token
+    assert truncated.startswith("inizio0")
+    assert truncated.rstrip().endswith("fine39")
+    assert "[...]" in truncated
+    assert "mezzo10_0" not in truncated
+
+
+def test_select_sections_keeps_lead_and_dense_sections_in_order():
+    sections = [
+        "# Titolo\n\n" + paragraph("lead", 30),
+        "## Link\n\n" + " ".join(f"[l{i}](https://example.com/{i})" for i in range(30)),
+        "## Analisi\n\n" + paragraph("analisi", 110),
+        "## Coda\n\n" + paragraph("coda", 50),
+    ]
+    budget = TokenBudget(max_input_tokens=400, strategy=TruncationStrategy.SECTION_PRIORITY)
+    selected = select_sections("\n\n".join(sections), budget)
+    assert estimate_tokens(selected) <= budget.max_input_tokens
+    assert selected.startswith("# Titolo")
+    # Le sezioni scelte restano nell'ordine originale; quella che non entra viene troncata
+    assert selected.index("## Analisi") < selected.index("## Coda")
+    assert "analisi109" in selected
+    assert "coda49" not in selected
+    assert "## Link" not in selected
+
+
+class EchoLLM(LLMPort):
+    def __init__(self):
+        self.inputs: List[str] = []
+
+    def extract_article_links(self, data):
+        raise NotImplementedError
+
+    def summarize_page(self, data):
+        raise NotImplementedError
+
+    async def asummarize_page(self, data: SummarizePageInput) -> SummarizePageOutput:
+        self.inputs.append(data.page_representation)
+        return SummarizePageOutput(summary_markdown="riassunto")
+
+
+def test_summarize_within_budget_strips_once(monkeypatch):
+    calls = []
+    original = token_budget.strip_boilerplate
+
+    def counting_strip(markdown):
+        calls.append(markdown)
+        return original(markdown)
+
+    monkeypatch.setattr(token_budget, "strip_boilerplate", counting_strip)
+    content = "\n\n".join(paragraph(f"p{i}_") for i in range(40))
+    llm = EchoLLM()
+    budget = TokenBudget(max_input_tokens=300)
+    output = asyncio.run(summarize_within_budget(content, llm, budget))
+    assert output.summary_markdown == "riassunto"
+    assert len(calls) == 1
+    assert estimate_tokens(llm.inputs[0]) <= budget.max_input_tokens